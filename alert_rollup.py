@@ -0,0 +1,420 @@
+# alert_rollup.py
+"""
+Alert geçmişi için artımlı güncellenen, kalıcı ön-özetler (rollup).
+
+Dashboard her yenilemede tüm geçmişi taramak (nunique, value_counts,
+1 dakikalık resample) yerine yalnız bu özetleri okur; çizim maliyeti geçmişin
+boyundan bağımsızdır. Özetler alerts.csv'nin sonuna eklenen satırlarla
+(alert_tail.AlertTail, çerçevesiz) ya da alert_store'a yazılan yeni
+parçalarla (StoreTail) güncellenir:
+
+  – Toplamlar            : akış sayısı, attack_cat ve state başına sayılar,
+                           saat-of-day histogramı (24 kova). Zaman damgası
+                           ayrıştırılamayan satırlar sayılmaz (skipped).
+  – Dakikalık sayılar    : (dakika, boyut, değer) → sayı; boyutlar
+                           attack_cat ve state
+  – Farklı srcip (yakl.) : HyperLogLog (2^HLL_P yazmaç, ~%1.6 hata); gün
+                           başına bir taslak + tüm geçmiş için bir taslak.
+                           Taslaklar birleştirilebilir (aralık sorguları).
+  – Son kayıtlar         : zamana göre en yeni RECENT_ROWS alert (sınırlı
+                           top-N; her partide yalnız parti + N satır seçilir)
+
+Kalıcılık (ROLLUP_DIR):
+  state.json                 okuma konumu, toplamlar, gün listesi
+  total.hll                  tüm geçmişin HLL yazmaçları
+  days/YYYY-MM-DD.parquet    o günün dakikalık sayıları
+  days/YYYY-MM-DD.hll        o günün HLL yazmaçları
+  recent.parquet             son kayıtlar
+Her kayıtta yalnız değişen günler yeniden yazılır; state.json en son ve
+atomik yazılır. Okuma konumu özetlerle birlikte saklandığından yeniden
+başlatmada satırlar iki kez sayılmaz (kayıt yarıda kesilirse yalnız son
+parti gün bölümlerinde tekrar sayılabilir).
+"""
+
+import os
+import json
+import threading
+from collections import Counter, OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from alert_tail import AlertTail
+
+ROLLUP_DIR  = "rollups"
+HLL_P       = 12
+DIMS        = ["attack_cat", "state"]
+DAY_CACHE   = 32       # bellekte tutulan en fazla gün bölümü
+RECENT_ROWS = 50       # son kayıtlar tablosu (top-N)
+
+# Zaman serisi çözünürlükleri (küçükten büyüğe); series() aralığı
+# max_points kovaya sığdıran ilk çözünürlüğü seçer
+RESOLUTIONS   = ["1min", "5min", "15min", "30min", "1h", "3h", "6h", "12h", "1D", "7D"]
+SERIES_POINTS = 1500
+
+
+# -------------------------------------------------------------------
+# HyperLogLog
+# -------------------------------------------------------------------
+class HyperLogLog:
+    def __init__(self, p: int = HLL_P, registers: np.ndarray = None):
+        self.p = p
+        self.registers = np.zeros(1 << p, dtype=np.uint8) if registers is None else registers
+
+    @staticmethod
+    def hash(values) -> np.ndarray:
+        return pd.util.hash_array(np.asarray(values, dtype=object))
+
+    def add(self, values):
+        h = self.hash(values)
+        if not h.size:
+            return
+        q = 64 - self.p
+        idx  = (h >> np.uint64(q)).astype(np.intp)
+        rest = h & np.uint64((1 << q) - 1)
+        # rest < 2^52: float64'e kayıpsız çevrilir, frexp üssü = bit uzunluğu
+        _, bits = np.frexp(rest.astype(np.float64))
+        rho = (q - bits + 1).astype(np.uint8)
+        np.maximum.at(self.registers, idx, rho)
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self) -> int:
+        m = self.registers.size
+        alpha = 0.7213 / (1 + 1.079 / m)
+        est = alpha * m * m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if est <= 2.5 * m and zeros:
+            est = m * np.log(m / zeros)       # küçük aralık: doğrusal sayım
+        return int(round(est))
+
+    def save(self, path: str):
+        _atomic_write(path, self.registers.tobytes())
+
+    @classmethod
+    def load(cls, path: str, p: int = HLL_P) -> "HyperLogLog":
+        with open(path, "rb") as f:
+            return cls(p, np.frombuffer(f.read(), dtype=np.uint8).copy())
+
+
+def _atomic_write(path: str, data: bytes):
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+# -------------------------------------------------------------------
+# Gün bölümü
+# -------------------------------------------------------------------
+class _Day:
+    """Tek günün dakikalık sayıları ve HLL taslağı."""
+
+    def __init__(self, counts: Counter = None, hll: HyperLogLog = None):
+        self.counts = counts if counts is not None else Counter()   # (dakika, boyut, değer) → n
+        self.hll    = hll or HyperLogLog()
+        self._frame = None          # frame() önbelleği; counts değişince None
+
+    def frame(self) -> pd.DataFrame:
+        if self._frame is None:
+            self._frame = self._build_frame()
+        return self._frame
+
+    def _build_frame(self) -> pd.DataFrame:
+        if not self.counts:
+            return pd.DataFrame({"minute": pd.Series(dtype="datetime64[ns]"),
+                                 "dim": pd.Series(dtype=str), "value": pd.Series(dtype=str),
+                                 "count": pd.Series(dtype=np.int64)})
+        keys, n = zip(*self.counts.items())
+        minute, dim, value = zip(*keys)
+        return pd.DataFrame({"minute": pd.to_datetime(np.array(minute, dtype="datetime64[m]")),
+                             "dim": dim, "value": value, "count": np.array(n, dtype=np.int64)})
+
+    def save(self, base: str):
+        tmp = f"{base}.parquet.tmp"
+        self.frame().to_parquet(tmp, index=False)
+        os.replace(tmp, f"{base}.parquet")
+        self.hll.save(f"{base}.hll")
+
+    @classmethod
+    def load(cls, base: str) -> "_Day":
+        df = pd.read_parquet(f"{base}.parquet")
+        minutes = df["minute"].to_numpy().astype("datetime64[m]").astype(np.int64)
+        counts = Counter(dict(zip(zip(minutes.tolist(), df["dim"], df["value"]),
+                                  df["count"].tolist())))
+        return cls(counts, HyperLogLog.load(f"{base}.hll"))
+
+
+# -------------------------------------------------------------------
+# Rollup deposu
+# -------------------------------------------------------------------
+class RollupStore:
+    """
+    Kaynağı (alerts.csv yolu ya da alert_store.AlertStore) izleyip
+    özetleri güncelleyen depo. refresh() yeni satırları
+    işler ve kaydeder; sorgular (totals, minute_counts, distinct) yalnız
+    özetleri okur. Dakika anahtarları epoch dakikası (int) olarak tutulur.
+    """
+
+    def __init__(self, source="alerts.csv", root: str = ROLLUP_DIR):
+        self.root      = root
+        self.day_dir   = os.path.join(root, "days")
+        self.tail      = source.tail() if hasattr(source, "tail") else AlertTail(source, keep_frame=False)
+        self.total     = 0
+        self.skipped   = 0                  # zaman damgası geçersiz, sayılmayan satır
+        self.totals    = {d: Counter() for d in DIMS}
+        self.hour_hist = [0] * 24
+        self.hll       = HyperLogLog()
+        self.days      = []                 # sıralı gün listesi (YYYY-MM-DD)
+        self.last_ts   = None               # en yeni alert zamanı
+        self.recent    = pd.DataFrame()     # en yeni RECENT_ROWS alert
+        self._cache    = OrderedDict()      # gün → _Day
+        self._dirty    = set()
+        self._lock     = threading.Lock()
+        self._load()
+
+    # ---------------------------------------------------------------
+    # Kalıcılık
+    # ---------------------------------------------------------------
+    def _state_path(self) -> str:
+        return os.path.join(self.root, "state.json")
+
+    def _load(self):
+        path = self._state_path()
+        if not os.path.exists(path):
+            return
+        with open(path, encoding="utf-8") as f:
+            st = json.load(f)
+        self.total     = st["total"]
+        self.skipped   = st.get("skipped", 0)
+        self.totals    = {d: Counter(st["totals"].get(d, {})) for d in DIMS}
+        self.hour_hist = st["hour_hist"]
+        self.days      = st["days"]
+        self.last_ts   = pd.Timestamp(st["last_ts"]) if st.get("last_ts") else None
+        self.tail.restore(st["position"])
+        total_hll = os.path.join(self.root, "total.hll")
+        if os.path.exists(total_hll):
+            self.hll = HyperLogLog.load(total_hll)
+        recent = os.path.join(self.root, "recent.parquet")
+        if os.path.exists(recent):
+            self.recent = pd.read_parquet(recent)
+
+    def save(self):
+        os.makedirs(self.day_dir, exist_ok=True)
+        for day in sorted(self._dirty):
+            self._cache[day].save(os.path.join(self.day_dir, day))
+        self._dirty.clear()
+        self.hll.save(os.path.join(self.root, "total.hll"))
+        if len(self.recent):
+            recent = os.path.join(self.root, "recent.parquet")
+            self.recent.to_parquet(f"{recent}.tmp", index=False)
+            os.replace(f"{recent}.tmp", recent)
+        st = {"position": self.tail.position(), "total": self.total, "skipped": self.skipped,
+              "totals": {d: dict(c) for d, c in self.totals.items()},
+              "hour_hist": self.hour_hist, "days": self.days,
+              "last_ts": None if self.last_ts is None else self.last_ts.isoformat()}
+        _atomic_write(self._state_path(), json.dumps(st, ensure_ascii=False).encode("utf-8"))
+
+    def _day(self, day: str) -> _Day:
+        if day in self._cache:
+            self._cache.move_to_end(day)
+            return self._cache[day]
+        base = os.path.join(self.day_dir, day)
+        part = _Day.load(base) if os.path.exists(f"{base}.parquet") else _Day()
+        self._cache[day] = part
+        # Kaydedilmemiş (kirli) günler önbellekten atılmaz
+        while len(self._cache) > DAY_CACHE:
+            old = next((d for d in self._cache if d not in self._dirty), None)
+            if old is None:
+                break
+            del self._cache[old]
+        return part
+
+    # ---------------------------------------------------------------
+    # Güncelleme
+    # ---------------------------------------------------------------
+    def update(self, df: pd.DataFrame):
+        """Yeni alert satırlarını özetlere ekle (kaydetmez)."""
+        if df.empty:
+            return
+        # Zaman damgası ayrıştırılamayan satırlar hiçbir özete girmez (toplamlar
+        # grafiklerle tutarlı kalır); yalnız sayıları tutulur
+        ts = df["timestamp"]
+        ok = ts.notna().to_numpy()
+        self.skipped += int((~ok).sum())
+        if not ok.any():
+            return
+        df, ts = df[ok], ts[ok]
+        self.total += len(df)
+        for d in DIMS:
+            if d in df.columns:
+                self.totals[d].update(df[d].astype(str).value_counts().to_dict())
+        if "srcip" in df.columns:
+            self.hll.add(df["srcip"].astype(str).to_numpy())
+
+        newest = ts.max()
+        if self.last_ts is None or newest > self.last_ts:
+            self.last_ts = newest
+        self._update_recent(df)
+        for h, n in ts.dt.hour.value_counts().items():
+            self.hour_hist[int(h)] += int(n)
+        minute = ts.to_numpy().astype("datetime64[m]").astype(np.int64)
+        day    = ts.dt.strftime("%Y-%m-%d").to_numpy()
+        for dname in np.unique(day):
+            sel  = day == dname
+            part = self._day(dname)
+            for d in DIMS:
+                if d in df.columns:
+                    g = pd.DataFrame({"m": minute[sel], "v": df[d].astype(str).to_numpy()[sel]})
+                    for (m, v), n in g.groupby(["m", "v"]).size().items():
+                        part.counts[(int(m), d, v)] += int(n)
+            part._frame = None
+            if "srcip" in df.columns:
+                part.hll.add(df["srcip"].astype(str).to_numpy()[sel])
+            if dname not in self.days:
+                self.days.append(dname)
+                self.days.sort()
+            self._dirty.add(dname)
+
+    def _update_recent(self, df: pd.DataFrame):
+        # Tam sıralama yok: partiden ve mevcut listeden en yeni N satır seçilir.
+        # Aynı saniyedeki satırlarda sonra ekleneni tutmak için keep="last".
+        df = df.drop(columns=["hour", "date"], errors="ignore")
+        df = df.astype({c: str for c in DIMS if c in df.columns})
+        top = df.nlargest(RECENT_ROWS, "timestamp", keep="last")
+        if len(self.recent):
+            top = pd.concat([self.recent, top], ignore_index=True)
+            top = top.nlargest(RECENT_ROWS, "timestamp", keep="last")
+        self.recent = top.reset_index(drop=True)
+
+    def refresh(self) -> int:
+        """alerts.csv'ye eklenen satırları işle ve kaydet → yeni satır sayısı."""
+        with self._lock:
+            new = self.tail.refresh()
+            if len(new):
+                self.update(new)
+                self.save()
+            return len(new)
+
+    # ---------------------------------------------------------------
+    # Sorgular
+    # ---------------------------------------------------------------
+    def days_in(self, start=None, end=None) -> list:
+        """[start, end] aralığıyla kesişen gün bölümleri."""
+        lo = None if start is None else pd.Timestamp(start).strftime("%Y-%m-%d")
+        hi = None if end is None else pd.Timestamp(end).strftime("%Y-%m-%d")
+        return [d for d in self.days if (lo is None or d >= lo) and (hi is None or d <= hi)]
+
+    def minute_counts(self, dim: str, start=None, end=None) -> pd.DataFrame:
+        """
+        Dakikalık sayılar: index dakika (Timestamp), sütunlar boyutun
+        değerleri. Yalnız aralıkla kesişen gün bölümleri okunur.
+        """
+        with self._lock:
+            frames = [self._day(d).frame() for d in self.days_in(start, end)]
+        frames = [f[f["dim"] == dim] for f in frames]
+        frames = [f for f in frames if len(f)]
+        if not frames:
+            return pd.DataFrame(index=pd.DatetimeIndex([], name="minute"))
+        df = pd.concat(frames, ignore_index=True)
+        if start is not None:
+            df = df[df["minute"] >= pd.Timestamp(start)]
+        if end is not None:
+            df = df[df["minute"] <= pd.Timestamp(end)]
+        return df.pivot_table(index="minute", columns="value", values="count",
+                              aggfunc="sum", fill_value=0)
+
+    def series(self, dim: str, start=None, end=None, max_points: int = SERIES_POINTS):
+        """
+        Aralığa sığan çözünürlükte sayı serisi → (DataFrame, çözünürlük).
+        Boş kovalar 0'dır; kova sayısı en fazla max_points (en kaba
+        çözünürlükte aşılabilir).
+        """
+        start = pd.Timestamp(start if start is not None else (self.days[0] if self.days else 0))
+        end   = pd.Timestamp(end if end is not None else (self.last_ts or start))
+        freq  = resolution_for(start, end, max_points)
+        counts = self.minute_counts(dim, start, end)
+        grid = pd.date_range(start.floor(freq), end.floor(freq), freq=freq, name="minute")
+        if len(counts):
+            counts = counts.groupby(counts.index.floor(freq)).sum()
+        return counts.reindex(grid, fill_value=0), freq
+
+    def distinct(self, start=None, end=None) -> int:
+        """Farklı srcip tahmini; aralık verilirse gün çözünürlüğünde."""
+        if start is None and end is None:
+            return self.hll.count()
+        with self._lock:
+            merged = HyperLogLog()
+            for d in self.days_in(start, end):
+                merged.merge(self._day(d).hll)
+        return merged.count()
+
+    def recent_rows(self, start=None, end=None, n: int = RECENT_ROWS):
+        """
+        Aralıktaki en yeni n kayıt (yeniden eskiye) → (DataFrame, tam mı).
+        tam=False: aralık son kayıtlar penceresinden eskiye uzanıyor ve n
+        satır bulunamadı; eksik kayıtlar yalnız kaynaktan okunabilir.
+        """
+        with self._lock:
+            df = self.recent
+        if df.empty:
+            return df, True
+        ts = df["timestamp"]
+        ok = pd.Series(True, index=df.index)
+        if start is not None:
+            ok &= ts >= pd.Timestamp(start)
+        if end is not None:
+            ok &= ts <= pd.Timestamp(end)
+        df = df[ok].sort_values("timestamp", ascending=False, kind="stable").head(n)
+        complete = (len(df) >= n or len(self.recent) < RECENT_ROWS
+                    or (start is not None and pd.Timestamp(start) >= ts.min()))
+        return df, complete
+
+    def peak_hour(self) -> int:
+        return int(np.argmax(self.hour_hist)) if self.total else 0
+
+
+# -------------------------------------------------------------------
+# Grafik yardımcıları
+# -------------------------------------------------------------------
+def resolution_for(start, end, max_points: int = SERIES_POINTS) -> str:
+    span = pd.Timestamp(end) - pd.Timestamp(start)
+    for freq in RESOLUTIONS:
+        if span / pd.Timedelta(freq) < max_points:
+            return freq
+    return RESOLUTIONS[-1]
+
+
+def lttb(x, y, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: (x, y) serisinden görsel şekli koruyan
+    n_out noktanın indeksleri (ilk ve son nokta her zaman dahil).
+    x: sayısal ya da datetime64, artan sırada.
+    """
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.astype("datetime64[ns]").astype(np.int64)
+    x = x.astype(np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    every = (n - 2) / (n_out - 2)
+    out = np.empty(n_out, dtype=np.intp)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo = int(i * every) + 1
+        hi = int((i + 1) * every) + 1
+        # Sonraki kovanın ortalaması (son kovada son nokta)
+        nlo, nhi = hi, min(int((i + 2) * every) + 1, n)
+        if nlo >= nhi:
+            nlo, nhi = n - 1, n
+        ax, ay = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - ax) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (ay - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
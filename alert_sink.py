@@ -0,0 +1,158 @@
+# alert_sink.py
+"""
+alerts.csv için tamponlu, döndürmeli (rotating) alert yazıcı.
+
+Dosya açık tutulur; satırlar bir kuyruğa bırakılır ve arka plan iş parçacığı
+kuyrukta biriken tüm satırları tek seferde yazıp flush eder. Böylece saldırı
+patlamalarında çıkarım iş parçacığı her akış için open/write/close yapmaz.
+
+Dayanıklılık: fsync_rows satırda bir ve/veya fsync_interval saniyede bir
+os.fsync çağrılır (0 = kapalı; işletim sisteminin önbelleğine güvenilir).
+Rotasyon: dosya rotate_bytes'ı aşınca ya da rotate_interval saniye dolunca
+alerts_YYYYmmdd_HHMMSS.csv olarak yeniden adlandırılır ve yeni dosya başlığıyla
+açılır. CSV şeması (ALERT_FIELDS) dashboard'un okuduğu şemayla aynıdır.
+"""
+
+import os
+import csv
+import time
+import queue
+import atexit
+import threading
+from datetime import datetime
+
+ALERT_FIELDS = ["timestamp", "srcip", "state", "attack_cat", "prob_attack"]
+
+_STOP = object()
+
+
+class AlertSink:
+    def __init__(self, path: str = "alerts.csv", flush_interval: float = 0.5,
+                 rotate_bytes: int = 0, rotate_interval: float = 0,
+                 fsync_rows: int = 0, fsync_interval: float = 0,
+                 max_queue: int = 100_000, max_batch: int = 5000):
+        self.path            = path
+        self.flush_interval  = flush_interval
+        self.rotate_bytes    = rotate_bytes
+        self.rotate_interval = rotate_interval
+        self.fsync_rows      = fsync_rows
+        self.fsync_interval  = fsync_interval
+        self.max_batch       = max_batch
+        self.rows_written    = 0
+
+        self._q = queue.Queue(maxsize=max_queue)
+        self._unsynced  = 0
+        self._last_sync = time.monotonic()
+        self._closed    = False
+        self._open()
+        self._thread = threading.Thread(target=self._run, name="alert-sink", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # ---------------------------------------------------------------
+    # Üretici tarafı (çıkarım iş parçacığı)
+    # ---------------------------------------------------------------
+    def write(self, row: list):
+        """Satırı kuyruğa bırak; kuyruk doluysa yazıcı yetişene kadar bekler."""
+        self._q.put(row)
+
+    def write_alert(self, obj: dict, att_label: str, prob_attack: float):
+        self.write([
+            datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            obj.get("srcip","-"),
+            obj.get("state","-"),
+            att_label,
+            f"{prob_attack:.3f}"
+        ])
+
+    def close(self):
+        """Bekleyen satırları yaz, fsync et ve dosyayı kapat."""
+        if self._closed:
+            return
+        self._closed = True
+        self._q.put(_STOP)
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---------------------------------------------------------------
+    # Yazıcı iş parçacığı
+    # ---------------------------------------------------------------
+    def _open(self):
+        self._f = open(self.path, "a", newline="", encoding="utf-8")
+        self._w = csv.writer(self._f)
+        if self._f.tell() == 0:
+            self._w.writerow(ALERT_FIELDS)
+        self._opened_at = time.monotonic()
+
+    def _rotated_name(self) -> str:
+        root, ext = os.path.splitext(self.path)
+        name = f"{root}_{datetime.now():%Y%m%d_%H%M%S}{ext}"
+        n = 1
+        while os.path.exists(name):
+            name = f"{root}_{datetime.now():%Y%m%d_%H%M%S}_{n}{ext}"
+            n += 1
+        return name
+
+    def _rotate(self):
+        self._sync()
+        self._f.close()
+        os.replace(self.path, self._rotated_name())
+        self._open()
+
+    def _sync(self):
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self._unsynced  = 0
+        self._last_sync = time.monotonic()
+
+    def _maintain(self):
+        now = time.monotonic()
+        if self._unsynced and (
+                (self.fsync_rows and self._unsynced >= self.fsync_rows) or
+                (self.fsync_interval and now - self._last_sync >= self.fsync_interval)):
+            self._sync()
+        if (self.rotate_bytes and self._f.tell() >= self.rotate_bytes) or \
+                (self.rotate_interval and now - self._opened_at >= self.rotate_interval):
+            self._rotate()
+
+    def _run(self):
+        stop = False
+        while not stop:
+            try:
+                item = self._q.get(timeout=self.flush_interval)
+            except queue.Empty:
+                item = None
+            batch = [] if item is None else [item]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._q.get_nowait())
+                except queue.Empty:
+                    break
+            if _STOP in batch:
+                batch = [r for r in batch if r is not _STOP]
+                stop = True
+            try:
+                if batch:
+                    self._write_batch(batch)
+                self._maintain()
+            except (OSError, ValueError) as e:
+                print(" Alert yazma hatası:", e)
+        self._finish()
+
+    def _write_batch(self, batch: list):
+        self._w.writerows(batch)
+        self._f.flush()
+        self.rows_written += len(batch)
+        self._unsynced    += len(batch)
+
+    def _finish(self):
+        try:
+            self._sync()
+        except (OSError, ValueError) as e:
+            print(" Alert yazma hatası:", e)
+        self._f.close()
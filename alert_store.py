@@ -0,0 +1,481 @@
+# alert_store.py
+"""
+Tarihe göre bölümlenmiş (date-partitioned), sütunlu alert deposu.
+
+alerts.csv'ye ekleme ucuzdur ama her okuma metni ve zaman damgalarını
+yeniden ayrıştırır. AlertStore alert'leri tipli Parquet dosyalarına yazar:
+
+  root/date=YYYY-MM-DD/part-<ns>-<pid>.parquet    yazıcı parçaları
+  root/date=YYYY-MM-DD/c-<ns>-<pid>.parquet       sıkıştırılmış (compact) dosya
+
+Şema (SCHEMA): timestamp[s], srcip uint32, state ve attack_cat sözlük
+(category), prob_attack float32.
+
+Kayıplı dönüşümler:
+  – Geçersiz srcip (ör. "-", boş) 0 olarak saklanır; dışa aktarımda
+    "0.0.0.0" yazılır, özgün metin geri gelmez.
+  – Zaman damgası ayrıştırılamayan satırlar hiçbir bölüme yazılmaz;
+    sayıları AlertStore.dropped'da tutulur (import bunu raporlar).
+
+  – Yazma   : StoreAlertSink (AlertSink ile aynı arayüz) satırları toplayıp
+              PART_INTERVAL saniyede / PART_ROWS satırda bir, satırların
+              tarihine göre bölüme yeni bir parça yazar (geçici ad + rename).
+  – Okuma   : read(start, end) yalnız aralıkla kesişen bölümlerin
+              dosyalarını bellek eşlemeyle (memory_map) açar.
+  – Compact : compact() bir bölümün küçük dosyalarını tek dosyada birleştirir.
+              Birleşik dosyanın üst verisi ("sources") yerini aldığı her
+              dosyayı içerdiği özgün parçalarla eşler; satırların özgün parçası
+              _part sütunundadır. Okuyucular sources'taki dosyaları yok sayar;
+              eski dosyaların silinmesiyle okuma arasındaki yarışta satırlar
+              iki kez okunmaz.
+  – Artımlı : tail() → AlertTail ile aynı arayüzde (refresh / position /
+              restore) yalnız yeni parçaları okuyan izleyici (dashboard
+              rollup'ları için).
+  – CSV     : export_csv() alerts.csv ile aynı biçimde parça parça yazar;
+              import_csv() mevcut alerts.csv'yi depoya aktarır.
+
+Kullanım:
+    python alert_store.py compact                     # tüm bölümler
+    python alert_store.py export out.csv --start 2025-05-14 --end 2025-05-15
+    python alert_store.py import alerts.csv
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pc = pq = None
+
+from alert_sink import AlertSink, ALERT_FIELDS
+from alert_tail import parse_timestamps
+from ip_utils import parse_ipv4, format_ipv4
+
+STORE_DIR         = "alerts"
+PART_INTERVAL     = 5.0      # sn; yazıcı parçası en geç bu sürede bir
+PART_ROWS         = 50_000   # parça başına en fazla satır
+COMPACT_MIN_FILES = 8        # bölümde bu kadar dosya birikince birleştir
+COMPACT_MIN_AGE   = 600.0    # sn; daha yeni parçalar birleştirilmez
+COMPACT_INTERVAL  = 600.0    # sn; yazıcının arka planda birleştirme sıklığı (0 = kapalı)
+EXPORT_CHUNK_ROWS = 100_000
+TS_FORMAT         = "%Y-%m-%d %H:%M:%S"
+
+if pa is not None:
+    _CAT = pa.dictionary(pa.int32(), pa.string())
+    SCHEMA = pa.schema([
+        ("timestamp",   pa.timestamp("s")),
+        ("srcip",       pa.uint32()),
+        ("state",       _CAT),
+        ("attack_cat",  _CAT),
+        ("prob_attack", pa.float32()),
+    ])
+    COMPACT_SCHEMA = SCHEMA.append(pa.field("_part", _CAT))
+
+
+def _part_name() -> str:
+    return f"{time.time_ns()}-{os.getpid()}.parquet"
+
+
+def _day_of(dirname: str) -> str:
+    return dirname.split("=", 1)[1]
+
+
+class AlertStore:
+    def __init__(self, root: str = STORE_DIR):
+        if pa is None:
+            raise ImportError("alert deposu için pyarrow gerekli")
+        self.root    = root
+        self.dropped = 0      # zaman damgası geçersiz, yazılmayan satır
+
+    # ---------------------------------------------------------------
+    # Yazma
+    # ---------------------------------------------------------------
+    def day_dir(self, day: str) -> str:
+        return os.path.join(self.root, f"date={day}")
+
+    @staticmethod
+    def to_table(df: pd.DataFrame) -> "pa.Table":
+        """ALERT_FIELDS sütunlu (metin ya da tipli) çerçeve → SCHEMA tablosu."""
+        ts = df["timestamp"]
+        if not pd.api.types.is_datetime64_any_dtype(ts):
+            ts = parse_timestamps(ts)
+        srcip = df["srcip"].to_numpy()
+        if srcip.dtype != np.uint32:
+            srcip = parse_ipv4(srcip)
+        cols = {
+            "timestamp":   pa.array(ts.to_numpy().astype("datetime64[s]"), pa.timestamp("s")),
+            "srcip":       pa.array(srcip, pa.uint32()),
+            "state":       pa.array(df["state"].astype(str).to_numpy()).dictionary_encode(),
+            "attack_cat":  pa.array(df["attack_cat"].astype(str).to_numpy()).dictionary_encode(),
+            "prob_attack": pa.array(pd.to_numeric(df["prob_attack"], errors="coerce")
+                                    .to_numpy(dtype=np.float32), pa.float32()),
+        }
+        return pa.table(cols).cast(SCHEMA)
+
+    def _write_file(self, table, day: str, name: str, metadata: dict = None) -> str:
+        d = self.day_dir(day)
+        os.makedirs(d, exist_ok=True)
+        path = os.path.join(d, name)
+        if metadata:
+            table = table.replace_schema_metadata(
+                {**(table.schema.metadata or {}),
+                 **{k: json.dumps(v) for k, v in metadata.items()}})
+        tmp = os.path.join(d, f".{name}.tmp")
+        pq.write_table(table, tmp)
+        os.replace(tmp, path)
+        return path
+
+    def append(self, df: pd.DataFrame) -> list:
+        """
+        Satırları tarihlerine göre bölümlere yeni parça olarak yaz → yazılan
+        yollar. Zaman damgası geçersiz satırlar yazılmaz, dropped'a eklenir.
+        """
+        if df.empty:
+            return []
+        table = self.to_table(df)
+        days = pd.Series(table.column("timestamp").to_numpy(zero_copy_only=False)
+                         .astype("datetime64[D]").astype(str))
+        paths = []
+        for day in days.unique():
+            if day == "NaT":
+                self.dropped += int((days == day).sum())
+                continue
+            sel = np.flatnonzero((days == day).to_numpy())
+            paths.append(self._write_file(table.take(sel), day, f"part-{_part_name()}"))
+        return paths
+
+    def append_rows(self, rows: list) -> list:
+        """AlertSink satırları ([timestamp, srcip, state, attack_cat, prob]) → parçalar."""
+        return self.append(pd.DataFrame(rows, columns=ALERT_FIELDS))
+
+    # ---------------------------------------------------------------
+    # Bölüm ve dosya listesi
+    # ---------------------------------------------------------------
+    def days(self, start=None, end=None) -> list:
+        """[start, end] ile kesişen bölümlerin günleri (sıralı)."""
+        if not os.path.isdir(self.root):
+            return []
+        lo = None if start is None else pd.Timestamp(start).strftime("%Y-%m-%d")
+        hi = None if end is None else pd.Timestamp(end).strftime("%Y-%m-%d")
+        out = [_day_of(d) for d in os.listdir(self.root) if d.startswith("date=")]
+        return sorted(d for d in out if (lo is None or d >= lo) and (hi is None or d <= hi))
+
+    def files(self, day: str) -> dict:
+        """
+        Bölümün canlı dosyaları → {ad: {kaynak dosya: özgün parçalar}}.
+        Parça için {ad: [ad]}, birleşik dosya için üst verideki "sources".
+        Bir birleşik dosyanın kaynağı olan dosyalar listelenmez.
+        """
+        d = self.day_dir(day)
+        try:
+            names = [n for n in os.listdir(d) if n.endswith(".parquet") and not n.startswith(".")]
+        except FileNotFoundError:
+            return {}
+        live, replaced = {}, set()
+        for n in names:
+            if n.startswith("c-"):
+                try:
+                    meta = pq.read_schema(os.path.join(d, n)).metadata or {}
+                except FileNotFoundError:
+                    continue
+                live[n] = json.loads(meta[b"sources"])
+                replaced.update(live[n])
+            else:
+                live[n] = {n: [n]}
+        return {n: src for n, src in live.items() if n not in replaced}
+
+    # ---------------------------------------------------------------
+    # Okuma
+    # ---------------------------------------------------------------
+    def _read_file(self, day: str, name: str, columns=None, skip_parts=None):
+        path = os.path.join(self.day_dir(day), name)
+        cols = None if columns is None else list(columns)
+        if skip_parts and name.startswith("c-"):
+            cols = None if cols is None else cols + ["_part"]
+        table = pq.read_table(path, columns=cols, memory_map=True)
+        if skip_parts and name.startswith("c-"):
+            keep = pc.invert(pc.is_in(table.column("_part").cast(pa.string()),
+                                      value_set=pa.array(sorted(skip_parts), pa.string())))
+            table = table.filter(keep)
+        if "_part" in table.column_names:
+            table = table.drop(["_part"])
+        return table
+
+    @staticmethod
+    def to_frame(table, ip_text: bool = True) -> pd.DataFrame:
+        df = table.to_pandas()
+        if "timestamp" in df.columns:
+            df["timestamp"] = df["timestamp"].astype("datetime64[ns]")
+        if ip_text and "srcip" in df.columns:
+            df["srcip"] = format_ipv4(df["srcip"].to_numpy())
+        return df
+
+    def _day_tables(self, day: str, columns=None):
+        """
+        Bölümün dosyalarını oku. Liste alındıktan sonra bir dosya birleştirme
+        ile silinirse liste yeniden alınır ve okuma bir kez yeniden denenir;
+        daha önce okunan özgün parçalar birleşik dosyadan atlanır (satırlar
+        ne eksik ne iki kez döner).
+        """
+        done = set()          # okunmuş özgün parçalar
+        for attempt in range(2):
+            try:
+                for name, sources in sorted(self.files(day).items()):
+                    parts = {p for ps in sources.values() for p in ps}
+                    if parts <= done:
+                        continue
+                    table = self._read_file(day, name, columns, skip_parts=done)
+                    done |= parts
+                    yield table
+                return
+            except FileNotFoundError:      # birleştirme sırasında silindi
+                if attempt:
+                    raise
+
+    def iter_tables(self, start=None, end=None, columns=None):
+        """Aralıkla kesişen bölümlerin dosyalarını sırayla (bellek eşlemeli) üret."""
+        lo = None if start is None else pd.Timestamp(start)
+        hi = None if end is None else pd.Timestamp(end)
+        for day in self.days(start, end):
+            for table in self._day_tables(day, columns):
+                if lo is not None or hi is not None:
+                    ts = table.column("timestamp").to_numpy(zero_copy_only=False)
+                    keep = np.ones(len(ts), dtype=bool)
+                    if lo is not None:
+                        keep &= ts >= lo.to_datetime64()
+                    if hi is not None:
+                        keep &= ts <= hi.to_datetime64()
+                    if not keep.all():
+                        table = table.filter(pa.array(keep))
+                if table.num_rows:
+                    yield table
+
+    def read(self, start=None, end=None, columns=None, ip_text: bool = True) -> pd.DataFrame:
+        """Aralıktaki alert'ler (zaman sırasıyla); ip_text=True ise srcip metin."""
+        tables = list(self.iter_tables(start, end, columns))
+        if not tables:
+            return self.to_frame(SCHEMA.empty_table().select(columns or SCHEMA.names), ip_text)
+        df = self.to_frame(pa.concat_tables(tables, promote_options="permissive"), ip_text)
+        if "timestamp" in df.columns:
+            df = df.sort_values("timestamp", kind="stable", ignore_index=True)
+        return df
+
+    # ---------------------------------------------------------------
+    # Birleştirme (compaction)
+    # ---------------------------------------------------------------
+    def compact(self, day: str = None, min_files: int = COMPACT_MIN_FILES,
+                min_age: float = COMPACT_MIN_AGE) -> int:
+        """
+        Bölüm(ler)in min_age'den eski dosyalarını birleştir → birleşen dosya
+        sayısı. day=None: tüm bölümler.
+        """
+        total = 0
+        now = time.time()
+        for d in ([day] if day else self.days()):
+            live = self.files(d)
+            ddir = self.day_dir(d)
+            old = [n for n in sorted(live)
+                   if now - os.path.getmtime(os.path.join(ddir, n)) >= min_age]
+            if len(old) < max(2, min_files):
+                continue
+            tables, sources = [], {}
+            for n in old:
+                t = pq.read_table(os.path.join(ddir, n), memory_map=True)
+                if "_part" not in t.column_names:
+                    t = t.append_column("_part", pa.array([n] * t.num_rows).dictionary_encode())
+                tables.append(t.cast(COMPACT_SCHEMA))
+                sources[n] = [p for parts in live[n].values() for p in parts]
+            merged = pa.concat_tables(tables, promote_options="permissive").cast(COMPACT_SCHEMA)
+            order = np.argsort(merged.column("timestamp").to_numpy(zero_copy_only=False), kind="stable")
+            self._write_file(merged.take(order), d, f"c-{_part_name()}", {"sources": sources})
+            for n in old:
+                try:
+                    os.remove(os.path.join(ddir, n))
+                except FileNotFoundError:
+                    pass
+            total += len(old)
+        return total
+
+    # ---------------------------------------------------------------
+    # Artımlı izleme
+    # ---------------------------------------------------------------
+    def tail(self) -> "StoreTail":
+        return StoreTail(self)
+
+    # ---------------------------------------------------------------
+    # CSV uyumluluğu
+    # ---------------------------------------------------------------
+    def iter_csv(self, start=None, end=None, chunk_rows: int = EXPORT_CHUNK_ROWS):
+        """
+        alerts.csv biçiminde (başlık dahil) CSV metin parçaları üret.
+        Geçersiz olarak saklanan srcip'ler "0.0.0.0" yazılır.
+        """
+        yield ",".join(ALERT_FIELDS) + "\n"
+        for table in self.iter_tables(start, end, ALERT_FIELDS):
+            for off in range(0, table.num_rows, chunk_rows):
+                df = self.to_frame(table.slice(off, chunk_rows))
+                df["timestamp"]   = df["timestamp"].dt.strftime(TS_FORMAT)
+                df["prob_attack"] = df["prob_attack"].map("{:.3f}".format)
+                yield df[ALERT_FIELDS].to_csv(index=False, header=False)
+
+    def export_csv(self, out_path: str, start=None, end=None) -> str:
+        tmp = out_path + ".tmp"
+        with open(tmp, "w", newline="", encoding="utf-8") as f:
+            for chunk in self.iter_csv(start, end):
+                f.write(chunk)
+        os.replace(tmp, out_path)
+        return out_path
+
+    def import_csv(self, csv_path: str, chunk_rows: int = EXPORT_CHUNK_ROWS) -> int:
+        """alerts.csv'yi depoya aktar → yazılan satır sayısı (düşürülenler dropped'da)."""
+        n = 0
+        for chunk in pd.read_csv(csv_path, chunksize=chunk_rows):
+            before = self.dropped
+            self.append(chunk)
+            n += len(chunk) - (self.dropped - before)
+        return n
+
+
+class StoreTail:
+    """
+    AlertStore için AlertTail arayüzü: refresh() yalnız görülmemiş parçaların
+    satırlarını döndürür. Gün başına görülen dosya adları tutulur; birleşik
+    bir dosya görülen kaynaklarının yerine geçer (kayıt küçük kalır).
+    Yalnız dizin değiştirilme zamanı değişen bölümler listelenir.
+    """
+
+    def __init__(self, store: AlertStore):
+        self.store = store
+        self.seen  = {}       # gün → {dosya adı}
+        self.mtime = {}       # gün → bölüm dizininin st_mtime_ns'i
+
+    def position(self) -> dict:
+        return {"seen": {d: sorted(s) for d, s in self.seen.items()}, "mtime": self.mtime}
+
+    def restore(self, pos: dict):
+        self.seen  = {d: set(s) for d, s in pos.get("seen", {}).items()}
+        self.mtime = dict(pos.get("mtime", {}))
+
+    def refresh(self) -> pd.DataFrame:
+        days = []
+        for day in self.store.days():
+            try:
+                m = os.stat(self.store.day_dir(day)).st_mtime_ns
+            except FileNotFoundError:
+                continue
+            if self.mtime.get(day) != m:
+                days.append(day)
+                self.mtime[day] = m     # listelemeden önce: sonraki değişiklik yeniden taranır
+        tables = []
+        for day in days:
+            seen = self.seen.setdefault(day, set())
+            for name, sources in sorted(self.store.files(day).items()):
+                if name in seen:
+                    continue
+                covered = {p for src, parts in sources.items() if src in seen for p in parts}
+                if len(covered) < sum(len(parts) for parts in sources.values()):
+                    try:
+                        tables.append(self.store._read_file(day, name, ALERT_FIELDS,
+                                                            skip_parts=covered))
+                    except FileNotFoundError:   # birleştirildi; bir sonraki turda
+                        continue
+                seen.difference_update(sources)
+                seen.add(name)
+        if not tables:
+            return pd.DataFrame(columns=ALERT_FIELDS)
+        df = self.store.to_frame(pa.concat_tables(tables, promote_options="permissive"))
+        return df.sort_values("timestamp", kind="stable", ignore_index=True)
+
+
+# -------------------------------------------------------------------
+# Yazıcı
+# -------------------------------------------------------------------
+class StoreAlertSink(AlertSink):
+    """
+    AlertSink ile aynı arayüz (write_alert / write / close); satırlar
+    PART_INTERVAL saniyede ya da PART_ROWS satırda bir AlertStore'a
+    parça olarak yazılır. Yazıcı iş parçacığı compact_interval saniyede bir
+    bölümleri birleştirir.
+    """
+
+    def __init__(self, root: str = STORE_DIR, flush_interval: float = 0.5,
+                 part_interval: float = PART_INTERVAL, part_rows: int = PART_ROWS,
+                 compact_interval: float = COMPACT_INTERVAL, **kwargs):
+        self.store            = AlertStore(root)
+        self.part_interval    = part_interval
+        self.part_rows        = part_rows
+        self.compact_interval = compact_interval
+        self._buf             = []
+        self._last_compact    = time.monotonic()
+        super().__init__(root, flush_interval=flush_interval, **kwargs)
+
+    def _open(self):
+        self._opened_at = time.monotonic()
+
+    def _write_batch(self, batch: list):
+        self._buf.extend(batch)
+        if len(self._buf) >= self.part_rows:
+            self._sync()
+
+    def _maintain(self):
+        now = time.monotonic()
+        if self._buf and now - self._last_sync >= self.part_interval:
+            self._sync()
+        if self.compact_interval and now - self._last_compact >= self.compact_interval:
+            self._last_compact = now
+            self.store.compact()
+
+    def _sync(self):
+        if self._buf:
+            rows, self._buf = self._buf, []
+            self.store.append_rows(rows)
+            self.rows_written += len(rows)
+        self._last_sync = time.monotonic()
+
+    def _finish(self):
+        try:
+            self._sync()
+        except (OSError, ValueError) as e:
+            print(" Alert yazma hatası:", e)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tarihe göre bölümlenmiş alert deposu")
+    parser.add_argument("--root", default=STORE_DIR)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    c = sub.add_parser("compact", help="küçük dosyaları birleştir")
+    c.add_argument("--day")
+    c.add_argument("--min-files", type=int, default=COMPACT_MIN_FILES)
+    c.add_argument("--min-age", type=float, default=COMPACT_MIN_AGE)
+    e = sub.add_parser("export", help="alerts.csv biçiminde dışa aktar")
+    e.add_argument("out")
+    e.add_argument("--start")
+    e.add_argument("--end")
+    i = sub.add_parser("import", help="alerts.csv'yi depoya aktar")
+    i.add_argument("csv")
+    args = parser.parse_args(argv)
+
+    store = AlertStore(args.root)
+    if args.cmd == "compact":
+        n = store.compact(args.day, args.min_files, args.min_age)
+        print(f"✓ {n} dosya birleştirildi")
+    elif args.cmd == "export":
+        store.export_csv(args.out, args.start, args.end)
+        print(f"✓ Dışa aktarıldı → {args.out}")
+    else:
+        n = store.import_csv(args.csv)
+        print(f"✓ {n:,} satır aktarıldı → {args.root}"
+              f"{f' ({store.dropped:,} satır geçersiz zaman damgası nedeniyle atlandı)' if store.dropped else ''}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,185 @@
+# alert_tail.py
+"""
+alerts.csv için artımlı (tail) okuyucu.
+
+Dashboard her yenilemede tüm dosyayı yeniden okuyup her zaman damgasını
+yeniden ayrıştırmak yerine AlertTail'i kullanır:
+  – Son okunan bayt konumu tutulur; yalnız sonradan eklenen tam satırlar
+    okunur (yarım kalmış son satır bir sonraki okumaya bırakılır).
+  – Yeni satırlar önbellekteki çerçeveye eklenir; zaman damgası sabit
+    biçimle (TS_FORMAT) ayrıştırılır.
+
+Dosya kimliği (inode + ilk FINGERPRINT_BYTES baytın özeti) her okumada
+denetlenir. Kimlik değişirse (AlertSink rotasyonu: dosya yeniden adlandırılıp
+yeni dosya açıldı) ya da dosya küçülürse (truncate / copytruncate) önbellek
+sıfırlanır ve yeni dosya baştan okunur. Böylece refresh() sonrasındaki
+çerçeve her zaman pd.read_csv(path)'in o anki sonucuna karşılık gelir.
+
+iter_csv(path, start, end) dışa aktarım içindir: dosyayı parça parça okuyup
+(isteğe bağlı zaman aralığına süzülmüş) CSV metin parçaları üretir.
+"""
+
+import io
+import os
+import hashlib
+import threading
+
+import pandas as pd
+
+TS_FORMAT         = "%Y-%m-%d %H:%M:%S"   # AlertSink.write_alert biçimi
+FINGERPRINT_BYTES = 4096
+READ_BLOCK        = 16 << 20              # tek seferde okunan en fazla bayt
+EXPORT_CHUNK_ROWS = 100_000
+
+
+def _fingerprint(f, n: int) -> str:
+    f.seek(0)
+    return hashlib.blake2b(f.read(n), digest_size=16).hexdigest()
+
+
+def parse_timestamps(s: pd.Series) -> pd.Series:
+    try:
+        return pd.to_datetime(s, format=TS_FORMAT)
+    except (ValueError, TypeError):
+        return pd.to_datetime(s, format="mixed", errors="coerce")
+
+
+class AlertTail:
+    """
+    path: izlenen CSV. refresh() yeni satırları okuyup çerçeveye ekler ve
+    yalnız yeni satırları (DataFrame) döndürür; frame tüm önbelleği verir.
+    keep_frame=False: çerçeve tutulmaz, refresh() yalnız yeni satırları
+    verir (ör. rollup beslemesi). position() / restore() okuma konumunu
+    kalıcı hâle getirmek için kullanılır. Birden fazla oturumdan aynı anda
+    çağrılabilir (kilitli).
+    """
+
+    def __init__(self, path: str, keep_frame: bool = True):
+        self.path       = path
+        self.keep_frame = keep_frame
+        self.frame      = pd.DataFrame()
+        self.resets     = 0
+        self._lock      = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.offset  = 0          # ayrıştırılmış son tam satırın sonu
+        self.header  = None
+        self._ino    = None
+        self._fp     = None       # ilk FINGERPRINT_BYTES baytın özeti
+        self._fp_len = 0
+        self.frame   = pd.DataFrame()
+
+    def position(self) -> dict:
+        """JSON'a yazılabilir okuma konumu (dosya kimliği + bayt konumu + başlık)."""
+        return {"offset": self.offset, "header": self.header,
+                "ino": list(self._ino) if self._ino else None,
+                "fp": self._fp, "fp_len": self._fp_len}
+
+    def restore(self, pos: dict):
+        """position() ile kaydedilen konumdan devam et (dosya değiştiyse ilk refresh sıfırlar)."""
+        with self._lock:
+            self._reset()
+            self.offset  = pos["offset"]
+            self.header  = pos["header"]
+            self._ino    = tuple(pos["ino"]) if pos["ino"] else None
+            self._fp     = pos["fp"]
+            self._fp_len = pos["fp_len"]
+
+    def _same_file(self, f, st) -> bool:
+        if self._ino is None:
+            return True
+        if (st.st_dev, st.st_ino) != self._ino or st.st_size < self.offset:
+            return False
+        return _fingerprint(f, self._fp_len) == self._fp
+
+    def _parse(self, data: bytes) -> pd.DataFrame:
+        if self.header is None:
+            df = pd.read_csv(io.BytesIO(data))
+            self.header = list(df.columns)
+        else:
+            df = pd.read_csv(io.BytesIO(data), header=None, names=self.header)
+        if "timestamp" in df.columns:
+            df["timestamp"] = parse_timestamps(df["timestamp"])
+            df["hour"]      = df["timestamp"].dt.hour
+            df["date"]      = df["timestamp"].dt.date
+        return df
+
+    def refresh(self) -> pd.DataFrame:
+        with self._lock:
+            try:
+                return self._refresh()
+            except Exception:
+                # Yarım kalan okuma: bir sonraki çağrı dosyayı baştan okur
+                self._reset()
+                raise
+
+    def _refresh(self) -> pd.DataFrame:
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            # Rotasyon anı: yeni dosya henüz açılmadı; önbellek korunur
+            return pd.DataFrame()
+        with f:
+            st = os.fstat(f.fileno())
+            if not self._same_file(f, st):
+                self._reset()
+                self.resets += 1
+            parts = []
+            while True:
+                f.seek(self.offset)
+                data = f.read(READ_BLOCK)
+                end = data.rfind(b"\n") + 1
+                if end == 0:
+                    break
+                if self.header is None and end == data.find(b"\n") + 1:
+                    # Yalnız başlık satırı: ayrıştırılacak veri yok
+                    self.header = pd.read_csv(io.BytesIO(data[:end])).columns.tolist()
+                else:
+                    parts.append(self._parse(data[:end]))
+                self.offset += end
+                if len(data) < READ_BLOCK:
+                    break
+            if self._ino is None and self.offset:
+                self._ino    = (st.st_dev, st.st_ino)
+                self._fp_len = min(self.offset, FINGERPRINT_BYTES)
+                self._fp     = _fingerprint(f, self._fp_len)
+            elif self._fp_len < FINGERPRINT_BYTES and self.offset > self._fp_len:
+                # Kimlik özeti dosya büyüdükçe FINGERPRINT_BYTES'a tamamlanır
+                self._fp_len = min(self.offset, FINGERPRINT_BYTES)
+                self._fp     = _fingerprint(f, self._fp_len)
+
+        if not parts:
+            return pd.DataFrame(columns=self.frame.columns)
+        new = parts[0] if len(parts) == 1 else pd.concat(parts, ignore_index=True)
+        if self.keep_frame:
+            self.frame = new if self.frame.empty else pd.concat([self.frame, new], ignore_index=True)
+        return new
+
+
+def iter_csv(path: str, start=None, end=None, chunk_rows: int = EXPORT_CHUNK_ROWS):
+    """
+    path'teki CSV'yi (başlık dahil) metin parçaları olarak üret; aralık
+    verilirse yalnız [start, end] içindeki satırlar. Alanlar metin olarak
+    okunur, değerler dosyadaki yazımıyla aynen yazılır.
+    """
+    if start is None and end is None:
+        with open(path, encoding="utf-8", newline="") as f:
+            while True:
+                data = f.read(READ_BLOCK)
+                if not data:
+                    return
+                yield data
+    header = True
+    for df in pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=chunk_rows):
+        ts = parse_timestamps(df["timestamp"])
+        ok = ts.notna()
+        if start is not None:
+            ok &= ts >= pd.Timestamp(start)
+        if end is not None:
+            ok &= ts <= pd.Timestamp(end)
+        if header or ok.any():
+            yield df[ok].to_csv(index=False, header=header)
+            header = False
+    if header:
+        yield ",".join(pd.read_csv(path, nrows=0).columns) + "\n"
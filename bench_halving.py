@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+bench_halving.py
+
+Stage-1 hiperparametre araması, aynı 10 örneklenmiş aday ve 3 fold ile:
+  – RandomizedSearchCV(n_jobs=-1): Pipeline (ön işleme + RF) her aday ×
+    fold için baştan eğitilir (eski yol, paralel taban çizgisi)
+  – HalvingSearch(n_jobs=1):  fold başına önbelleklenen ön işleme +
+    successive halving, tek çekirdek
+  – HalvingSearch(n_jobs=-1): aynısı, tur içi aday × fold paralel
+Her yol için süre, taban çizgisine göre hızlanma, en iyi parametreler ve
+test seti recall'u yazılır. Çekirdek sayısı da yazılır: paralel yolların
+kazancı çekirdek sayısıyla sınırlıdır.
+
+Kullanım (CSV'lerin olduğu dizinde):
+    python bench_halving.py
+    python bench_halving.py --rows 50000
+"""
+
+import os
+import time
+import argparse
+
+from sklearn.pipeline import Pipeline
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import StandardScaler, OneHotEncoder
+from sklearn.metrics import recall_score
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import RandomizedSearchCV, train_test_split
+
+from dataset_store import load_dataset
+from halving_search import HalvingSearch
+from hyperparameter_tuning_stage1 import PARAM_GRID, split_xy
+
+TRAIN_FILE   = "UNSW_NB15_training-set.csv"
+TEST_FILE    = "UNSW_NB15_testing-set.csv"
+N_ROWS       = 20_000
+N_CANDIDATES = 10
+
+
+def make_preproc_factory(X):
+    """hyperparameter_tuning_stage1 ile aynı ColumnTransformer'ı kuran fabrika."""
+    num_cols = X.select_dtypes(include=["number"]).columns.tolist()
+    cat_cols = X.select_dtypes(include=["object", "string", "category", "bool"]).columns.tolist()
+
+    def make_preproc():
+        return ColumnTransformer([
+            ("num", StandardScaler(), num_cols),
+            ("cat", OneHotEncoder(handle_unknown="ignore"), cat_cols)
+        ])
+    return make_preproc
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - t0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Halving araması vs RandomizedSearchCV")
+    parser.add_argument("--rows", type=int, default=N_ROWS)
+    args = parser.parse_args(argv)
+
+    train_df = load_dataset(TRAIN_FILE, compact=True)
+    if args.rows < len(train_df):
+        train_df, _ = train_test_split(train_df, train_size=args.rows, random_state=42,
+                                       stratify=train_df["label"])
+    X, y = split_xy(train_df)
+    X_test, y_test = split_xy(load_dataset(TEST_FILE))
+    make_preproc = make_preproc_factory(X)
+    rf = RandomForestClassifier(random_state=42, class_weight="balanced", n_jobs=-1)
+    print(f"› {len(X):,} eğitim satırı, {N_CANDIDATES} aday × 3 fold | çekirdek: {os.cpu_count()}")
+
+    def randomized():
+        pipe = Pipeline([("pre", make_preproc()), ("clf", rf)])
+        dist = {f"clf__{k}": v for k, v in PARAM_GRID.items()}
+        rs = RandomizedSearchCV(pipe, dist, n_iter=N_CANDIDATES, scoring="recall", cv=3,
+                                random_state=42, n_jobs=-1).fit(X, y)
+        return rs.best_estimator_, {k[5:]: v for k, v in rs.best_params_.items()}
+
+    def halving(n_jobs):
+        def run():
+            hs = HalvingSearch(make_preproc, rf, PARAM_GRID, scoring="recall", cv=3, factor=3,
+                               n_candidates=N_CANDIDATES, random_state=42, n_jobs=n_jobs,
+                               verbose=0).fit(X, y)
+            return hs.best_estimator_, hs.best_params_
+        return run
+
+    rows = []
+    for name, fn in [("RandomizedSearchCV (n_jobs=-1)", randomized),
+                     ("HalvingSearch (n_jobs=1)",       halving(1)),
+                     ("HalvingSearch (n_jobs=-1)",      halving(-1))]:
+        (model, params), secs = timed(fn)
+        rows.append((name, secs, recall_score(y_test, model.predict(X_test)), params))
+
+    base = rows[0][1]
+    print(f"\n{'yol':<32}{'süre (sn)':>10}{'hızlanma':>10}{'test recall':>13}  en iyi")
+    for name, secs, rec, params in rows:
+        print(f"{name:<32}{secs:>10.1f}{base / secs:>9.2f}x{rec:>13.4f}  {params}")
+
+
+if __name__ == "__main__":
+    main()
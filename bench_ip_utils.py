@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+bench_ip_utils.py
+
+Satır satır ipaddress dönüşümü ile ip_utils'in vektörel yolunun
+karşılaştırması (N_ROWS satırlık srcip sütunu):
+  – IP → int      : .apply(IPv4Address)      vs parse_ipv4
+  – IP → /24 CIDR : .map(ip_network(.../24)) vs to_cidr
+Ölçümden önce iki yolun sonuçlarının aynı olduğu doğrulanır.
+"""
+
+import time
+import ipaddress
+import numpy as np
+import pandas as pd
+
+from ip_utils import parse_ipv4, to_cidr
+
+N_ROWS    = 2_500_000
+N_UNIQUE  = 200_000     # yakalamalardaki gibi tekrar eden kaynak adresler
+N_INVALID = 1_000       # '-', boş ve bozuk değerler
+SEED      = 42
+
+
+def row_ip_to_int(ip):
+    try:
+        return int(ipaddress.IPv4Address(ip))
+    except ValueError:
+        return 0
+
+
+def row_to_cidr24(ip):
+    try:
+        net = ipaddress.ip_network(f"{ip}/24", strict=False)
+        return f"{net.network_address}/24"
+    except ValueError:
+        return "0.0.0.0/24"
+
+
+def make_column() -> pd.Series:
+    rng = np.random.default_rng(SEED)
+    octets = rng.integers(0, 256, size=(N_UNIQUE, 4))
+    octets[:, 0] = rng.integers(1, 224, size=N_UNIQUE)
+    pool = np.array([".".join(map(str, o)) for o in octets.tolist()], dtype=object)
+    col = pool[rng.integers(0, N_UNIQUE, size=N_ROWS)]
+    col[rng.integers(0, N_ROWS, size=N_INVALID)] = rng.choice(["-", "", "10.0.0.256", "01.2.3.4"],
+                                                              size=N_INVALID)
+    return pd.Series(col, name="srcip")
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t0
+
+
+def main():
+    col = make_column()
+    print(f"› {len(col):,} satır, {col.nunique():,} farklı adres")
+
+    ref_int, t_apply = timed(lambda s: s.apply(row_ip_to_int), col)
+    vec_int, t_parse = timed(lambda s: parse_ipv4(s.to_numpy()), col)
+    ref_net, t_map   = timed(lambda s: s.map(row_to_cidr24), col)
+    vec_net, t_cidr  = timed(lambda s: to_cidr(s.to_numpy(), 24), col)
+    print(f"› Aynı sonuç: int {np.array_equal(ref_int.to_numpy(), vec_int)} | "
+          f"cidr {np.array_equal(ref_net.to_numpy(dtype=object), vec_net)}")
+
+    print(f"\n{'işlem':<10}{'satır satır (sn)':>18}{'vektörel (sn)':>16}{'hızlanma':>10}")
+    for name, slow, fast in [("IP → int", t_apply, t_parse), ("IP → /24", t_map, t_cidr)]:
+        print(f"{name:<10}{slow:>18.2f}{fast:>16.2f}{slow / fast:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
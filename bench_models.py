@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+bench_models.py
+
+Aday modelleri doğrulukla birlikte çıkarım maliyetine göre karşılaştıran
+kıyaslama düzeneği (train_compare_models.py'nin genişletilmiş hâli).
+
+Veri bir kez ön işlenir (preprocess_data, sıkı tipler) ve geçici .npy
+dosyalarına yazılır. Adaylar paralel süreçlerde (spawn; süreç başına
+temiz bellek ölçümü) veriyi bellek eşlemeyle açıp eğitilir:
+  – Eğitim süresi ve eğitim sırasındaki tepe bellek (RSS)
+  – Kaydedilmiş model boyutu (model_store, sıkıştırmasız joblib)
+  – ROC-AUC (ovr) ve macro-F1
+Tüm eğitimler bittikten sonra kaydedilen modeller ana süreçte sırayla,
+tek çekirdekte zamanlanır (eğitimler gecikme ölçümünü bozmasın):
+  – Tek satır p50 / p99 gecikme (µs)
+  – BATCH_SIZES için verim (satır/sn)
+Sonuçlar OUT_PATH'e JSON satırları olarak eklenir (her satır: çalıştırma
+kimliği + ortam + aday + metrikler); çalıştırmalar arası karşılaştırma
+için aynı dosya pandas ile okunabilir.
+
+Kullanım:
+    python bench_models.py                    # tüm adaylar
+    python bench_models.py rf lgbm --workers 2
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+TRAIN_FILE  = "UNSW_NB15_training-set.csv"
+TEST_FILE   = "UNSW_NB15_testing-set.csv"
+OUT_PATH    = "reports/bench_models.jsonl"
+MODEL_DIR   = "models/bench"
+N_SINGLE    = 500
+BATCH_SIZES = [16, 256, 4096]
+SEED        = 42
+
+
+# -------------------------------------------------------------------
+# Adaylar: ad → () → eğitilmemiş model
+# -------------------------------------------------------------------
+def _rf():
+    from sklearn.ensemble import RandomForestClassifier
+    return RandomForestClassifier(n_estimators=100, random_state=SEED, class_weight="balanced")
+
+
+def _extra_trees():
+    from sklearn.ensemble import ExtraTreesClassifier
+    return ExtraTreesClassifier(n_estimators=100, random_state=SEED, class_weight="balanced")
+
+
+def _lgbm():
+    import lightgbm as lgb
+    return lgb.LGBMClassifier(n_estimators=100, random_state=SEED, class_weight="balanced",
+                              n_jobs=1, verbose=-1)
+
+
+class _Compiled:
+    """Eğitimden sonra ormanı tree_engine.CompiledForest'a çeviren aday."""
+
+    def __init__(self, make):
+        self.make = make
+
+    def fit(self, X, y):
+        from tree_engine import CompiledForest
+        self.forest_ = self.make().fit(X, y)
+        self.model_ = CompiledForest(self.forest_)
+        return self
+
+
+CANDIDATES = {
+    "rf":          _rf,
+    "rf_compiled": lambda: _Compiled(_rf),
+    "extra_trees": _extra_trees,
+    "lgbm":        _lgbm,
+}
+
+
+# -------------------------------------------------------------------
+# Ölçümler
+# -------------------------------------------------------------------
+def latencies_us(fn, rows) -> np.ndarray:
+    out = np.empty(len(rows))
+    for i, row in enumerate(rows):
+        t0 = time.perf_counter()
+        fn(row)
+        out[i] = (time.perf_counter() - t0) * 1e6
+    return out
+
+
+def throughput(fn, X, batch_size) -> float:
+    t0 = time.perf_counter()
+    for i in range(0, len(X), batch_size):
+        fn(X[i:i + batch_size])
+    return len(X) / (time.perf_counter() - t0)
+
+
+def fit_candidate(name: str, data_dir: str) -> dict:
+    """Alt süreçte: eğit, kaydet, doğruluk ölç → metrikler + model yolu."""
+    from sklearn.metrics import f1_score, roc_auc_score
+    from model_store import save_model
+    from train_pipeline import PeakMemory
+
+    X_train = np.load(os.path.join(data_dir, "X_train.npy"), mmap_mode="r")
+    y_train = np.load(os.path.join(data_dir, "y_train.npy"))
+    X_test  = np.load(os.path.join(data_dir, "X_test.npy"))
+    y_test  = np.load(os.path.join(data_dir, "y_test.npy"))
+
+    est = CANDIDATES[name]()
+    t0 = time.perf_counter()
+    with PeakMemory() as mem:
+        est.fit(X_train, y_train)
+    fit_s = time.perf_counter() - t0
+    # Tahmin tek çekirdekte: gecikme süreçler arasında karşılaştırılabilir olsun
+    model = getattr(est, "model_", est)
+    if hasattr(model, "n_jobs"):
+        model.n_jobs = 1
+
+    os.makedirs(MODEL_DIR, exist_ok=True)
+    path = os.path.join(MODEL_DIR, f"{name}.joblib")
+    save_model(model, path)
+
+    proba = model.predict_proba(X_test)
+    classes = getattr(est, "forest_", model).classes_
+    y_pred = np.asarray(classes)[proba.argmax(axis=1)]
+    present = np.isin(classes, np.unique(y_test))
+    if present.all():
+        auc = roc_auc_score(y_test, proba, multi_class="ovr", labels=classes)
+    else:
+        # Testte olmayan sınıflar: kalan sütunlar yeniden normalize edilir
+        p = proba[:, present]
+        auc = roc_auc_score(y_test, p / p.sum(axis=1, keepdims=True),
+                            multi_class="ovr", labels=np.asarray(classes)[present])
+
+    return {
+        "model":       name,
+        "path":        path,
+        "fit_s":       round(fit_s, 3),
+        "fit_peak_rss_mb": round(mem.peak, 1),
+        "size_mb":     round(os.path.getsize(path) / 2**20, 3),
+        "roc_auc_ovr": round(float(auc), 5),
+        "f1_macro":    round(float(f1_score(y_test, y_pred, average="macro")), 5),
+    }
+
+
+def time_model(path: str, X_test: np.ndarray) -> dict:
+    """Kaydedilmiş modelin tek satır gecikmesi ve batch verimi."""
+    from model_store import load_model
+
+    model = load_model(path, mmap=False)
+    rng  = np.random.default_rng(SEED)
+    rows = [X_test[i:i + 1] for i in rng.integers(0, len(X_test), N_SINGLE)]
+    model.predict_proba(rows[0])        # ısınma
+    lat = latencies_us(model.predict_proba, rows)
+    return {
+        "p50_us": round(float(np.percentile(lat, 50)), 1),
+        "p99_us": round(float(np.percentile(lat, 99)), 1),
+        **{f"rows_per_s_{bs}": round(throughput(model.predict_proba, X_test, bs))
+           for bs in BATCH_SIZES},
+    }
+
+
+# -------------------------------------------------------------------
+# Düzenleyici
+# -------------------------------------------------------------------
+def prepare_data(data_dir: str, train_file: str = TRAIN_FILE, test_file: str = TEST_FILE) -> dict:
+    """Ön işlenmiş veriyi float32 .npy olarak yaz → boyut bilgisi."""
+    from data_utils import preprocess_data
+    from dataset_store import load_dataset
+
+    X_train, y_train, X_test, y_test = preprocess_data(
+        load_dataset(train_file, normalize=False, compact=True),
+        load_dataset(test_file, normalize=False, compact=True), compact=True)
+    for tag, X, y in (("train", X_train, y_train), ("test", X_test, y_test)):
+        np.save(os.path.join(data_dir, f"X_{tag}.npy"), X.to_numpy(dtype=np.float32))
+        np.save(os.path.join(data_dir, f"y_{tag}.npy"), y.to_numpy())
+    return {"n_train": len(X_train), "n_test": len(X_test), "n_features": X_train.shape[1]}
+
+
+def environment() -> dict:
+    import sklearn
+    return {"python": platform.python_version(), "sklearn": sklearn.__version__,
+            "machine": platform.machine(), "cpu_count": os.cpu_count()}
+
+
+def run(names, workers: int, out_path: str = OUT_PATH) -> list:
+    data_dir = tempfile.mkdtemp(prefix="bench_models_")
+    try:
+        data = prepare_data(data_dir)
+        print(f"› {data['n_train']:,} eğitim / {data['n_test']:,} test satırı, "
+              f"{data['n_features']} özellik | {len(names)} aday, {workers} süreç")
+        ctx = mp.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            futures = {name: pool.submit(fit_candidate, name, data_dir) for name in names}
+            results = []
+            for name, fut in futures.items():
+                try:
+                    results.append(fut.result())
+                except Exception as e:   # bir adayın hatası diğerlerini durdurmasın
+                    print(f"✗ {name}: {e!r}")
+        X_test = np.load(os.path.join(data_dir, "X_test.npy"))
+        for rec in results:
+            rec.update(time_model(rec.pop("path"), X_test))
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    run_info = {"run": time.strftime("%Y-%m-%dT%H:%M:%S"), "workers": workers,
+                **environment(), **data}
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    with open(out_path, "a", encoding="utf-8") as f:
+        for rec in results:
+            f.write(json.dumps({**run_info, **rec}) + "\n")
+    return results
+
+
+def print_table(results: list):
+    import pandas as pd
+    if results:
+        print("\n" + pd.DataFrame(results).set_index("model").T.to_string())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Model karşılaştırma kıyaslaması")
+    parser.add_argument("models", nargs="*", help=f"adaylar: {', '.join(CANDIDATES)} (varsayılan: hepsi)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="paralel süreç sayısı (varsayılan: min(aday, çekirdek))")
+    parser.add_argument("--out", default=OUT_PATH, help="JSON satırları çıktısı")
+    args = parser.parse_args(argv)
+
+    names = args.models or list(CANDIDATES)
+    unknown = [n for n in names if n not in CANDIDATES]
+    if unknown:
+        parser.error(f"bilinmeyen aday: {', '.join(unknown)}")
+    workers = args.workers or max(1, min(len(names), os.cpu_count() or 1))
+
+    results = run(names, workers, args.out)
+    print_table(results)
+    print(f"\n✓ {len(results)} sonuç eklendi → {args.out}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+bench_tree_engine.py
+
+Derlenmiş ağaç motoru ile sklearn pipeline'ının Stage-1 gecikme karşılaştırması:
+  – Tek satır p50 / p99 gecikme (µs)
+  – Farklı batch boyutlarında verim (satır/sn)
+Ölçümden önce iki yolun olasılıklarının birebir aynı olduğu doğrulanır.
+"""
+
+import time
+import numpy as np
+import pandas as pd
+
+from model_store import load_model
+from tree_engine import compile_pipeline, verify
+
+MODEL_FILE  = "stage1_binary_pipe.joblib"
+TEST_FILE   = "UNSW_NB15_testing-set.csv"
+N_SINGLE    = 500
+BATCH_SIZES = [16, 64, 256, 1024]
+
+
+def latencies_us(fn, items) -> np.ndarray:
+    out = np.empty(len(items))
+    for i, item in enumerate(items):
+        t0 = time.perf_counter()
+        fn(item)
+        out[i] = (time.perf_counter() - t0) * 1e6
+    return out
+
+
+def throughput(fn, batches) -> float:
+    n = sum(len(b) for b in batches)
+    t0 = time.perf_counter()
+    for b in batches:
+        fn(b)
+    return n / (time.perf_counter() - t0)
+
+
+def main():
+    pipe = load_model(MODEL_FILE, mmap=False)
+    clf  = pipe.steps[-1][1]
+    clf.n_jobs = 1      # karşılaştırma tek çekirdek ve deterministik toplama sırasıyla
+    compiled = compile_pipeline(pipe)
+
+    df = pd.read_csv(TEST_FILE, nrows=max(BATCH_SIZES) * 4)
+    df.columns = df.columns.str.strip().str.lower()
+    X_raw   = df.drop(columns=["label", "attack_cat"], errors="ignore")
+    records = X_raw.to_dict("records")
+    print(f"› Birebir aynı: {verify(pipe, compiled, X_raw)}")
+
+    rows = [X_raw.iloc[[i]] for i in range(N_SINGLE)]
+    sk  = latencies_us(pipe.predict_proba, rows)
+    eng = latencies_us(lambda r: compiled.predict_proba([r]), records[:N_SINGLE])
+    print(f"\n{'tek satır':<12}{'p50 (µs)':>12}{'p99 (µs)':>12}")
+    print(f"{'sklearn':<12}{np.percentile(sk, 50):>12.1f}{np.percentile(sk, 99):>12.1f}")
+    print(f"{'motor':<12}{np.percentile(eng, 50):>12.1f}{np.percentile(eng, 99):>12.1f}")
+
+    print(f"\n{'batch':<8}{'sklearn (satır/sn)':>20}{'motor (satır/sn)':>20}")
+    for bs in BATCH_SIZES:
+        frames = [X_raw.iloc[i:i + bs] for i in range(0, len(X_raw), bs)]
+        lists  = [records[i:i + bs] for i in range(0, len(records), bs)]
+        print(f"{bs:<8}{throughput(pipe.predict_proba, frames):>20.0f}"
+              f"{throughput(compiled.predict_proba, lists):>20.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+bench_vectorizer.py
+
+Dinleyicinin kayıt başına hazırlama + Stage-1 skorlama maliyetini ölçer:
+  – Eski yol:  pd.DataFrame([obj]) + sütun normalizasyonu + pipe.predict_proba
+  – Yeni yol:  FeatureVectorizer.transform_one + clf.predict_proba
+Ayrıca iki yolun olasılıklarının birebir aynı olduğunu doğrular.
+"""
+
+import time
+import joblib
+import numpy as np
+import pandas as pd
+
+from feature_vectorizer import FeatureVectorizer
+
+MODEL_FILE = "stage1_binary_pipe.joblib"
+TEST_FILE  = "UNSW_NB15_testing-set.csv"
+N_RECORDS  = 2000
+
+
+def per_record_us(fn, records) -> float:
+    t0 = time.perf_counter()
+    for rec in records:
+        fn(rec)
+    return (time.perf_counter() - t0) / len(records) * 1e6
+
+
+def main():
+    pipe = joblib.load(MODEL_FILE)
+    vec  = FeatureVectorizer(pipe)
+    clf  = vec.estimator
+
+    df = pd.read_csv(TEST_FILE, nrows=N_RECORDS)
+    df.columns = df.columns.str.strip().str.lower()
+    records = df.drop(columns=["label", "attack_cat"], errors="ignore").to_dict("records")
+    print(f"› {len(records)} kayıt, {len(vec.numeric_cols)} sayısal + "
+          f"{len(vec.categorical_cols)} kategorik → {vec.n_features_out} özellik")
+
+    def old_prepare(obj):
+        df_raw = pd.DataFrame([obj])
+        df_raw.columns = df_raw.columns.str.strip().str.lower()
+        return df_raw
+
+    def old_score(obj):
+        return pipe.predict_proba(old_prepare(obj))[0, 1]
+
+    def new_score(obj):
+        return clf.predict_proba(vec.transform_one(obj))[0, 1]
+
+    # Doğruluk: iki yol aynı olasılığı vermeli
+    p_old = pipe.predict_proba(pd.DataFrame(records))[:, 1]
+    p_new = clf.predict_proba(vec.transform(records))[:, 1]
+    print(f"› Olasılıklar birebir aynı: {np.array_equal(p_old, p_new)}")
+
+    rows = [
+        ("hazırlama",  per_record_us(old_prepare, records), per_record_us(vec.transform_one, records)),
+        ("skorlama",   per_record_us(old_score,   records), per_record_us(new_score,        records)),
+    ]
+    print(f"\n{'adım':<12}{'DataFrame (µs)':>16}{'vektörleyici (µs)':>20}{'hızlanma':>10}")
+    for name, old, new in rows:
+        print(f"{name:<12}{old:>16.1f}{new:>20.1f}{old / new:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
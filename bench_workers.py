@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+bench_workers.py
+
+tcp_listener'ın çok çekirdekli modunun (WorkerPool + process_lines) uçtan
+uca verimi. N_FLOWS JSON satırı, dinleyicideki gibi RECV_SIZE'lık parçalar
+hâlinde çerçevelenir (çözülmeden), srcip /24'üne göre işçilere dağıtılır;
+işçiler çözme, anomali kontrolü, kurallar ve skorlamayı yapar, alert'ler
+ana süreçte sayılır. WORKER_COUNTS'taki her işçi sayısı için:
+  – verim (akış/sn) ve 1 işçiye göre hızlanma
+  – ana sürecin akış başına CPU süresi (çerçeveleme + srcip okuma + shard +
+    kuyruğa gönderme + alert toplama). 1 / bu süre, işçi sayısından
+    bağımsız üst sınırdır: ana süreç tek çekirdekte seri çalışır.
+Çekirdek sayısından fazla işçi doğrusal ölçeklenemez; os.cpu_count() de
+yazılır.
+
+Kullanım (model dosyalarının olduğu dizinde):
+    python bench_workers.py
+    python bench_workers.py --workers 1 2 4 --flows 50000
+"""
+
+import os
+import time
+import json
+import argparse
+
+import pandas as pd
+
+import tcp_listener as tl
+from inference_workers import WorkerPool
+from line_framer import LineFramer, peek_field
+from ip_utils import cidr
+
+TEST_FILE     = "UNSW_NB15_testing-set.csv"
+N_FLOWS       = 100_000
+WORKER_COUNTS = [1, 2, 4, 8, 16]
+
+
+def make_lines(n: int) -> bytes:
+    """Test setinden n akışlık JSON satırları (srcip'ler çok sayıda /24'e yayılır)."""
+    df = pd.read_csv(TEST_FILE, nrows=n)
+    df.columns = df.columns.str.strip().str.lower()
+    df = df.drop(columns=["label", "attack_cat", "id"], errors="ignore")
+    df = pd.concat([df] * (n // len(df) + 1), ignore_index=True).iloc[:n]
+    i = df.index.to_numpy()
+    df["srcip"] = [f"10.{a % 251}.{b % 256}.{c % 254 + 1}" for a, b, c in zip(i, i // 251, i // 7)]
+    return "".join(json.dumps(r) + "\n" for r in df.to_dict("records")).encode()
+
+
+def run(data: bytes, n_workers: int) -> dict:
+    alerts = []
+    pool = WorkerPool(n_workers, tl.process_lines, lambda *a: alerts.append(1),
+                      init_fn=tl.init_worker,
+                      shard_key=lambda line: cidr(peek_field(line, "srcip")))
+    framer = LineFramer(tl.MAX_LINE_BYTES, raw=True)
+    t0, c0 = time.perf_counter(), time.process_time()
+    batch = []
+    for off in range(0, len(data), tl.RECV_SIZE):
+        batch += framer.feed(data[off:off + tl.RECV_SIZE])
+        while len(batch) >= tl.BATCH_SIZE:
+            pool.submit(batch[:tl.BATCH_SIZE])
+            batch = batch[tl.BATCH_SIZE:]
+    pool.submit(batch)
+    pool.close()
+    wall, cpu = time.perf_counter() - t0, time.process_time() - c0
+    return {"flows": framer.lines, "wall": wall, "main_cpu": cpu, "alerts": len(alerts)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Çok çekirdekli dinleyici verimi")
+    parser.add_argument("--workers", type=int, nargs="+", default=WORKER_COUNTS)
+    parser.add_argument("--flows", type=int, default=N_FLOWS)
+    args = parser.parse_args(argv)
+
+    tl.FLOW_LOG = False                 # stdout ölçümü bozmasın (işçiler devralır)
+    data = make_lines(args.flows)
+    print(f"› {args.flows:,} akış, {len(data) / 2**20:.1f} MB | çekirdek: {os.cpu_count()}")
+
+    rows, base = [], None
+    for n in args.workers:
+        r = run(data, n)
+        rate = r["flows"] / r["wall"]
+        base = base or rate
+        rows.append((n, rate, rate / base, r["main_cpu"] / r["flows"] * 1e6, r["alerts"]))
+
+    print(f"\n{'işçi':>5}{'akış/sn':>12}{'hızlanma':>10}{'ana CPU (µs/akış)':>20}{'ana süreç tavanı':>18}{'alert':>8}")
+    for n, rate, speedup, main_us, n_alerts in rows:
+        print(f"{n:>5}{rate:>12,.0f}{speedup:>9.2f}x{main_us:>20.1f}{1e6 / main_us:>18,.0f}{n_alerts:>8}")
+
+
+if __name__ == "__main__":
+    main()
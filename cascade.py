@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+cascade.py
+
+Tek artefaktta birleştirilmiş iki aşamalı (Stage-1 → Stage-2) sınıflandırıcı.
+
+İki stage pipeline'ı ayrı ayrı çağrıldığında Stage-2, Stage-1'in az önce
+dönüştürdüğü ham satır üzerinde kendi ColumnTransformer'ını yeniden
+çalıştırır. TwoStageCascade ham girdiyi bir kez hazırlar:
+  – Her iki stage'in sayısal sütunlarının birleşimi tek bir float64 matrise,
+  – Kategorik sütunlar ortak sözlükle tamsayı kodlarına
+yazılır. Her stage'in özellik matrisi bu ortak girdiden indeks seçimi,
+StandardScaler sabitleri ve kod → one-hot sütun tablolarıyla üretilir.
+Stage-1 olasılığı modelle birlikte kaydedilen eşikle karşılaştırılır ve
+Stage-2 yalnızca eşiği geçen satırlarda çalışır.
+
+Sonuçlar iki pipeline'ın ayrı ayrı çağrılmasıyla birebir aynıdır.
+"""
+
+import numpy as np
+import pandas as pd
+
+from feature_vectorizer import FeatureVectorizer
+from model_store import save_model, load_model
+
+CASCADE_PATH      = "models/cascade.joblib"
+DEFAULT_THRESHOLD = 0.6
+
+
+def _normalize_label(label):
+    if label in ["-", "", None]:
+        return "Normal"
+    return label
+
+
+class _StageLayout:
+    """Bir stage'in ortak hazırlanmış girdiden özellik matrisine eşlemesi."""
+
+    def __init__(self, vec: FeatureVectorizer, num_index: dict, cat_index: dict, cat_vocab: list):
+        layout = vec.layout()
+        self.estimator = vec.estimator
+        self.classes_  = vec.classes_
+        self.n_out     = layout["n_features_out"]
+        numeric = layout["numeric"]
+        self.num_src = np.array([num_index[c] for c, *_ in numeric], dtype=np.intp)
+        self.num_pos = np.array([p for _, p, *_ in numeric], dtype=np.intp)
+        self.mean    = np.array([m for _, _, m, _, _ in numeric], dtype=np.float64)
+        self.scale   = np.array([s for _, _, _, s, _ in numeric], dtype=np.float64)
+        # Ortak kod → bu stage'in one-hot sütunu (-1 = sözlükte yok)
+        self.cat_luts = []
+        for c, _, vocab in layout["categorical"]:
+            k = cat_index[c]
+            lut = np.full(len(cat_vocab[k]) + 1, -1, dtype=np.intp)
+            for v, col in vocab.items():
+                lut[cat_vocab[k][v]] = col
+            self.cat_luts.append((k, lut))
+
+    def matrix(self, raw_num: np.ndarray, raw_cat: np.ndarray) -> np.ndarray:
+        X = np.zeros((raw_num.shape[0], self.n_out), dtype=np.float64)
+        if len(self.num_pos):
+            X[:, self.num_pos] = (raw_num[:, self.num_src] - self.mean) / self.scale
+        for k, lut in self.cat_luts:
+            cols = lut[raw_cat[:, k]]
+            hit  = np.flatnonzero(cols >= 0)
+            X[hit, cols[hit]] = 1.0
+        return X
+
+
+class TwoStageCascade:
+    """
+    stage1 / stage2: FeatureVectorizer (estimator sklearn ormanı ya da
+    tree_engine.CompiledForest olabilir). threshold: Stage-1 karar eşiği.
+
+    predict(records) → (prob_attack, is_attack, attack_type)
+      records     : JSON kayıt listesi ya da DataFrame
+      prob_attack : float64 dizisi
+      is_attack   : bool dizisi (prob_attack > threshold)
+      attack_type : object dizisi; saldırı olmayan satırlarda None
+    """
+
+    def __init__(self, stage1: FeatureVectorizer, stage2: FeatureVectorizer,
+                 threshold: float = DEFAULT_THRESHOLD):
+        self.threshold = float(threshold)
+        lay1, lay2 = stage1.layout(), stage2.layout()
+
+        # Sayısal sütunların birleşimi (sıra: önce Stage-1)
+        self.numeric_cols, self.numeric_defaults = [], []
+        for c, _, _, _, d in lay1["numeric"] + lay2["numeric"]:
+            if c not in self.numeric_cols:
+                self.numeric_cols.append(c)
+                self.numeric_defaults.append(d)
+        # Kategorik sütunlar: ortak sözlük, kod 0 = bilinmeyen değer
+        self.categorical_cols, self.categorical_defaults, self._cat_vocab = [], [], []
+        for c, d, vocab in lay1["categorical"] + lay2["categorical"]:
+            if c not in self.categorical_cols:
+                self.categorical_cols.append(c)
+                self.categorical_defaults.append(d)
+                self._cat_vocab.append({})
+            codes = self._cat_vocab[self.categorical_cols.index(c)]
+            for v in vocab:
+                codes.setdefault(v, len(codes) + 1)
+
+        num_index = {c: i for i, c in enumerate(self.numeric_cols)}
+        cat_index = {c: i for i, c in enumerate(self.categorical_cols)}
+        self.stage1 = _StageLayout(stage1, num_index, cat_index, self._cat_vocab)
+        self.stage2 = _StageLayout(stage2, num_index, cat_index, self._cat_vocab)
+        classes = list(self.stage1.classes_)
+        self._attack_col = classes.index(1) if 1 in classes else len(classes) - 1
+
+    @classmethod
+    def from_pipelines(cls, stage1_pipe, stage2_pipe, threshold: float = DEFAULT_THRESHOLD,
+                       compile_trees: bool = True):
+        """
+        İki eğitilmiş stage pipeline'ından kaskad kur. compile_trees=True ise
+        ormanlar tree_engine ile düzleştirilir (desteklenmiyorsa sklearn kalır).
+        """
+        stages = [FeatureVectorizer(stage1_pipe), FeatureVectorizer(stage2_pipe)]
+        if compile_trees:
+            from tree_engine import CompiledForest
+            for vec in stages:
+                try:
+                    vec.estimator = CompiledForest(vec.estimator)
+                except (ValueError, AttributeError):
+                    pass
+        return cls(*stages, threshold=threshold)
+
+    # ---------------------------------------------------------------
+    def prepare(self, records):
+        """Ham girdiyi bir kez hazırla: (sayısal matris, kategorik kod matrisi)."""
+        if isinstance(records, pd.DataFrame):
+            return self._prepare_frame(records)
+        n = len(records)
+        raw_num = np.empty((n, len(self.numeric_cols)), dtype=np.float64)
+        raw_cat = np.zeros((n, len(self.categorical_cols)), dtype=np.intp)
+        num_spec = list(zip(self.numeric_cols, self.numeric_defaults))
+        cat_spec = list(zip(self.categorical_cols, self.categorical_defaults, self._cat_vocab))
+        for i, obj in enumerate(records):
+            get = obj.get
+            if any(k != k.strip().lower() for k in obj):
+                norm = {k.strip().lower(): v for k, v in obj.items()}
+                get  = norm.get
+            row = raw_num[i]
+            for j, (c, d) in enumerate(num_spec):
+                v = get(c)
+                row[j] = d if v is None else v
+            codes = raw_cat[i]
+            for k, (c, d, vocab) in enumerate(cat_spec):
+                codes[k] = vocab.get(get(c, d), 0)
+        return raw_num, raw_cat
+
+    def _prepare_frame(self, df: pd.DataFrame):
+        df = df.rename(columns=lambda c: str(c).strip().lower())
+        n = len(df)
+        raw_num = np.empty((n, len(self.numeric_cols)), dtype=np.float64)
+        raw_cat = np.zeros((n, len(self.categorical_cols)), dtype=np.intp)
+        for j, (c, d) in enumerate(zip(self.numeric_cols, self.numeric_defaults)):
+            raw_num[:, j] = df[c].to_numpy(dtype=np.float64) if c in df else d
+        for k, (c, d, vocab) in enumerate(zip(self.categorical_cols,
+                                              self.categorical_defaults, self._cat_vocab)):
+            if c in df:
+                raw_cat[:, k] = df[c].map(vocab).fillna(0).to_numpy(dtype=np.intp)
+            else:
+                raw_cat[:, k] = vocab.get(d, 0)
+        return raw_num, raw_cat
+
+    def predict(self, records):
+        raw_num, raw_cat = self.prepare(records)
+        n = raw_num.shape[0]
+        X1 = self.stage1.matrix(raw_num, raw_cat)
+        prob_attack = self.stage1.estimator.predict_proba(X1)[:, self._attack_col]
+        is_attack   = prob_attack > self.threshold
+        attack_type = np.full(n, None, dtype=object)
+        idx = np.flatnonzero(is_attack)
+        if idx.size:
+            X2 = self.stage2.matrix(raw_num[idx], raw_cat[idx])
+            attack_type[idx] = [_normalize_label(lbl)
+                                for lbl in self.stage2.estimator.predict(X2)]
+        return prob_attack, is_attack, attack_type
+
+    def predict_one(self, obj: dict):
+        """Tek kayıt için (prob_attack, is_attack, attack_type)."""
+        prob, dec, att = self.predict([obj])
+        return float(prob[0]), bool(dec[0]), att[0]
+
+
+def export_cascade(stage1_pipe, stage2_pipe, path: str = CASCADE_PATH,
+                   threshold: float = DEFAULT_THRESHOLD) -> TwoStageCascade:
+    cascade = TwoStageCascade.from_pipelines(stage1_pipe, stage2_pipe, threshold)
+    save_model(cascade, path)
+    return cascade
+
+
+def load_cascade(path: str = CASCADE_PATH, mmap: bool = True) -> TwoStageCascade:
+    return load_model(path, mmap=mmap)
+
+
+def verify(stage1_pipe, stage2_pipe, cascade: TwoStageCascade, X_raw: pd.DataFrame) -> bool:
+    """İki pipeline'ın ayrı çağrılmasıyla (n_jobs=1) kaskadın birebir aynı olduğunu doğrula."""
+    clfs = [p.steps[-1][1] for p in (stage1_pipe, stage2_pipe)]
+    saved = [getattr(c, "n_jobs", None) for c in clfs]
+    for c in clfs:
+        c.n_jobs = 1
+    try:
+        ref_prob = stage1_pipe.predict_proba(X_raw)[:, cascade._attack_col]
+        ref_att  = ref_prob > cascade.threshold
+        ref_type = np.full(len(X_raw), None, dtype=object)
+        if ref_att.any():
+            ref_type[ref_att] = [_normalize_label(l) for l in stage2_pipe.predict(X_raw[ref_att])]
+    finally:
+        for c, n_jobs in zip(clfs, saved):
+            c.n_jobs = n_jobs
+    ok = True
+    for inp in (X_raw.to_dict("records"), X_raw):
+        prob, dec, att = cascade.predict(inp)
+        ok &= (np.array_equal(prob, ref_prob) and np.array_equal(dec, ref_att)
+               and list(att) == list(ref_type))
+    return bool(ok)
+
+
+def main():
+    # Betik olarak çalışınca sınıflar __main__ altında pickle'lanmasın
+    import cascade as mod
+
+    stage1_pipe = load_model("stage1_binary_pipe.joblib", mmap=False)
+    stage2_pipe = load_model("models/stage2_pipe.joblib", mmap=False)
+    cascade = mod.export_cascade(stage1_pipe, stage2_pipe, CASCADE_PATH, DEFAULT_THRESHOLD)
+
+    test_df = pd.read_csv("UNSW_NB15_testing-set.csv", nrows=5000)
+    test_df.columns = test_df.columns.str.strip().str.lower()
+    X_raw = test_df.drop(columns=["label", "attack_cat"], errors="ignore")
+    ok = mod.verify(stage1_pipe, stage2_pipe, cascade, X_raw)
+    print(f"✓ Kaskad kaydedildi → {CASCADE_PATH} | eşik {cascade.threshold} | "
+          f"{len(cascade.numeric_cols)} sayısal + {len(cascade.categorical_cols)} kategorik "
+          f"ortak girdi | birebir aynı: {ok}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,72 @@
 # data_utils.py
 
-import io
-import ipaddress
+import os
+import json
+import numpy as np
 import pandas as pd
-from google.cloud import storage
 from sklearn.preprocessing import LabelEncoder, StandardScaler
 
+from ip_utils import parse_ipv4
+from frame_schema import compact_frame
+from gcs_loader import load_csv
+from rule_engine import RULES, RuleEngine
+
 
 
 def load_csv_from_gcs(bucket_name, file_name):
     """
-    GCS'den CSV dosyası indirip DataFrame döndürür.
+    GCS'den CSV dosyasını parça parça akıtarak okuyup DataFrame döndürür.
+    Nesne (bucket, ad, generation) anahtarıyla yerel diske önbelleklenir;
+    değişmemiş nesne yeniden indirilmez (bkz. gcs_loader).
     """
-    client = storage.Client()
-    bucket = client.bucket(bucket_name)
-    blob = bucket.blob(file_name)
-    data = blob.download_as_bytes()
-    df = pd.read_csv(io.BytesIO(data))
-    return df
+    return load_csv(bucket_name, file_name)
+
+SELECTED_FEATURES = [
+    "srcip", "dstip", "proto", "service", "state", "dur",
+    "sbytes", "dbytes", "sttl", "dttl", "sloss", "dloss",
+    "sinpkt", "dinpkt", "sjit", "djit", "swin", "dwin",
+    "stcpb", "dtcpb", "smeansz", "dmeansz", "trans_depth",
+    "res_bdy_len", "ct_state_ttl", "ct_flw_http_mthd",
+    "is_ftp_login", "ct_ftp_cmd", "ct_srv_src", "ct_srv_dst",
+    "ct_dst_ltm", "ct_src_ltm", "ct_src_dport_ltm",
+    "ct_dst_sport_ltm", "ct_dst_src_ltm",
+    "attack_cat",  # yeniden dahil edildi
+    "label"
+]
+
+# kural-bazlı sütunları da modele sokmak için listeye ekleyelim
+RULE_FEATURES = [r["name"] for r in RULES]
+SELECTED_FEATURES += RULE_FEATURES
+
+# Kural sütunları (vektörel) – tanımlar rule_engine.RULES
+rule_engine = RuleEngine()
+
+# object tipindeyse LabelEncoder uygulanan sütunlar
+CAT_CANDIDATES = ["proto", "service", "state", "attack_cat"]
+
 
-def ip_to_int(ip_str):
-    try:
-        return int(ipaddress.IPv4Address(ip_str))
-    except:
-        return 0
+def _is_text(series):
+    """object ya da (pandas 3'ün varsayılanı) str tipli metin sütunu mu?"""
+    return series.dtype == "object" or pd.api.types.is_string_dtype(series.dtype)
 
-def preprocess_data(train_df, test_df):
+
+def _select_features(df, ip_dtype="int64"):
+    """Eksik sütunları sıfırla doldur, kural sütunlarını ekle, seç ve IP'leri sayıya çevir."""
+    for col in SELECTED_FEATURES:
+        if col not in df.columns:
+            df[col] = 0
+    # Domain-bazlı (kural tabanlı) özellik mühendisliği
+    rule_engine.add_columns(df)
+
+    # Sadece bu sütunları kullan
+    out = df[SELECTED_FEATURES].copy()
+    # IP adreslerini sayıya çevir (vektörel; geçersizler 0)
+    for col in ["srcip", "dstip"]:
+        out[col] = parse_ipv4(out[col].to_numpy()).astype(ip_dtype)
+    return out
+
+
+def preprocess_data(train_df, test_df, compact=False):
     """
     Yalnızca 37 özellik kullanılarak veri ön işleme yapılır:
       - Eksik sütunlar sıfırla doldurulur
@@ -33,56 +74,18 @@ def preprocess_data(train_df, test_df):
       - 'attack_cat' sadece eğitim verisinde anlamlı, test setinde sıfır olarak yer alır
       - Kategorik sütunlara LabelEncoder uygulanır
       - Sayısal sütunlar StandardScaler ile ölçeklenir
-    """
 
-    selected_features = [
-        "srcip", "dstip", "proto", "service", "state", "dur",
-        "sbytes", "dbytes", "sttl", "dttl", "sloss", "dloss",
-        "sinpkt", "dinpkt", "sjit", "djit", "swin", "dwin",
-        "stcpb", "dtcpb", "smeansz", "dmeansz", "trans_depth",
-        "res_bdy_len", "ct_state_ttl", "ct_flw_http_mthd",
-        "is_ftp_login", "ct_ftp_cmd", "ct_srv_src", "ct_srv_dst",
-        "ct_dst_ltm", "ct_src_ltm", "ct_src_dport_ltm",
-        "ct_dst_sport_ltm", "ct_dst_src_ltm",
-        "attack_cat",  # yeniden dahil edildi
-        "label"
-    ]
-    
-        # kural-bazlı sütunları da modele sokmak için listeye ekleyelim
-    rule_features = [
-        "is_dos_like","is_backdoor_like","is_recon_like",
-        "is_fuzzers_like","is_exploit_like","is_analysis_like"
-    ]
-    selected_features += rule_features
-    # Eksik sütunları sıfırla doldur
-    for df in [train_df, test_df]:
-        for col in selected_features:
-            if col not in df.columns:
-                df[col] = 0
-                    # Domain-bazlı (kural tabanlı) özellik mühendisliği
-    for df in [train_df, test_df]:
-        df["is_dos_like"] = (df["sbytes"] > 40000) & (df["dur"] < 2.0) & (df["sinpkt"] < 0.01)
-        df["is_backdoor_like"] = (df["ct_src_dport_ltm"] > 0) & (df["is_ftp_login"] == 1) & (df["ct_ftp_cmd"] > 1)
-
-
-        df["is_recon_like"] = (df["ct_dst_ltm"] > 7) & (df["ct_dst_sport_ltm"] > 4) & (df["dur"] < 0.2)
-        df["is_fuzzers_like"] = (df["sjit"] > 0.7) & (df["djit"] > 0.7) & (df["sbytes"] > 20000)
-        df["is_exploit_like"] = (df["trans_depth"] > 4) & (df["res_bdy_len"] > 1000) & (df["dbytes"] > 30000)
-        df["is_analysis_like"] = (df["ct_flw_http_mthd"] > 0) & (df["trans_depth"] > 2) & (df["res_bdy_len"] > 5000)
-
-
-    # Sadece bu sütunları kullan
-    train_df = train_df[selected_features].copy()
-    test_df = test_df[selected_features].copy()
-
-    # IP adreslerini sayıya çevir
-    for col in ["srcip", "dstip"]:
-        train_df[col] = train_df[col].apply(ip_to_int)
-        test_df[col] = test_df[col].apply(ip_to_int)
+    Tüm veri bellekte işlenir; büyük CSV'ler için preprocess_data_chunked.
+    compact=True: aynı adımlar sıkı tiplerle (bkz. _preprocess_compact).
+    """
+    if compact:
+        return _preprocess_compact(train_df, test_df)
+    train_df = _select_features(train_df)
+    test_df = _select_features(test_df)
 
     # Kategorik sütunları tespit et
     cat_cols = [col for col in ["proto", "service", "state", "attack_cat"]
-                if col in train_df.columns and train_df[col].dtype == "object"]
+                if col in train_df.columns and _is_text(train_df[col])]
 
    
     # Encode işlemi için birleştir
@@ -111,3 +114,170 @@ def preprocess_data(train_df, test_df):
     X_test[numeric_cols] = scaler.transform(X_test[numeric_cols])
 
     return X_train, y_train, X_test, y_test
+
+
+def _preprocess_compact(train_df, test_df):
+    """
+    preprocess_data ile aynı sonuç, düşük bellekle:
+      – IP'ler uint32, diğer sütunlar frame_schema ile en dar tipte
+      – Kategorik kodlar birleştirme (concat) yapılmadan ortak sıralı
+        sözlükten alınır (LabelEncoder ile aynı kodlar, int8/int16)
+      – Ölçekleme sütun sütun, float64 girdiyle yapılır; sonuç float32
+        (ormanlar X'i zaten float32'ye çevirir)
+    """
+    train_df = _select_features(train_df, ip_dtype="uint32")
+    test_df  = _select_features(test_df, ip_dtype="uint32")
+
+    cat_cols = [col for col in CAT_CANDIDATES
+                if _is_text(train_df[col]) or isinstance(train_df[col].dtype, pd.CategoricalDtype)]
+    for df in (train_df, test_df):
+        for col in cat_cols:
+            df[col] = df[col].astype(str)
+    for col in cat_cols:
+        classes = sorted(set(train_df[col].unique()) | set(test_df[col].unique()))
+        for df in (train_df, test_df):
+            df[col] = pd.Categorical(df[col], categories=classes).codes
+    out = []
+    for df in (train_df, test_df):
+        df = compact_frame(df)
+        y = df.pop("attack_cat") if "attack_cat" in df.columns else None
+        out.append((df, y))
+    (X_train, y_train), (X_test, y_test) = out
+
+    # Sayısal (bool dışı) sütunları ölçekle
+    numeric_cols = [c for c in X_train.columns
+                    if pd.api.types.is_numeric_dtype(X_train[c]) and not pd.api.types.is_bool_dtype(X_train[c])]
+    for col in numeric_cols:
+        scaler = StandardScaler().fit(X_train[col].to_numpy(dtype=np.float64)[:, None])
+        for X in (X_train, X_test):
+            X[col] = scaler.transform(X[col].to_numpy(dtype=np.float64)[:, None]).ravel().astype(np.float32)
+
+    return X_train, y_train, X_test, y_test
+
+
+# -------------------------------------------------------------------
+# Bellek dışı (out-of-core) ön işleme
+# -------------------------------------------------------------------
+CHUNK_ROWS = 100_000
+
+
+def _read_chunks(path, chunksize):
+    return pd.read_csv(path, chunksize=chunksize, low_memory=False)
+
+
+def _open_npy(path, dtype, shape):
+    """Sırayla parça yazılacak .npy dosyası aç (bellek eşlemesiz; yazılan sayfalar RSS'e eklenmez)."""
+    f = open(path, "wb")
+    np.lib.format.write_array_header_1_0(f, {"descr": np.lib.format.dtype_to_descr(np.dtype(dtype)),
+                                             "fortran_order": False, "shape": shape})
+    return f
+
+
+def _encode_chunk(df, classes, numeric_cols):
+    """
+    Kategorik sütunları LabelEncoder ile aynı kodlara çevir (sözlük = sıralı
+    sınıflar); sayısal sütunları float64'e çevir. Şema tüm veriden gelir: bir
+    parçada sayısal sütuna düşen metin NaN olur, sütunun tipini değiştirmez.
+    """
+    for col, cls in classes.items():
+        df[col] = pd.Categorical(df[col].astype(str), categories=cls).codes.astype("int64")
+    for col in numeric_cols:
+        if col not in classes:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype(np.float64)
+    return df
+
+
+def _kind(series):
+    if pd.api.types.is_bool_dtype(series.dtype):
+        return "bool"
+    return "text" if _is_text(series) else "num"
+
+
+def preprocess_data_chunked(train_path, test_path, out_dir, chunksize=CHUNK_ROWS):
+    """
+    preprocess_data'nın parça parça (chunk) çalışan sürümü. CSV'ler
+    chunksize satırlık parçalarla okunur; tepe bellek veri boyutundan
+    bağımsızdır:
+      1. geçiş: train + test kategorik sözlüklerinin birleşimi
+         (LabelEncoder'ın birleşik fit'i ile aynı kodlar), satır sayıları
+         ve tüm train parçalarındaki sütun tiplerinden şema: CAT_CANDIDATES
+         içinde herhangi bir parçada metin olanlar kategorik, her parçada
+         bool olanlar bool (ölçeklenmez), kalanlar sayısal
+      2. geçiş: train parçalarıyla StandardScaler.partial_fit
+      3. geçiş: her parça dönüştürülüp out_dir altındaki .npy dosyalarının
+         (X_train, y_train, X_test, y_test) sonuna eklenir
+
+    Kodlayıcı sözlükleri, ölçek sabitleri ve sütun adları meta.json'a
+    kaydedilir. Dönüş değeri load_preprocessed(out_dir) ile aynıdır.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    paths = {"train": train_path, "test": test_path}
+
+    # 1) Sözlük birleşimi, train sütun tipleri (tüm parçalar), satır sayıları
+    vocab = {col: set() for col in CAT_CANDIDATES}
+    kinds = {}
+    n_rows = {}
+    for split, path in paths.items():
+        n_rows[split] = 0
+        for chunk in _read_chunks(path, chunksize):
+            chunk = _select_features(chunk)
+            n_rows[split] += len(chunk)
+            if split == "train":
+                for col in chunk.columns:
+                    kinds.setdefault(col, set()).add(_kind(chunk[col]))
+            for col in CAT_CANDIDATES:
+                vocab[col].update(chunk[col].astype(str).unique())
+    classes = {col: sorted(vocab[col]) for col in CAT_CANDIDATES if "text" in kinds[col]}
+    feature_cols = [col for col in kinds if col != "attack_cat"]
+    # preprocess_data'daki gibi kategorik kodlar da ölçeklenir; bool hariç
+    numeric_cols = [col for col in feature_cols if kinds[col] != {"bool"}]
+
+    # 2) Ölçekleyiciyi artımlı olarak eğit
+    scaler = StandardScaler()
+    for chunk in _read_chunks(train_path, chunksize):
+        X = _encode_chunk(_select_features(chunk), classes, numeric_cols)
+        scaler.partial_fit(X[numeric_cols])
+
+    # 3) Parça parça dönüştür ve diske yaz
+    for split, path in paths.items():
+        X_out = _open_npy(os.path.join(out_dir, f"X_{split}.npy"), np.float64,
+                          (n_rows[split], len(feature_cols)))
+        y_out = _open_npy(os.path.join(out_dir, f"y_{split}.npy"), np.int64, (n_rows[split],))
+        with X_out, y_out:
+            for chunk in _read_chunks(path, chunksize):
+                df = _encode_chunk(_select_features(chunk), classes, numeric_cols)
+                y = df.pop("attack_cat")
+                df[numeric_cols] = scaler.transform(df[numeric_cols])
+                X_out.write(np.ascontiguousarray(df[feature_cols].to_numpy(dtype=np.float64)).tobytes())
+                y_out.write(pd.to_numeric(y, errors="coerce").fillna(0)
+                            .to_numpy(dtype=np.int64).tobytes())
+
+    meta = {
+        "feature_cols": feature_cols,
+        "numeric_cols": numeric_cols,
+        "classes": classes,
+        "scaler_mean": scaler.mean_.tolist(),
+        "scaler_scale": scaler.scale_.tolist(),
+        "n_rows": n_rows,
+        "chunksize": chunksize,
+    }
+    with open(os.path.join(out_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    return load_preprocessed(out_dir)
+
+
+def load_preprocessed(out_dir, mmap=True):
+    """
+    preprocess_data_chunked çıktısını (X_train, y_train, X_test, y_test)
+    olarak aç. mmap=True ise diziler belleğe kopyalanmaz, diskten eşlenir.
+    """
+    with open(os.path.join(out_dir, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    mode = "r" if mmap else None
+    out = []
+    for split in ("train", "test"):
+        X = np.load(os.path.join(out_dir, f"X_{split}.npy"), mmap_mode=mode)
+        y = np.load(os.path.join(out_dir, f"y_{split}.npy"), mmap_mode=mode)
+        out += [pd.DataFrame(X, columns=meta["feature_cols"], copy=False),
+                pd.Series(y, name="attack_cat", copy=False)]
+    return tuple(out)
@@ -0,0 +1,175 @@
+# dataset_store.py
+"""
+UNSW-NB15 CSV'leri için sütunlu (columnar) veri seti önbelleği.
+
+Her CSV ilk kullanımda bir kez ayrıştırılır ve tipleriyle birlikte
+Parquet olarak (pyarrow yoksa pickle) CACHE_DIR altına yazılır. Önbellek
+dosyasının adı kaynak dosyanın içerik özetini (blake2b) taşır; kaynak
+değişince yeni özet yeni bir dosyaya karşılık gelir ve eskisi silinir.
+Özet her seferinde yeniden hesaplanmasın diye dizinde (index.json) dosya
+boyutu + değiştirilme zamanı ile birlikte saklanır; ikisi de aynıysa
+kayıtlı özet kullanılır. compact=True yüklemeler frame_schema ile
+sıkıştırılmış tipleri ayrı bir önbellek dosyasında ("-compactN", N =
+frame_schema.SCHEMA_VERSION) tutar; şema değişince eski dosya silinir.
+
+Tüm eğitim / değerlendirme betikleri aynı yükleyiciyi kullanır:
+    from dataset_store import load_dataset
+    train_df = load_dataset("UNSW_NB15_training-set.csv")
+    train_df = load_dataset("UNSW_NB15_training-set.csv", compact=True)  # eğitim için sıkı tipler
+"""
+
+import os
+import json
+import hashlib
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (Parquet motoru)
+except ImportError:
+    pyarrow = None
+
+CACHE_DIR  = ".dataset_cache"
+TRAIN_FILE = "UNSW_NB15_training-set.csv"
+TEST_FILE  = "UNSW_NB15_testing-set.csv"
+_HASH_BLOCK = 1 << 20
+_INDEX_FILE = "index.json"
+
+
+def file_digest(path: str) -> str:
+    """Dosya içeriğinin blake2b özeti (16 bayt, hex)."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Sütun adlarını trim + lower."""
+    df.columns = df.columns.str.strip().str.lower()
+    return df
+
+
+class DatasetStore:
+    """Kaynak dosya özetine göre anahtarlanmış CSV → sütunlu dosya önbelleği."""
+
+    def __init__(self, cache_dir: str = CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.ext = ".parquet" if pyarrow is not None else ".pkl"
+        self._index_path = os.path.join(cache_dir, _INDEX_FILE)
+
+    # ---------------------------------------------------------------
+    def _read_index(self) -> dict:
+        try:
+            with open(self._index_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self, index: dict):
+        tmp = self._index_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp, self._index_path)
+
+    def _digest(self, src: str, entry: dict):
+        """(özet, stat); boyut ve değiştirilme zamanı aynıysa kayıtlı özet."""
+        st = os.stat(src)
+        if entry.get("size") == st.st_size and entry.get("mtime_ns") == st.st_mtime_ns:
+            return entry["digest"], st
+        return file_digest(src), st
+
+    def cache_path(self, src: str, digest: str, compact: bool = False) -> str:
+        stem = os.path.splitext(os.path.basename(src))[0]
+        tag = ""
+        if compact:
+            from frame_schema import SCHEMA_VERSION
+            tag = f"-compact{SCHEMA_VERSION}"
+        return os.path.join(self.cache_dir, f"{stem}-{digest}{tag}{self.ext}")
+
+    # ---------------------------------------------------------------
+    def _write(self, df: pd.DataFrame, path: str):
+        tmp = path + ".tmp"
+        if self.ext == ".parquet":
+            df.to_parquet(tmp, engine="pyarrow", index=False)
+        else:
+            df.to_pickle(tmp)
+        os.replace(tmp, path)
+
+    def _read(self, path: str, columns=None) -> pd.DataFrame:
+        if self.ext == ".parquet":
+            return pd.read_parquet(path, engine="pyarrow", columns=columns)
+        df = pd.read_pickle(path)
+        return df[columns] if columns is not None else df
+
+    def _build(self, src: str, path: str, raw_path: str, compact: bool) -> pd.DataFrame:
+        """Önbellek dosyasını üret: ham → CSV'den; sıkı → ham önbellekten."""
+        if not compact:
+            df = pd.read_csv(src)
+        else:
+            from frame_schema import compact_frame
+            raw = self._read(raw_path) if os.path.exists(raw_path) else pd.read_csv(src)
+            df = compact_frame(raw)
+            del raw
+            if pyarrow is not None:
+                pyarrow.default_memory_pool().release_unused()
+        self._write(df, path)
+        print(f" Veri seti önbelleğe alındı: {src} → {path}")
+        return df
+
+    def load(self, src: str, columns=None, compact: bool = False) -> pd.DataFrame:
+        """
+        CSV'yi önbellekten yükle; önbellek yoksa ya da kaynak değiştiyse
+        ayrıştırıp önbelleğe yaz. columns: yalnız bu (ham) sütunları oku.
+        compact=True: frame_schema ile sıkıştırılmış sürüm (ayrı dosyada
+        önbelleklenir; okuma sırasındaki tepe bellek de küçülür).
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        key = os.path.abspath(src)
+        index = self._read_index()
+        entry = index.get(key, {})
+        digest, st = self._digest(src, entry)
+        raw_path = self.cache_path(src, digest)
+        path = self.cache_path(src, digest, compact)
+
+        if entry.get("digest", digest) != digest:
+            # Kaynak değişti: eski önbellek dosyalarını sil
+            for old in (entry.get("path"), entry.get("compact_path")):
+                if old and os.path.exists(old):
+                    os.remove(old)
+            entry = {}
+        if os.path.exists(path):
+            df = self._read(path, columns)
+        else:
+            df = self._build(src, path, raw_path, compact)
+            if columns is not None:
+                df = df[columns]
+            # Eski şemayla yazılmış sıkı önbellek
+            old = entry.get("compact_path")
+            if compact and old and old != path and os.path.exists(old):
+                os.remove(old)
+
+        new_entry = {**entry, "size": st.st_size, "mtime_ns": st.st_mtime_ns, "digest": digest,
+                     "compact_path" if compact else "path": path}
+        if new_entry != index.get(key):
+            index[key] = new_entry
+            self._write_index(index)
+        return df
+
+
+_default_store = None
+
+
+def load_dataset(path: str, normalize: bool = True, columns=None,
+                 compact: bool = False) -> pd.DataFrame:
+    """
+    pd.read_csv yerine: CSV'yi sütunlu önbellekten yükler. normalize=True
+    ise sütun adları trim + lower yapılır. compact=True ise sütunlar
+    frame_schema şemasıyla sıkıştırılır (en dar sayısal tipler, category,
+    uint32 IP).
+    """
+    global _default_store
+    if _default_store is None:
+        _default_store = DatasetStore()
+    df = _default_store.load(path, columns=columns, compact=compact)
+    return normalize_columns(df) if normalize else df
@@ -0,0 +1,175 @@
+# feature_vectorizer.py
+"""
+Dinleyici sıcak yolu için pandas'sız özellik vektörleyici.
+
+Eğitilmiş bir stage pipeline'ının (ColumnTransformer + sınıflandırıcı)
+ön işleme adımı bir kez "derlenir": sayısal sütunlar için StandardScaler
+sabitleri, kategorik sütunlar için OneHotEncoder sözlükleri (PROTO_MAP /
+STATE_MAP tarzı değer → indeks eşlemesi) çıkarılır. Her JSON kaydı doğrudan
+önceden ayrılmış bir NumPy satır/batch tamponuna, ColumnTransformer'ın çıktı
+sütun sırasıyla yazılır; ardından sınıflandırıcı bu matrisle çağrılır.
+Sonuçlar pipeline.predict_proba ile aynıdır.
+"""
+
+import numpy as np
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler, OneHotEncoder
+
+# Kayıtta bulunmayan sütunlar için varsayılanlar
+NUMERIC_DEFAULT = 0.0
+CATEGORICAL_DEFAULTS = {"service": "-", "state": "-"}
+
+
+def _unwrap(trans):
+    """Tek adımlı Pipeline'ları (ör. Pipeline([("sc", StandardScaler())])) aç."""
+    if isinstance(trans, Pipeline):
+        if len(trans.steps) != 1:
+            raise ValueError(f"Çok adımlı alt pipeline desteklenmiyor: {trans}")
+        return trans.steps[0][1]
+    return trans
+
+
+def _column_names(cols, feature_names):
+    if isinstance(cols, str):
+        return [cols]
+    return [feature_names[c] if isinstance(c, (int, np.integer)) else c for c in cols]
+
+
+class FeatureVectorizer:
+    """
+    Bir stage pipeline'ından derlenen vektörleyici.
+
+    transform_one / transform önceden ayrılmış tamponun bir görünümünü
+    döndürür; sonuç bir sonraki çağrıdan önce kullanılmalıdır.
+    """
+
+    def __init__(self, pipe, defaults: dict = None):
+        if not isinstance(pipe, Pipeline) or len(pipe.steps) != 2:
+            raise ValueError("Pipeline([pre, clf]) bekleniyordu")
+        ct = pipe.steps[0][1]
+        self.estimator = pipe.steps[-1][1]
+        self.classes_  = self.estimator.classes_
+        feature_names  = list(getattr(pipe, "feature_names_in_", ct.feature_names_in_))
+        self.feature_names_in_ = feature_names
+        defaults = {**CATEGORICAL_DEFAULTS, **(defaults or {})}
+
+        num_names, num_mean, num_scale = [], [], []
+        num_pos = []                 # sayısal değerin çıktı matrisindeki sütunu
+        cat_specs = []               # (ad, varsayılan, {değer: çıktı sütunu})
+        offset = 0
+
+        for name, trans, cols in ct.transformers_:
+            cols = _column_names(cols, feature_names)
+            if trans == "drop" or not len(cols):
+                continue
+            trans = _unwrap(trans)
+            if trans == "passthrough":
+                for c in cols:
+                    num_names.append(c); num_mean.append(0.0); num_scale.append(1.0)
+                    num_pos.append(offset); offset += 1
+            elif isinstance(trans, StandardScaler):
+                mean  = trans.mean_  if trans.with_mean else np.zeros(len(cols))
+                scale = trans.scale_ if trans.with_std  else np.ones(len(cols))
+                for c, m, s in zip(cols, mean, scale):
+                    num_names.append(c); num_mean.append(m); num_scale.append(s)
+                    num_pos.append(offset); offset += 1
+            elif isinstance(trans, OneHotEncoder):
+                if trans.handle_unknown != "ignore" or trans.drop is not None \
+                        or getattr(trans, "_infrequent_enabled", False):
+                    raise ValueError(f"Desteklenmeyen OneHotEncoder ayarı: {name}")
+                for c, cats in zip(cols, trans.categories_):
+                    vocab = {v: offset + i for i, v in enumerate(cats.tolist())}
+                    cat_specs.append((c, defaults.get(c), vocab))
+                    offset += len(cats)
+            else:
+                raise ValueError(f"Desteklenmeyen dönüştürücü: {name} ({type(trans).__name__})")
+
+        self.numeric_cols     = num_names
+        self.categorical_cols = [c for c, _, _ in cat_specs]
+        self.n_features_out   = offset
+        self._num_names = num_names
+        self._num_pos   = np.asarray(num_pos, dtype=np.intp)
+        self._mean      = np.asarray(num_mean, dtype=np.float64)
+        self._scale     = np.asarray(num_scale, dtype=np.float64)
+        self._cat_specs = cat_specs
+        self._num_defaults = [defaults.get(c, NUMERIC_DEFAULT) for c in num_names]
+        # Sayısal sütunlar çıktıda ardışıksa slice ile yazılır (kopyasız)
+        contiguous = len(num_pos) and num_pos == list(range(num_pos[0], num_pos[0] + len(num_pos)))
+        self._num_slice = slice(num_pos[0], num_pos[0] + len(num_pos)) if contiguous else None
+
+        self._row   = np.zeros((1, offset), dtype=np.float64)
+        self._batch = np.zeros((0, offset), dtype=np.float64)
+
+    # ---------------------------------------------------------------
+    def _fill(self, out: np.ndarray, i: int, obj: dict):
+        get = obj.get
+        if any(k != k.strip().lower() for k in obj):
+            norm = {k.strip().lower(): v for k, v in obj.items()}
+            get  = norm.get
+        row = out[i]
+        pos = self._num_pos
+        for j, (c, d) in enumerate(zip(self._num_names, self._num_defaults)):
+            v = get(c)
+            row[pos[j]] = d if v is None else v
+        for c, d, vocab in self._cat_specs:
+            v = get(c, d)
+            k = vocab.get(v)
+            if k is not None:
+                row[k] = 1.0
+
+    def _scale_numeric(self, out: np.ndarray):
+        if self._num_slice is not None:
+            block = out[:, self._num_slice]
+            block -= self._mean
+            block /= self._scale
+        elif len(self._num_pos):
+            out[:, self._num_pos] = (out[:, self._num_pos] - self._mean) / self._scale
+
+    def transform_one(self, obj: dict) -> np.ndarray:
+        """Tek kaydı (1, n_features_out) satır tamponuna yazar."""
+        out = self._row
+        out.fill(0.0)
+        self._fill(out, 0, obj)
+        self._scale_numeric(out)
+        return out
+
+    def transform(self, records: list) -> np.ndarray:
+        """Kayıt listesini (n, n_features_out) batch tamponuna yazar."""
+        n = len(records)
+        if self._batch.shape[0] < n:
+            self._batch = np.zeros((max(n, 2 * self._batch.shape[0]), self.n_features_out))
+        out = self._batch[:n]
+        out.fill(0.0)
+        for i, obj in enumerate(records):
+            self._fill(out, i, obj)
+        self._scale_numeric(out)
+        return out
+
+    def layout(self) -> dict:
+        """
+        Derlenmiş çıktı düzeni: sayısal sütunlar (ad, çıktı sütunu, ortalama,
+        ölçek, varsayılan) ve kategorik sütunlar (ad, varsayılan, değer → çıktı
+        sütunu). Birden fazla stage'i ortak girdiyle besleyen kodlar içindir.
+        """
+        return {
+            "numeric": list(zip(self._num_names, self._num_pos.tolist(),
+                                self._mean.tolist(), self._scale.tolist(), self._num_defaults)),
+            "categorical": [(c, d, dict(vocab)) for c, d, vocab in self._cat_specs],
+            "n_features_out": self.n_features_out,
+        }
+
+    # ---------------------------------------------------------------
+    def predict_proba(self, records: list) -> np.ndarray:
+        return self.estimator.predict_proba(self.transform(records))
+
+    def predict(self, records: list) -> np.ndarray:
+        return self.estimator.predict(self.transform(records))
+
+
+def compile_vectorizer(pipe, defaults: dict = None):
+    """Pipeline derlenebiliyorsa FeatureVectorizer, değilse None döndürür."""
+    try:
+        return FeatureVectorizer(pipe, defaults)
+    except (ValueError, AttributeError) as e:
+        print(" Vektörleyici derlenemedi, DataFrame yolu kullanılacak:", e)
+        return None
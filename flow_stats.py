@@ -0,0 +1,222 @@
+# flow_stats.py
+"""
+Kaynak IP ve /24 bazında, sınırlı bellekli kayan pencere istatistikleri.
+
+Her anahtar (srcip ya da /24 ağı) için pencere, `buckets` adet zaman
+kovasına bölünür; kova başına akış sayısı ve sbytes toplamı tutulur.
+Güncelleme akış başına O(1)'dir (kova döndürme en fazla `buckets` adım).
+
+Bellek sınırı iki katmanla sağlanır:
+  – Tam sayaçlar bir LRU tablosunda tutulur; tablo max_keys'i aşınca ya da
+    anahtar idle_timeout boyunca sessiz kalınca en eski anahtar atılır.
+  – Tabloya girmemiş anahtarlar (uzun kuyruk: tek seferlik kaynaklar,
+    taramalar) yalnızca sabit boyutlu, pencereli bir count-min sketch'e
+    yazılır. Sketch tahmini admit_threshold'a ulaşan anahtar tabloya alınır.
+Böylece saatte milyonlarca farklı kaynak görülse de bellek
+max_keys × (anahtar durumu) + sketch boyutu ile sınırlıdır.
+"""
+
+import time
+from array import array
+from collections import OrderedDict
+
+from ip_utils import cidr
+
+
+class _KeyWindow:
+    """Tek anahtarın kovalı pencere sayaçları."""
+    __slots__ = ("counts", "sums", "epoch", "flows", "sbytes", "alerted_epoch")
+
+    def __init__(self, n_buckets: int, epoch: int):
+        self.counts = [0] * n_buckets
+        self.sums   = [0.0] * n_buckets
+        self.epoch  = epoch
+        self.flows  = 0
+        self.sbytes = 0.0
+        self.alerted_epoch = -1
+
+    def advance(self, epoch: int):
+        n = len(self.counts)
+        gap = epoch - self.epoch
+        if gap <= 0:
+            return
+        if gap >= n:
+            for i in range(n):
+                self.counts[i] = 0
+                self.sums[i]   = 0.0
+            self.flows, self.sbytes = 0, 0.0
+        else:
+            for e in range(self.epoch + 1, epoch + 1):
+                i = e % n
+                self.flows  -= self.counts[i]
+                self.sbytes -= self.sums[i]
+                self.counts[i] = 0
+                self.sums[i]   = 0.0
+        self.epoch = epoch
+
+    def add(self, epoch: int, sbytes: float):
+        self.advance(epoch)
+        i = epoch % len(self.counts)
+        self.counts[i] += 1
+        self.sums[i]   += sbytes
+        self.flows  += 1
+        self.sbytes += sbytes
+
+
+class CountMinSketch:
+    """
+    Pencereli count-min sketch: `current` ve `previous` iki tablo tutulur,
+    pencere dolunca previous atılıp current onun yerine geçer. Tahmin, son
+    bir-iki penceredeki akış sayısının üst sınırıdır.
+    """
+
+    _SEEDS = (0x9E3779B1, 0x85EBCA77, 0xC2B2AE3D, 0x27D4EB2F, 0x165667B1,
+              0xD3A2646C, 0xFD7046C5, 0xB55A4F09)
+
+    def __init__(self, width: int = 1 << 16, depth: int = 4, window: float = 60.0):
+        if width & (width - 1):
+            raise ValueError("width 2'nin kuvveti olmalı")
+        self.width  = width
+        self.depth  = min(depth, len(self._SEEDS))
+        self.window = window
+        self._shift = 64 - (width.bit_length() - 1)
+        self._cur   = self._zeros()
+        self._prev  = self._zeros()
+        self._epoch = 0
+
+    def _zeros(self) -> list:
+        return [array("I", bytes(4 * self.width)) for _ in range(self.depth)]
+
+    def _rotate(self, now: float):
+        epoch = int(now // self.window)
+        if epoch == self._epoch:
+            return
+        self._prev  = self._cur if epoch - self._epoch == 1 else self._zeros()
+        self._cur   = self._zeros()
+        self._epoch = epoch
+
+    def _slots(self, key):
+        # Çarpımsal hash: 64 bitlik çarpımın üst bitleri
+        h = hash(key) | 1
+        return [((h * s) & 0xFFFFFFFFFFFFFFFF) >> self._shift for s in self._SEEDS[:self.depth]]
+
+    def add(self, key, now: float, n: int = 1) -> int:
+        """Sayacı artır ve güncel tahmini döndür."""
+        self._rotate(now)
+        est = None
+        for row, prev, j in zip(self._cur, self._prev, self._slots(key)):
+            v = min(row[j] + n, 0xFFFFFFFF)
+            row[j] = v
+            v += prev[j]
+            if est is None or v < est:
+                est = v
+        return est
+
+    def estimate(self, key, now: float) -> int:
+        self._rotate(now)
+        return min(row[j] + prev[j]
+                   for row, prev, j in zip(self._cur, self._prev, self._slots(key)))
+
+    def memory_bytes(self) -> int:
+        return 2 * self.depth * self.width * 4
+
+
+class SourceStats:
+    """Tek anahtar düzeyi (ör. srcip) için LRU + sketch."""
+
+    def __init__(self, window: float = 60.0, buckets: int = 6, max_keys: int = 100_000,
+                 admit_threshold: int = 3, idle_timeout: float = None,
+                 sketch_width: int = 1 << 16, sketch_depth: int = 4):
+        self.window          = window
+        self.bucket_width    = window / buckets
+        self.buckets         = buckets
+        self.max_keys        = max_keys
+        self.admit_threshold = admit_threshold
+        self.idle_timeout    = window if idle_timeout is None else idle_timeout
+        self.table  = OrderedDict()          # anahtar → _KeyWindow (LRU sırası)
+        self.sketch = CountMinSketch(sketch_width, sketch_depth, window)
+        self.evicted = 0
+
+    def update(self, key, sbytes: float, now: float):
+        """
+        Akışı say. Anahtar tam takipteyse _KeyWindow, değilse None döner
+        (yalnızca sketch'e yazılmıştır).
+        """
+        epoch = int(now // self.bucket_width)
+        kw = self.table.get(key)
+        if kw is None:
+            if self.sketch.add(key, now) < self.admit_threshold:
+                return None
+            kw = _KeyWindow(self.buckets, epoch)
+            self.table[key] = kw
+        else:
+            self.table.move_to_end(key)
+        kw.add(epoch, sbytes)
+        self._evict(epoch)
+        return kw
+
+    def _evict(self, epoch: int):
+        table = self.table
+        while len(table) > self.max_keys:
+            table.popitem(last=False)
+            self.evicted += 1
+        # Boştaki anahtarlar: her çağrıda en fazla iki tanesi (O(1))
+        idle_epochs = self.idle_timeout / self.bucket_width
+        for _ in range(2):
+            if not table:
+                break
+            key, kw = next(iter(table.items()))
+            if epoch - kw.epoch <= idle_epochs:
+                break
+            del table[key]
+            self.evicted += 1
+
+    def memory_bytes(self) -> int:
+        """Kaba üst sınır: anahtar başına ~ (2 liste + nesne) + sketch."""
+        per_key = 200 + 16 * self.buckets
+        return len(self.table) * per_key + self.sketch.memory_bytes()
+
+
+class FlowAnomalyDetector:
+    """
+    srcip ve /24 düzeyinde pencere içi akış sayısı ve ortalama sbytes
+    eşiklerini denetler. Anahtar başına pencere kovası başına en fazla bir
+    alarm üretilir.
+    """
+
+    def __init__(self, window: float = 60.0, buckets: int = 6,
+                 max_flows: int = 1000, max_avg_sbytes: float = 500.0, min_flows: int = 20,
+                 max_keys: int = 100_000, admit_threshold: int = 3):
+        self.max_flows      = max_flows
+        self.max_avg_sbytes = max_avg_sbytes
+        self.min_flows      = min_flows
+        self.levels = {
+            "srcip": SourceStats(window, buckets, max_keys, admit_threshold),
+            "/24":   SourceStats(window, buckets, max_keys, admit_threshold),
+        }
+
+    def observe(self, rec: dict, now: float = None) -> list:
+        """Akışı işle; tetiklenen alarm mesajlarını döndür."""
+        now    = time.monotonic() if now is None else now
+        srcip  = rec.get("srcip", "-")
+        sbytes = float(rec.get("sbytes", 0) or 0)
+        alerts = []
+        for level, key in (("srcip", srcip), ("/24", cidr(srcip))):
+            kw = self.levels[level].update(key, sbytes, now)
+            if kw is None or kw.flows < self.min_flows or kw.alerted_epoch == kw.epoch:
+                continue
+            avg = kw.sbytes / kw.flows
+            if kw.flows > self.max_flows:
+                msg = f"{level}={key} pencerede {kw.flows} akış"
+            elif avg > self.max_avg_sbytes:
+                msg = f"{level}={key} ortalama sbytes = {avg:.2f}"
+            else:
+                continue
+            kw.alerted_epoch = kw.epoch
+            alerts.append(msg)
+        return alerts
+
+    def stats(self) -> dict:
+        return {level: {"keys": len(s.table), "evicted": s.evicted,
+                        "memory_bytes": s.memory_bytes()}
+                for level, s in self.levels.items()}
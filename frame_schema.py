@@ -0,0 +1,122 @@
+# frame_schema.py
+"""
+UNSW-NB15 / dinleyici çerçeveleri için sıkı (compact) sütun tipleri ve
+sütun başına bellek raporu.
+
+Şema:
+  – IP sütunları (srcip, dstip)      → uint32 (geçersizler 0)
+  – Metin sütunları                   → category (proto, service, state,
+                                        attack_cat, …; sayısal kodlara
+                                        çevrilmiş sütunlar tamsayı kalır)
+  – Tamsayı sütunları                 → değer aralığına göre en dar
+                                        (u)int8 / 16 / 32 / 64
+  – Ondalık sütunlar                  → tamamı tamsayı değerliyse en dar
+                                        tamsayı, değilse float64 kalır
+  – bool (kural sütunları)            → bool (zaten 1 bayt)
+
+Tamsayılar ve kategoriler kayıpsızdır: StandardScaler tamsayıyı float64'e
+tam çevirir, OneHotEncoder kategori değerlerini (kodları değil) görür. Bu
+yüzden sıkı çerçeveyle eğitilen pipeline, dinleyicinin ham (float64 / str)
+çerçeveleriyle birebir aynı tahmini verir (bkz. test_frame_schema.py).
+Ondalıklar varsayılan olarak float32'ye indirilmez: ölçekleme ormandan
+önce yapıldığından x yerine float32(x) ile eğitmek eşik yakınındaki
+kayıtlarda ham girdiden farklı sonuç verir. float32=True yalnız modele
+girmeyecek çerçeveler (depolama, rapor) içindir.
+
+SCHEMA_VERSION şema değiştikçe artırılır; dataset_store sıkı önbellek
+dosyalarını bununla adlandırır.
+
+Komut satırı: python frame_schema.py [csv ...] → önce / sonra raporu.
+"""
+
+import sys
+import numpy as np
+import pandas as pd
+
+from ip_utils import parse_ipv4
+
+IP_COLS = ["srcip", "dstip"]
+SCHEMA_VERSION = 2    # 2: ondalıklar float64 kalır
+
+
+def _narrow_int(values: np.ndarray) -> np.dtype:
+    """Değer aralığını kayıpsız taşıyan en dar tamsayı tipi."""
+    if values.size == 0:
+        return np.dtype(np.uint8)
+    lo, hi = values.min(), values.max()
+    kinds = (np.uint8, np.uint16, np.uint32, np.uint64) if lo >= 0 else \
+            (np.int8, np.int16, np.int32, np.int64)
+    for t in kinds:
+        info = np.iinfo(t)
+        if info.min <= lo and hi <= info.max:
+            return np.dtype(t)
+    return values.dtype
+
+
+def compact_series(s: pd.Series, float32: bool = False, categories=None) -> pd.Series:
+    """Tek sütunu şemaya göre sıkıştır (bkz. modül açıklaması)."""
+    name, dtype = s.name, s.dtype
+    if str(name).strip().lower() in IP_COLS:
+        return pd.Series(parse_ipv4(s.to_numpy()), index=s.index, name=name)
+    if isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_bool_dtype(dtype):
+        return s
+    if dtype == "object" or pd.api.types.is_string_dtype(dtype):
+        if categories is not None:
+            return s.astype(pd.CategoricalDtype(categories))
+        return s.astype("category")
+    if pd.api.types.is_integer_dtype(dtype):
+        if s.hasnans:     # pandas nullable tamsayı
+            return s
+        return s.astype(_narrow_int(s.to_numpy()))
+    if pd.api.types.is_float_dtype(dtype):
+        x = s.to_numpy()
+        if np.isfinite(x).all() and (x == np.trunc(x)).all():
+            return s.astype(_narrow_int(x.astype(np.int64)))
+        return s.astype(np.float32) if float32 else s
+    return s
+
+
+def compact_frame(df: pd.DataFrame, float32: bool = False, categories: dict = None) -> pd.DataFrame:
+    """
+    Tüm sütunları sıkıştırılmış yeni DataFrame. categories: {sütun: değerler}
+    verilirse o sütunun kategori sözlüğü sabitlenir (ör. eğitim + test ortak).
+    """
+    categories = categories or {}
+    return pd.DataFrame({c: compact_series(df[c], float32, categories.get(c)) for c in df.columns},
+                        index=df.index)
+
+
+# -------------------------------------------------------------------
+# Bellek raporu
+# -------------------------------------------------------------------
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    """Sütun başına tip ve bellek (MB) önce / sonra; son satır TOPLAM."""
+    mb_before = before.memory_usage(deep=True, index=False) / 2**20
+    mb_after  = after.memory_usage(deep=True, index=False) / 2**20
+    rep = pd.DataFrame({
+        "tip_önce":  before.dtypes.astype(str),
+        "MB_önce":   mb_before,
+        "tip_sonra": after.dtypes.astype(str).reindex(before.columns),
+        "MB_sonra":  mb_after.reindex(before.columns),
+    })
+    rep.loc["TOPLAM"] = ["", mb_before.sum(), "", mb_after.sum()]
+    rep["oran"] = rep["MB_önce"] / rep["MB_sonra"]
+    return rep
+
+
+def print_memory_report(rep: pd.DataFrame, title: str = ""):
+    if title:
+        print(f"\n› {title}")
+    print(rep.to_string(float_format=lambda v: f"{v:.2f}"))
+
+
+def main(paths):
+    from dataset_store import TRAIN_FILE, TEST_FILE, load_dataset
+
+    for path in paths or [TRAIN_FILE, TEST_FILE]:
+        raw = load_dataset(path)
+        print_memory_report(memory_report(raw, compact_frame(raw)), f"{path} ({len(raw):,} satır)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,187 @@
+# gcs_loader.py
+"""
+Akışlı (streaming), yerel önbellekli GCS CSV yükleyici.
+
+blob.download_as_bytes() + BytesIO nesneyi bellekte iki kez tutar (ham
+baytlar + DataFrame) ve her çağrıda yeniden indirir. Burada:
+  – Nesne DOWNLOAD_CHUNK'lık parçalarla okunur ve doğrudan pandas'ın
+    parçalı (chunksize) CSV ayrıştırıcısına akar; ham baytlar bellekte
+    birikmez.
+  – Okunan baytlar aynı anda CACHE_DIR altındaki geçici dosyaya yazılır;
+    nesne sonuna kadar okununca dosya atomik olarak önbelleğe taşınır.
+  – Önbellek anahtarı (bucket, nesne, generation)'dır: nesne değişmedikçe
+    (aynı generation) yeniden indirilmez, değişince eski kopya silinir.
+
+Arka uçlar:
+  – GCSBackend   : google-cloud-storage (kurulu değilse yalnız bu arka uç
+                   kullanılamaz)
+  – LocalBackend : root/<bucket>/<nesne> dizin düzeni; generation =
+                   değiştirilme zamanı (ns). GCS olmadan çevrimdışı test için.
+
+Kullanım:
+    from gcs_loader import load_csv, iter_csv_chunks
+    df = load_csv("bucket", "UNSW_NB15_training-set.csv")
+    for chunk in iter_csv_chunks("bucket", "big.csv", chunksize=100_000): ...
+"""
+
+import os
+import hashlib
+
+import pandas as pd
+
+try:
+    from google.cloud import storage
+except ImportError:
+    storage = None
+
+CACHE_DIR      = ".gcs_cache"
+DOWNLOAD_CHUNK = 8 << 20        # 8 MiB
+CHUNK_ROWS     = 100_000
+
+
+# -------------------------------------------------------------------
+# Arka uçlar: stat(bucket, ad) → generation, open(bucket, ad) → ikili akış
+# -------------------------------------------------------------------
+class GCSBackend:
+    def __init__(self, client=None, chunk_size: int = DOWNLOAD_CHUNK):
+        if client is None:
+            if storage is None:
+                raise ImportError("google-cloud-storage kurulu değil (LocalBackend kullanılabilir)")
+            client = storage.Client()
+        self.client = client
+        self.chunk_size = chunk_size
+
+    def _blob(self, bucket: str, name: str):
+        blob = self.client.bucket(bucket).get_blob(name)
+        if blob is None:
+            raise FileNotFoundError(f"gs://{bucket}/{name}")
+        return blob
+
+    def stat(self, bucket: str, name: str) -> str:
+        return str(self._blob(bucket, name).generation)
+
+    def open(self, bucket: str, name: str, generation: str):
+        # Okuma sabit generation'a bağlanır: okuma sırasında nesne değişirse
+        # önbellek yanlış anahtarla yazılmaz
+        blob = self.client.bucket(bucket).blob(name, generation=int(generation))
+        return blob.open("rb", chunk_size=self.chunk_size)
+
+
+class LocalBackend:
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, bucket: str, name: str) -> str:
+        return os.path.join(self.root, bucket, name)
+
+    def stat(self, bucket: str, name: str) -> str:
+        return str(os.stat(self._path(bucket, name)).st_mtime_ns)
+
+    def open(self, bucket: str, name: str, generation: str):
+        return open(self._path(bucket, name), "rb", buffering=DOWNLOAD_CHUNK)
+
+
+# -------------------------------------------------------------------
+# Önbellek
+# -------------------------------------------------------------------
+class _TeeReader:
+    """Kaynaktan okunan her baytı aynı anda dosyaya da yazan okuyucu."""
+
+    def __init__(self, src, sink):
+        self.src, self.sink = src, sink
+        self.eof = False
+        self.nbytes = 0
+
+    def read(self, n: int = -1) -> bytes:
+        data = self.src.read(n)
+        if data:
+            self.sink.write(data)
+            self.nbytes += len(data)
+        elif n != 0:
+            self.eof = True
+        return data
+
+    def __iter__(self):       # pandas dosya benzeri nesne denetimi için
+        return self
+
+
+class GCSCache:
+    def __init__(self, backend=None, cache_dir: str = CACHE_DIR):
+        self.backend = backend
+        self.cache_dir = cache_dir
+
+    def _backend(self):
+        if self.backend is None:
+            self.backend = GCSBackend()
+        return self.backend
+
+    def _prefix(self, bucket: str, name: str) -> str:
+        key = hashlib.blake2b(f"{bucket}/{name}".encode(), digest_size=12).hexdigest()
+        return f"{key}-{os.path.basename(name)}"
+
+    def cache_path(self, bucket: str, name: str, generation: str) -> str:
+        return os.path.join(self.cache_dir, f"{self._prefix(bucket, name)}.g{generation}")
+
+    def _drop_stale(self, bucket: str, name: str, keep: str):
+        prefix = self._prefix(bucket, name) + ".g"
+        for f in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, f)
+            if f.startswith(prefix) and path != keep:
+                os.remove(path)
+
+    def iter_csv_chunks(self, bucket: str, name: str, chunksize: int = CHUNK_ROWS, **read_csv_kwargs):
+        """
+        CSV'yi chunksize satırlık DataFrame parçaları olarak üret. Önbellekte
+        (aynı generation) varsa yerel dosyadan, yoksa akıştan okunur ve
+        önbelleğe yazılır. Parçalar yarıda bırakılırsa önbellek yazılmaz.
+        """
+        backend = self._backend()
+        generation = backend.stat(bucket, name)
+        path = self.cache_path(bucket, name, generation)
+        if os.path.exists(path):
+            yield from pd.read_csv(path, chunksize=chunksize, **read_csv_kwargs)
+            return
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        done = False
+        try:
+            with backend.open(bucket, name, generation) as src, open(tmp, "wb") as sink:
+                tee = _TeeReader(src, sink)
+                with pd.read_csv(tee, chunksize=chunksize, **read_csv_kwargs) as reader:
+                    yield from reader
+                # Ayrıştırıcı son satırdan sonrasını okumamış olabilir
+                while not tee.eof:
+                    tee.read(DOWNLOAD_CHUNK)
+            os.replace(tmp, path)
+            done = True
+            self._drop_stale(bucket, name, keep=path)
+            print(f" gs://{bucket}/{name} (generation {generation}, {tee.nbytes / 2**20:.1f} MB) "
+                  f"önbelleğe alındı → {path}")
+        finally:
+            if not done and os.path.exists(tmp):
+                os.remove(tmp)
+
+    def load_csv(self, bucket: str, name: str, chunksize: int = CHUNK_ROWS, **read_csv_kwargs) -> pd.DataFrame:
+        chunks = list(self.iter_csv_chunks(bucket, name, chunksize, **read_csv_kwargs))
+        return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+
+
+_default_cache = None
+
+
+def _cache(backend=None) -> GCSCache:
+    global _default_cache
+    if backend is not None:
+        return GCSCache(backend)
+    if _default_cache is None:
+        _default_cache = GCSCache()
+    return _default_cache
+
+
+def iter_csv_chunks(bucket: str, name: str, chunksize: int = CHUNK_ROWS, backend=None, **read_csv_kwargs):
+    return _cache(backend).iter_csv_chunks(bucket, name, chunksize, **read_csv_kwargs)
+
+
+def load_csv(bucket: str, name: str, backend=None, **read_csv_kwargs) -> pd.DataFrame:
+    return _cache(backend).load_csv(bucket, name, **read_csv_kwargs)
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+halving_search.py
+
+Ön işlemesi fold başına önbelleklenen, successive halving hiperparametre
+araması.
+
+RandomizedSearchCV / GridSearchCV bir Pipeline üzerinde çalıştığında
+ColumnTransformer (StandardScaler + OneHotEncoder) her aday ve her fold
+için yeniden eğitilir. HalvingSearch:
+  – Her CV fold'u için ön işlemeyi bir kez eğitir; dönüştürülmüş
+    eğitim / doğrulama matrisleri tüm adaylarda yeniden kullanılır.
+  – Adayları turlar halinde eler: ilk tur tüm adayları fold eğitim
+    kümesinin küçük, tabakalı bir alt örneğiyle dener; her turda en iyi
+    1/factor aday kalır ve alt örnek factor kat büyür. Son tur tam fold
+    verisiyle yapılır.
+  – Bir turdaki aday × fold eğitimleri birbirinden bağımsızdır;
+    n_jobs ile joblib.Parallel üzerinden paralel çalışır (GridSearchCV'nin
+    n_jobs'ı gibi). Dış paralellik varken modelin kendi n_jobs'ı 1'e
+    çekilir (iç içe iş parçacığı taşması olmasın); son eğitim modelin kendi
+    ayarıyla yapılır.
+  – Her değerlendirmeyi (tur, aday, fold, skor, süre) JSON satırı olarak
+    log_path'e ekler. Kesilen bir arama aynı ayarlar ve aynı veriyle
+    (X / y içerik özeti) yeniden başlatıldığında logdaki değerlendirmeler
+    atlanır.
+Sonunda en iyi aday tam veride Pipeline([pre, clf]) olarak (ön işleme
+yoksa yalnız model) yeniden eğitilir.
+"""
+
+import os
+import json
+import math
+import time
+import hashlib
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import get_scorer
+from sklearn.pipeline import Pipeline
+from sklearn.model_selection import StratifiedKFold, ParameterGrid, ParameterSampler
+
+MIN_RESOURCES = 1000    # ilk turdaki en küçük alt örnek (satır)
+
+
+def _params_key(params: dict) -> str:
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+def _subsample(y, n: int, seed: int) -> np.ndarray:
+    """y'nin sınıf oranlarını koruyan, sıralı n satırlık alt örnek indeksi."""
+    y = np.asarray(y)
+    if n >= len(y):
+        return np.arange(len(y))
+    rng = np.random.RandomState(seed)
+    classes, y_idx = np.unique(y, return_inverse=True)
+    picked = []
+    for k in range(len(classes)):
+        members = np.flatnonzero(y_idx == k)
+        take = max(1, int(round(n * len(members) / len(y))))
+        picked.append(rng.choice(members, size=min(take, len(members)), replace=False))
+    return np.sort(np.concatenate(picked))
+
+
+def _digest(data) -> str:
+    """X / y içeriğinin özeti (DataFrame / Series / ndarray / seyrek matris)."""
+    h = hashlib.blake2b(digest_size=16)
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        names = list(data.columns) if isinstance(data, pd.DataFrame) else [data.name]
+        h.update(json.dumps(names, default=str).encode())
+        h.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+    elif hasattr(data, "tocsr"):
+        m = data.tocsr()
+        for a in (m.data, m.indices, m.indptr):
+            h.update(np.ascontiguousarray(a).tobytes())
+    else:
+        arr = np.asarray(data)
+        if arr.dtype == object:
+            h.update(pd.util.hash_array(arr.ravel()).tobytes())
+        else:
+            h.update(np.ascontiguousarray(arr).tobytes())
+    return h.hexdigest()
+
+
+def _take(data, idx):
+    """DataFrame / Series / ndarray / seyrek matris satır seçimi."""
+    if hasattr(data, "iloc"):
+        return data.iloc[idx]
+    return data[idx]
+
+
+def _fit_score(estimator, params, X_tr, y_tr, idx, X_va, y_va, scorer):
+    """Tek aday × fold değerlendirmesi → (skor, eğitim süresi)."""
+    est = clone(estimator).set_params(**params)
+    t0  = time.perf_counter()
+    est.fit(_take(X_tr, idx), _take(y_tr, idx))
+    fit_time = time.perf_counter() - t0
+    return float(scorer(est, X_va, y_va)), fit_time
+
+
+class HalvingSearch:
+    """
+    make_preproc : () → eğitilmemiş ön işleyici (ör. ColumnTransformer) ya da None
+    estimator    : ön işlenmiş matrisle eğitilecek model (ör. RandomForest)
+    param_grid   : estimator parametreleri (dict ya da dict listesi)
+    n_candidates : None = tüm ızgara, int = ParameterSampler ile örnekle
+    n_jobs       : tur içi aday × fold paralelliği (joblib; -1 = tüm çekirdekler)
+    """
+
+    def __init__(self, make_preproc, estimator, param_grid, scoring, cv: int = 3,
+                 factor: int = 3, n_candidates: int = None, min_resources: int = MIN_RESOURCES,
+                 random_state: int = 42, log_path: str = None, n_jobs: int = None,
+                 verbose: int = 1):
+        self.make_preproc  = make_preproc
+        self.estimator     = estimator
+        self.param_grid    = param_grid
+        self.scoring       = scoring
+        self.cv            = cv
+        self.factor        = factor
+        self.n_candidates  = n_candidates
+        self.min_resources = min_resources
+        self.random_state  = random_state
+        self.log_path      = log_path
+        self.n_jobs        = n_jobs
+        self.verbose       = verbose
+
+    # ---------------------------------------------------------------
+    def _candidates(self) -> list:
+        if self.n_candidates is None:
+            return list(ParameterGrid(self.param_grid))
+        return list(ParameterSampler(self.param_grid, self.n_candidates,
+                                     random_state=self.random_state))
+
+    def _signature(self, X, y, candidates) -> str:
+        """Aynı aramayı tanımlayan özet; log kayıtları yalnız eşleşirse kullanılır."""
+        parts = [type(self.estimator).__name__, _params_key(self.estimator.get_params()),
+                 [_params_key(c) for c in candidates], str(self.scoring), self.cv,
+                 self.factor, self.min_resources, self.random_state, X.shape,
+                 _digest(X), _digest(y)]
+        return hashlib.blake2b(json.dumps(parts, default=str).encode(), digest_size=8).hexdigest()
+
+    def _load_log(self, signature: str) -> dict:
+        done = {}
+        if not self.log_path or not os.path.exists(self.log_path):
+            return done
+        with open(self.log_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue    # kesilmiş son satır
+                if rec.get("signature") == signature:
+                    done[(rec["iter"], rec["params"], rec["fold"])] = rec
+        return done
+
+    def _append_log(self, rec: dict):
+        if not self.log_path:
+            return
+        os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(rec) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _prepare_folds(self, X, y) -> list:
+        """Fold başına ön işleyiciyi bir kez eğit ve dönüştürülmüş matrisleri sakla."""
+        skf = StratifiedKFold(n_splits=self.cv, shuffle=True, random_state=self.random_state)
+        folds = []
+        for i, (tr, va) in enumerate(skf.split(X, y)):
+            t0 = time.perf_counter()
+            X_tr, X_va = _take(X, tr), _take(X, va)
+            if self.make_preproc is not None:
+                pre = self.make_preproc()
+                X_tr = pre.fit_transform(X_tr)
+                X_va = pre.transform(X_va)
+            folds.append((X_tr, _take(y, tr), X_va, _take(y, va)))
+            if self.verbose:
+                print(f"  fold {i}: ön işleme {time.perf_counter() - t0:.2f} sn "
+                      f"({len(tr)} eğitim / {len(va)} doğrulama)")
+        return folds
+
+    # ---------------------------------------------------------------
+    def fit(self, X, y):
+        candidates = self._candidates()
+        signature  = self._signature(X, y, candidates)
+        done       = self._load_log(signature)
+        if done and self.verbose:
+            print(f" Logdan devam: {len(done)} değerlendirme atlanacak ({self.log_path})")
+        scorer = get_scorer(self.scoring)
+        folds  = self._prepare_folds(X, y)
+
+        max_res = min(len(f[1]) for f in folds)
+        n_iter, n = 1, len(candidates)
+        while n > self.factor:
+            n = math.ceil(n / self.factor)
+            n_iter += 1
+        # Son tur tam veriyle; önceki turlar factor kat küçülür (min_resources altına inmez)
+        resources = [max(min(self.min_resources, max_res), max_res // self.factor ** (n_iter - 1 - i))
+                     for i in range(n_iter)]
+
+        base = clone(self.estimator)
+        if self.n_jobs not in (None, 1) and "n_jobs" in base.get_params():
+            base.set_params(n_jobs=1)
+        keys = [_params_key(c) for c in candidates]
+
+        self.cv_results_ = []
+        alive = list(range(len(candidates)))
+        with Parallel(n_jobs=self.n_jobs, return_as="generator") as parallel:
+            for it, n_res in enumerate(resources):
+                # Logda olmayan aday × fold değerlendirmeleri; alt örnek fold başına ortak
+                todo = [(c, f) for c in alive for f in range(len(folds))
+                        if (it, keys[c], f) not in done]
+                if self.verbose:
+                    print(f" Tur {it + 1}/{n_iter}: {len(alive)} aday × {self.cv} fold, "
+                          f"{n_res} satır ({len(todo)} değerlendirme)")
+                idx = [_subsample(y_tr, n_res, self.random_state + it) for _, y_tr, _, _ in folds]
+                results = parallel(
+                    delayed(_fit_score)(base, candidates[c], folds[f][0], folds[f][1], idx[f],
+                                        folds[f][2], folds[f][3], scorer)
+                    for c, f in todo)
+                # Sonuçlar geldikçe loglanır; kesilen tur da kaldığı yerden sürer
+                for k, (score, fit_time) in enumerate(results):
+                    c, f = todo[k]
+                    rec = {"signature": signature, "iter": it, "params": keys[c], "fold": f,
+                           "n_resources": int(len(idx[f])), "score": score, "fit_time": fit_time}
+                    self._append_log(rec)
+                    done[(it, keys[c], f)] = rec
+
+                scores = {}
+                for c in alive:
+                    recs = [done[(it, keys[c], f)] for f in range(len(folds))]
+                    self.cv_results_ += [{**rec, "params": candidates[c]} for rec in recs]
+                    scores[c] = float(np.mean([rec["score"] for rec in recs]))
+                    if self.verbose > 1:
+                        print(f"   {candidates[c]} → {scores[c]:.4f}")
+                # En iyi 1/factor aday sonraki tura
+                keep  = max(1, math.ceil(len(alive) / self.factor)) if it < n_iter - 1 else 1
+                alive = sorted(alive, key=lambda c: -scores[c])[:keep]
+                self.best_score_ = scores[alive[0]]
+
+        self.best_params_ = candidates[alive[0]]
+        best = clone(self.estimator).set_params(**self.best_params_)
+        if self.make_preproc is not None:
+            best = Pipeline([("pre", self.make_preproc()), ("clf", best)])
+        self.best_estimator_ = best.fit(X, y)
+        return self
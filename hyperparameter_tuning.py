@@ -2,10 +2,10 @@ import joblib
 import pandas as pd
 from imblearn.pipeline import Pipeline
 from imblearn.over_sampling import RandomOverSampler
-from sklearn.model_selection import GridSearchCV
 from sklearn.ensemble import RandomForestClassifier
 
 from data_utils import preprocess_data
+from halving_search import HalvingSearch
 from model import evaluate_model
 
 #  Lokal CSV yolları
@@ -16,8 +16,8 @@ TEST_FILE  = r"C:\Users\lenovo\Desktop\netSec_pr_component\UNSW_NB15_testing-set
 train_df = pd.read_csv(TRAIN_FILE)
 test_df  = pd.read_csv(TEST_FILE)
 
-# 2️ Ön işleme
-X_train, y_train, X_test, y_test = preprocess_data(train_df, test_df)
+# 2️ Ön işleme (sıkı tipler: uint32 IP, dar tamsayı kodlar, float32)
+X_train, y_train, X_test, y_test = preprocess_data(train_df, test_df, compact=True)
 
 # 3️ Pipeline: önce oversampling, sonra RF
 pipe = Pipeline([
@@ -32,16 +32,19 @@ param_grid = {
     "clf__min_samples_split": [2, 5, 10]
 }
 
-grid = GridSearchCV(
-    estimator=pipe,
-    param_grid=param_grid,
-    cv=3,
+# Successive halving: zayıf adaylar alt örneklerde erkenden elenir; bir
+# turun aday × fold eğitimleri tüm çekirdeklerde paralel. Kesilen arama
+# logdan devam eder
+grid = HalvingSearch(
+    None, pipe, param_grid,
     scoring="f1_weighted",
-    n_jobs=-1,
-    verbose=2
+    cv=3,
+    factor=3,
+    log_path="logs/tuning_rf_ros.jsonl",
+    n_jobs=-1
 )
 
-print("GridSearchCV başlıyor...")
+print("Halving araması başlıyor...")
 grid.fit(X_train, y_train)
 
 print("En iyi parametreler:", grid.best_params_)
@@ -1,17 +1,17 @@
 
-import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder
 from sklearn.metrics import classification_report, roc_auc_score, f1_score
 import lightgbm as lgb
 from data_utils import preprocess_data
+from dataset_store import load_dataset
 
 def main():
-    train_df = pd.read_csv("UNSW_NB15_training-set.csv")
-    test_df  = pd.read_csv("UNSW_NB15_testing-set.csv")
+    train_df = load_dataset("UNSW_NB15_training-set.csv", normalize=False, compact=True)
+    test_df  = load_dataset("UNSW_NB15_testing-set.csv", normalize=False, compact=True)
 
     
-    X_full, y_full, X_test, y_test = preprocess_data(train_df, test_df)
+    X_full, y_full, X_test, y_test = preprocess_data(train_df, test_df, compact=True)
 
    
     le = LabelEncoder()
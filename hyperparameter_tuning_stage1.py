@@ -6,35 +6,44 @@ Stage-1: Normal vs Attack (binary) classifier için hiperparametre araması.
 • UNSW-NB15 CSV’lerinden tüm sütunlar strip+lower.
 • label & attack_cat sütunları X’ten çıkarılır (sızıntı yok).
 • Dinamik sayısal/kategorik ayrımıyla ColumnTransformer oluşturulur.
-• Tek Pipeline (preproc + RF) üzerinden RandomizedSearchCV.
+• Fold başına önbelleklenen ön işleme + successive halving (halving_search.py);
+  en iyi aday Pipeline (preproc + RF) olarak kaydedilir. Kesilen arama
+  TUNING_LOG'dan devam eder.
 """
 
-import pandas as pd
-import joblib
+from model_store import save_model
+from dataset_store import load_dataset
+from halving_search import HalvingSearch
 
-from sklearn.model_selection import train_test_split, RandomizedSearchCV
+from sklearn.model_selection import train_test_split
 from sklearn.ensemble     import RandomForestClassifier
-from sklearn.pipeline     import Pipeline
 from sklearn.compose      import ColumnTransformer
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
 from sklearn.metrics      import classification_report, confusion_matrix
 
-def main():
-    # 1) CSV’leri yükle ve sütun adlarını normalize et
-    train_df = pd.read_csv("UNSW_NB15_training-set.csv")
-    test_df  = pd.read_csv("UNSW_NB15_testing-set.csv")
-    for df in (train_df, test_df):
-        df.columns = df.columns.str.strip().str.lower()
+MODEL_PATH = "stage1_binary_pipe.joblib"
+TUNING_LOG = "logs/tuning_stage1.jsonl"
+
+PARAM_GRID = {
+    "n_estimators":      [50, 100, 200],
+    "max_depth":         [None, 10, 20],
+    "min_samples_split": [2, 5, 10],
+}
+
+
+def split_xy(df):
+    """Hedef: label != 0 → Attack(1), Normal(0); label & attack_cat X'ten çıkarılır."""
+    y = (df["label"] != 0).astype(int)
+    X = df.drop(columns=["label","attack_cat"], errors="ignore")
+    return X, y
 
-    # 2) Hedef değişken: label != 0 → Attack(1), Normal(0)
-    y_train = (train_df["label"] != 0).astype(int)
-    y_test  = (test_df ["label"] != 0).astype(int)
 
-    # 3) Özellik matrisini al ve sızıntıyı önle
-    X_train = train_df.drop(columns=["label","attack_cat"], errors="ignore")
-    X_test  = test_df .drop(columns=["label","attack_cat"], errors="ignore")
+def train_stage1(train_df, log_path=TUNING_LOG, param_grid=PARAM_GRID):
+    """Stage-1 pipeline'ını ara + eğit → (en iyi pipeline, doğrulama bilgisi)."""
+    # 1) Özellik matrisi / hedef
+    X_train, y_train = split_xy(train_df)
 
-    # 4) Eğitim/validasyon bölmesi
+    # 2) Eğitim/validasyon bölmesi
     X_tr, X_val, y_tr, y_val = train_test_split(
         X_train, y_train,
         test_size=0.2,
@@ -42,62 +51,72 @@ def main():
         random_state=42
     )
 
-    # 5) Dinamik sayısal/kategorik sütun listesi
+    # 3) Dinamik sayısal/kategorik sütun listesi
     num_cols = X_tr.select_dtypes(include=["number"]).columns.tolist()
-    cat_cols = X_tr.select_dtypes(include=["object","category","bool"]).columns.tolist()
+    cat_cols = X_tr.select_dtypes(include=["object","string","category","bool"]).columns.tolist()
     print(f" Sayısal sütun: {num_cols}")
     print(f" Kategorik sütun: {cat_cols}")
 
-    # 6) ColumnTransformer + Pipeline
-    preproc = ColumnTransformer([
-        ("num", StandardScaler(), num_cols),
-        ("cat", OneHotEncoder(handle_unknown="ignore"), cat_cols)
-    ])
-    pipe = Pipeline([
-        ("pre", preproc),
-        ("clf", RandomForestClassifier(
-            random_state=42,
-            class_weight="balanced",
-            n_jobs=-1
-        ))
-    ])
-
-    # 7) Hiperparametre araması (Attack recall maksimize)
-    param_dist = {
-        "clf__n_estimators":      [50, 100, 200],
-        "clf__max_depth":         [None, 10, 20],
-        "clf__min_samples_split": [2, 5, 10],
-    }
-    rs = RandomizedSearchCV(
-        pipe,
-        param_distributions=param_dist,
-        n_iter=10,
+    # 4) ColumnTransformer (fold başına bir kez eğitilir) + RF
+    def make_preproc():
+        return ColumnTransformer([
+            ("num", StandardScaler(), num_cols),
+            ("cat", OneHotEncoder(handle_unknown="ignore"), cat_cols)
+        ])
+    rf = RandomForestClassifier(
+        random_state=42,
+        class_weight="balanced",
+        n_jobs=-1
+    )
+
+    # 5) Hiperparametre araması (Attack recall maksimize): ızgaradan 10
+    #    örneklenmiş aday; bir turun aday × fold eğitimleri paralel
+    search = HalvingSearch(
+        make_preproc, rf, param_grid,
         scoring="recall",
         cv=3,
-        verbose=2,
+        factor=3,
+        n_candidates=10,
         random_state=42,
-        n_jobs=-1,
-        error_score="raise"
+        log_path=log_path,
+        n_jobs=-1
     )
     print(" Hiperparametre araması başlatılıyor (Attack recall)…")
-    rs.fit(X_tr, y_tr)
-    best = rs.best_estimator_
-    print("✓ En iyi parametreler:", rs.best_params_)
+    search.fit(X_tr, y_tr)
+    best = search.best_estimator_
+    print("✓ En iyi parametreler:", search.best_params_)
 
-    # 8) Validation & Test değerlendirme
+    # 6) Validation değerlendirme
     print("\n Validation Set:")
     yv_pred = best.predict(X_val)
     print(classification_report(y_val, yv_pred, target_names=["Normal","Attack"], zero_division=0))
     print("Confusion Matrix:\n", confusion_matrix(y_val, yv_pred))
+    info = {
+        "best_params": search.best_params_,
+        "cv_recall":   search.best_score_,
+        "validation":  classification_report(y_val, yv_pred, target_names=["Normal","Attack"],
+                                             zero_division=0, output_dict=True),
+    }
+    return best, info
+
+
+def main():
+    # CSV’leri yükle (sütunlu önbellek) ve sütun adlarını normalize et
+    train_df = load_dataset("UNSW_NB15_training-set.csv", compact=True)
+    test_df  = load_dataset("UNSW_NB15_testing-set.csv")
+
+    best, _ = train_stage1(train_df)
 
+    # Test değerlendirme
+    X_test, y_test = split_xy(test_df)
     print("\n Test Set:")
     yt_pred = best.predict(X_test)
     print(classification_report(y_test, yt_pred, target_names=["Normal","Attack"], zero_division=0))
     print("Confusion Matrix:\n", confusion_matrix(y_test, yt_pred))
 
-    # 9) Modeli kaydet
-    joblib.dump(best, "stage1_binary_pipe.joblib")
-    print("\n Kaydedildi: stage1_binary_pipe.joblib")
+    # Modeli kaydet
+    save_model(best, MODEL_PATH)
+    print(f"\n Kaydedildi: {MODEL_PATH}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+incremental_update.py
+
+Analistin doğruladığı yeni etiketli akışlarla dağıtılmış stage
+modellerini tam yeniden eğitim yapmadan güncelleme.
+
+Girdi (LABELS_PATH): UNSW özellik sütunları + analist kararı
+  label      : 0 = Normal, 1 = Attack
+  attack_cat : saldırı türü (Stage-2; label=0 satırlarında boş)
+  timestamp, srcip (isteğe bağlı): alerts.csv satırına bağlantı; varsa
+               doğrulanan / yanlış pozitif alert sayıları raporlanır.
+
+Güncelleme (ön işleme — ColumnTransformer — dondurulur):
+  – RandomForest / ExtraTrees: yeni satırlar + eğitim setinden tabakalı
+    tekrar (replay) örneği üzerinde n_trees yeni ağaç eğitilir ve ormana
+    eklenir; replace=True ise en eski n_trees ağaç çıkarılır (boyut sabit).
+  – LightGBM: mevcut booster'dan devam eden n_trees tur (init_model).
+Tekrar örneği her sınıftan en az MIN_PER_CLASS satır içerir; böylece yeni
+ağaçlar modelin tüm sınıflarını görür ve eski veri unutulmaz.
+
+Sapma (drift): güncellemeden önce ve sonra sabit bir holdout (test
+setinden tohumlu, tabakalı HOLDOUT_ROWS satır) üzerinde metrikler ölçülür;
+fark UPDATE_LOG'a JSON satırı olarak eklenir. Eski model <yol>.prev olarak
+saklanır ve kaskad yeniden dışa aktarılır.
+
+Kullanım:
+    python incremental_update.py                         # iki stage
+    python incremental_update.py --stage 1 --trees 20 --replace
+    python incremental_update.py --dry-run               # yalnız rapor
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.pipeline import Pipeline
+from sklearn.ensemble import RandomForestClassifier, ExtraTreesClassifier
+from sklearn.metrics import f1_score, recall_score, precision_score, roc_auc_score
+
+from dataset_store import TRAIN_FILE, TEST_FILE, load_dataset, normalize_columns
+from model_store import save_model, load_model
+
+LABELS_PATH   = "labels/confirmed_flows.csv"
+ALERTS_PATH   = "alerts.csv"
+UPDATE_LOG    = "reports/model_updates.jsonl"
+N_TREES       = 20      # eklenecek ağaç / boosting turu
+REPLAY_RATIO  = 1.0     # yeni satır başına tekrar satırı
+MIN_PER_CLASS = 5
+FORESTS       = (RandomForestClassifier, ExtraTreesClassifier)
+HOLDOUT_ROWS  = 20_000
+HOLDOUT_SEED  = 0
+
+
+# -------------------------------------------------------------------
+# Yardımcılar
+# -------------------------------------------------------------------
+def _split(model):
+    """Pipeline → (ön işleyici ya da None, sınıflandırıcı)."""
+    if isinstance(model, Pipeline):
+        return model[:-1], model.steps[-1][1]
+    return None, model
+
+
+def stratified_sample(y: pd.Series, n: int, seed: int, min_per_class: int = MIN_PER_CLASS) -> np.ndarray:
+    """Sınıf oranlarını koruyan, her sınıftan en az min_per_class satırlık indeks."""
+    rng = np.random.default_rng(seed)
+    y = np.asarray(y)
+    picked = []
+    for cls in np.unique(y):
+        members = np.flatnonzero(y == cls)
+        take = max(min_per_class, int(round(n * len(members) / len(y))))
+        picked.append(rng.choice(members, size=min(take, len(members)), replace=False))
+    return np.sort(np.concatenate(picked))
+
+
+def stage_targets(df: pd.DataFrame, stage: int, classes=None):
+    """
+    Stage hedefleri → (X, y). Stage-1: label != 0. Stage-2: yalnız saldırılar;
+    modelde olmayan türler "Other" (model "Other" sınıfı yoksa satır atılır).
+    """
+    df = df.reset_index(drop=True)
+    if stage == 1:
+        y = (df["label"] != 0).astype(int)
+    else:
+        df = df[df["label"] != 0].reset_index(drop=True)
+        y = df["attack_cat"].astype(str)
+        if classes is not None:
+            known = y.isin(list(classes))
+            if "Other" in classes:
+                y = y.where(known, other="Other")
+            else:
+                df, y = df[known].reset_index(drop=True), y[known].reset_index(drop=True)
+    X = df.drop(columns=["label", "attack_cat", "timestamp"], errors="ignore")
+    return X, y
+
+
+def holdout_metrics(model, X, y, stage: int) -> dict:
+    proba = model.predict_proba(X)
+    classes = _split(model)[1].classes_
+    pred = np.asarray(classes)[proba.argmax(axis=1)]
+    if stage == 1:
+        attack = list(classes).index(1)
+        return {"roc_auc":   roc_auc_score(y, proba[:, attack]),
+                "recall":    recall_score(y, pred, zero_division=0),
+                "precision": precision_score(y, pred, zero_division=0),
+                "f1":        f1_score(y, pred, zero_division=0)}
+    return {"f1_macro":    f1_score(y, pred, average="macro", zero_division=0),
+            "accuracy":    float(np.mean(pred == np.asarray(y)))}
+
+
+def link_alerts(labels: pd.DataFrame, alerts_path: str = ALERTS_PATH) -> dict:
+    """Etiketli satırları (timestamp, srcip) ile alerts.csv'ye bağla."""
+    if not {"timestamp", "srcip"} <= set(labels.columns) or not os.path.exists(alerts_path):
+        return {}
+    alerts = pd.read_csv(alerts_path, usecols=["timestamp", "srcip"]).drop_duplicates()
+    keys = labels[["timestamp", "srcip", "label"]].astype({"timestamp": str, "srcip": str})
+    linked = keys.merge(alerts.astype(str), on=["timestamp", "srcip"], how="inner")
+    return {"linked_alerts":   int(len(linked)),
+            "confirmed":       int((linked["label"] != 0).sum()),
+            "false_positives": int((linked["label"] == 0).sum())}
+
+
+# -------------------------------------------------------------------
+# Güncelleme
+# -------------------------------------------------------------------
+def grow_forest(clf, X, y, n_trees: int, replace: bool = False, seed: int = None):
+    """n_trees yeni ağacı X, y üzerinde eğit ve ormana ekle (replace: en eskileri çıkar)."""
+    if seed is None:
+        seed = (clf.random_state or 0) + len(clf.estimators_)
+    new = clone(clf).set_params(n_estimators=n_trees, warm_start=False, random_state=seed)
+    new.fit(X, y)
+    if not np.array_equal(new.classes_, clf.classes_):
+        raise ValueError(f"Yeni ağaçların sınıfları farklı: {new.classes_} ≠ {clf.classes_}")
+    old = clf.estimators_[n_trees:] if replace else clf.estimators_
+    clf.estimators_  = list(old) + list(new.estimators_)
+    clf.n_estimators = len(clf.estimators_)
+    return clf
+
+
+def continue_boosting(clf, X, y, n_trees: int):
+    """LightGBM: mevcut booster'dan n_trees tur daha."""
+    new = clone(clf).set_params(n_estimators=n_trees)
+    new.fit(X, y, init_model=clf.booster_)
+    if not np.array_equal(new.classes_, clf.classes_):
+        raise ValueError(f"Yeni turların sınıfları farklı: {new.classes_} ≠ {clf.classes_}")
+    return new
+
+
+def update_model(model, X_new, y_new, X_replay, y_replay, n_trees: int = N_TREES,
+                 replace: bool = False):
+    """Dağıtılmış modeli (Pipeline ya da yalın sınıflandırıcı) yerinde güncelle."""
+    pre, clf = _split(model)
+    X = pd.concat([X_new, X_replay], ignore_index=True)
+    y = pd.concat([pd.Series(y_new), pd.Series(y_replay)], ignore_index=True)
+    Xt = pre.transform(X) if pre is not None else X
+
+    if isinstance(clf, FORESTS):
+        grow_forest(clf, Xt, y, n_trees, replace)
+    elif hasattr(clf, "booster_"):
+        clf = continue_boosting(clf, Xt, y, n_trees)
+        if pre is not None:
+            model.steps[-1] = (model.steps[-1][0], clf)
+        else:
+            model = clf
+    else:
+        raise TypeError(f"Artımlı güncelleme desteklenmiyor: {type(clf).__name__}")
+    return model
+
+
+def update_stage(stage: int, path: str, labels: pd.DataFrame, train_df: pd.DataFrame,
+                 holdout_df: pd.DataFrame, n_trees: int, replace: bool, replay_ratio: float,
+                 dry_run: bool) -> dict:
+    model = load_model(path, mmap=False)
+    classes = _split(model)[1].classes_
+    X_new, y_new = stage_targets(labels, stage, classes)
+    if len(X_new) == 0:
+        print(f" Stage-{stage}: yeni etiketli satır yok, atlandı")
+        return {}
+    X_ref, y_ref = stage_targets(train_df, stage, classes)
+    idx = stratified_sample(y_ref, int(len(X_new) * replay_ratio), seed=len(X_new))
+    X_hold, y_hold = stage_targets(holdout_df, stage, classes)
+
+    before = holdout_metrics(model, X_hold, y_hold, stage)
+    t0 = time.perf_counter()
+    model = update_model(model, X_new, y_new, X_ref.iloc[idx], y_ref.iloc[idx], n_trees, replace)
+    update_s = time.perf_counter() - t0
+    after = holdout_metrics(model, X_hold, y_hold, stage)
+
+    drift = {k: after[k] - before[k] for k in before}
+    print(f"\n Stage-{stage}: {len(X_new)} yeni + {len(idx)} tekrar satırı, "
+          f"{n_trees} {'ağaç değiştirildi' if replace else 'ağaç/tur eklendi'} ({update_s:.2f} sn)")
+    for k in before:
+        print(f"   {k:<10} {before[k]:.4f} → {after[k]:.4f} ({drift[k]:+.4f})")
+
+    if not dry_run:
+        if os.path.exists(path):
+            os.replace(path, path + ".prev")
+        save_model(model, path)
+        print(f"   Kaydedildi: {path} (önceki: {path}.prev)")
+    return {"stage": stage, "model": path, "n_new": int(len(X_new)), "n_replay": int(len(idx)),
+            "n_trees": n_trees, "replace": replace, "update_s": round(update_s, 3),
+            "before": before, "after": after, "drift": drift, "saved": not dry_run}
+
+
+def main(argv=None):
+    from hyperparameter_tuning_stage1 import MODEL_PATH as STAGE1_PATH
+    from train_stage2 import MODEL_PATH as STAGE2_PATH
+
+    parser = argparse.ArgumentParser(description="Doğrulanmış akışlarla artımlı model güncelleme")
+    parser.add_argument("--labels", default=LABELS_PATH, help="etiketli akış CSV'si")
+    parser.add_argument("--stage", choices=["1", "2", "both"], default="both")
+    parser.add_argument("--trees", type=int, default=N_TREES, help="eklenecek ağaç / tur sayısı")
+    parser.add_argument("--replace", action="store_true", help="RF: en eski ağaçları değiştir")
+    parser.add_argument("--replay", type=float, default=REPLAY_RATIO,
+                        help="yeni satır başına eğitim setinden tekrar satırı")
+    parser.add_argument("--dry-run", action="store_true", help="kaydetmeden yalnız raporla")
+    args = parser.parse_args(argv)
+
+    labels = normalize_columns(pd.read_csv(args.labels))
+    print(f"› {len(labels):,} etiketli akış ({args.labels})")
+    link = link_alerts(labels)
+    if link:
+        print(f"  alerts.csv bağlantısı: {link['linked_alerts']} alert, "
+              f"{link['confirmed']} doğrulandı, {link['false_positives']} yanlış pozitif")
+
+    train_df = load_dataset(TRAIN_FILE, compact=True)
+    test_df  = load_dataset(TEST_FILE)
+    hold_idx = stratified_sample((test_df["label"] != 0).astype(int),
+                                 min(HOLDOUT_ROWS, len(test_df)), seed=HOLDOUT_SEED)
+    holdout_df = test_df.iloc[hold_idx]
+
+    stages = {"1": [1], "2": [2], "both": [1, 2]}[args.stage]
+    paths = {1: STAGE1_PATH, 2: STAGE2_PATH}
+    records = []
+    for stage in stages:
+        rec = update_stage(stage, paths[stage], labels, train_df, holdout_df, args.trees,
+                           args.replace, args.replay, args.dry_run)
+        if rec:
+            records.append(rec)
+
+    if records and not args.dry_run and os.path.exists(STAGE1_PATH) and os.path.exists(STAGE2_PATH):
+        import cascade as mod
+        mod.export_cascade(load_model(STAGE1_PATH, mmap=False), load_model(STAGE2_PATH, mmap=False),
+                           mod.CASCADE_PATH, mod.DEFAULT_THRESHOLD)
+        print(f"\n✓ Kaskad yeniden dışa aktarıldı → {mod.CASCADE_PATH}")
+
+    os.makedirs(os.path.dirname(UPDATE_LOG) or ".", exist_ok=True)
+    with open(UPDATE_LOG, "a", encoding="utf-8") as f:
+        for rec in records:
+            f.write(json.dumps({"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "labels": args.labels,
+                                **link, **rec}, default=float) + "\n")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
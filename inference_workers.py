@@ -0,0 +1,154 @@
+# inference_workers.py
+"""
+Çok çekirdekli, srcip'e göre parçalanmış (sharded) çıkarım işçileri.
+
+Her akış crc32(shard anahtarı) % N ile tek bir işçi sürece gönderilir
+(anahtar srcip ya da srcip'ten türetilen /24); böylece aynı kaynak IP'nin
+tüm akışları aynı süreçte işlenir ve IP başına durum o süreçte
+yerel kalır. Her işçi kendi stage1_pipe / stage2_pipe kopyasıyla
+process_fn'i (anomali kontrolü + skorlama) çalıştırır. Sonuçlar tek bir
+çıkış kuyruğunda birleşir ve ana süreçte report_fn ile tek alert akışına
+yazılır. process_fn rapor argümanlarını (ya da None) döndürür; böylece
+ana sürece yalnız raporlanacak sonuçların küçük özeti taşınır ve ayrıştırma,
+konsol çıktısı gibi akış başına işler işçide kalır.
+
+Bir batch'te process_fn hata verirse batch atlanır, işçi devam eder. İşçi
+süreci yine de ölürse (init hatası, kill) ana süreç bunu is_alive() ile
+fark eder: o shard'a gönderilen batch'ler düşürülür ve kapanış beklemede
+kalmaz.
+"""
+
+import zlib
+import queue
+import signal
+import threading
+import multiprocessing as mp
+
+POLL_INTERVAL = 1.0     # sn; dolu / boş kuyrukta işçi canlılık denetimi aralığı
+
+
+def shard_of(srcip, n_shards: int) -> int:
+    """Süreçler ve yeniden başlatmalar arasında kararlı shard indeksi."""
+    return zlib.crc32(str(srcip).encode("utf-8")) % n_shards
+
+
+def _worker_main(process_fn, init_fn, exit_fn, in_q, out_q):
+    # Ctrl-C ana süreçte ele alınır; işçiler kapanışı kuyruktan alır.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        if init_fn is not None:
+            init_fn()
+        while True:
+            batch = in_q.get()
+            if batch is None:
+                if exit_fn is not None:
+                    try:
+                        exit_fn()
+                    except Exception as e:
+                        print(f" İşçi kapanış hatası ({mp.current_process().name}): {e}")
+                break
+            try:
+                results = process_fn(batch)
+            except Exception as e:
+                print(f" İşçi hatası ({mp.current_process().name}, {len(batch)} akış atlandı): {e}")
+                continue
+            out_q.put([res for res in results if res is not None])
+    finally:
+        # Kapanış işareti her durumda gönderilir (toplayıcı bunu bekler)
+        out_q.put(None)
+
+
+class WorkerPool:
+    """
+    process_fn: list[kayıt] → list[rapor argümanları (tuple) | None]  (işçide)
+    report_fn:  (*rapor argümanları) → None      (ana süreçte çalışır)
+    shard_key:  kayıt → shard anahtarı (varsayılan srcip)
+    init_fn / exit_fn: işçide başlangıçta / kapanış işaretinde çağrılır
+    """
+
+    def __init__(self, n_workers: int, process_fn, report_fn, init_fn=None,
+                 queue_size: int = 64, shard_key=None, exit_fn=None):
+        # fork: işçiler ana sürecin yüklediği modelleri copy-on-write ile
+        # paylaşır (sklearn ağaç düğümleri dahil); yoksa her işçi yeniden yükler
+        ctx = mp.get_context("fork" if "fork" in mp.get_all_start_methods() else None)
+        self.n_workers = n_workers
+        self.report_fn = report_fn
+        self.shard_key = shard_key or (lambda obj: obj.get("srcip"))
+        self.sent      = [0] * n_workers     # shard başına gönderilen akış
+        self.reported  = 0
+        self.dropped   = 0                   # ölü işçi yüzünden düşürülen akış
+        self._dead     = set()
+        self._out_q = ctx.Queue()
+        self._in_qs = [ctx.Queue(maxsize=queue_size) for _ in range(n_workers)]
+        self._procs = [
+            ctx.Process(target=_worker_main, name=f"ids-worker-{i}", daemon=True,
+                        args=(process_fn, init_fn, exit_fn, q, self._out_q))
+            for i, q in enumerate(self._in_qs)
+        ]
+        for p in self._procs:
+            p.start()
+        self._collector = threading.Thread(target=self._collect, name="ids-collector",
+                                           daemon=True)
+        self._collector.start()
+        self._closed = False
+
+    def submit(self, records: list):
+        """Batch'i shard'lara böl ve işçilere gönder (kuyruk doluysa bekler)."""
+        shards = [[] for _ in range(self.n_workers)]
+        for obj in records:
+            shards[shard_of(self.shard_key(obj), self.n_workers)].append(obj)
+        for i, part in enumerate(shards):
+            if part:
+                if self._put(i, part):
+                    self.sent[i] += len(part)
+                else:
+                    self.dropped += len(part)
+
+    def _put(self, i: int, item) -> bool:
+        """Kuyruk doluyken işçinin canlılığını denetleyerek gönder; ölüyse False."""
+        proc = self._procs[i]
+        while proc.is_alive():
+            try:
+                self._in_qs[i].put(item, timeout=POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        if i not in self._dead:
+            self._dead.add(i)
+            print(f" İşçi {proc.name} durdu (exitcode {proc.exitcode}); shard {i} akışları düşürülüyor")
+        return False
+
+    def _collect(self):
+        done, idle = 0, 0
+        while done < self.n_workers:
+            try:
+                item = self._out_q.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                # Kapanış işareti gönderemeden ölen işçi: hepsi durduktan sonra
+                # kuyruk bir tur daha boş kalırsa bitir (son sonuçlar kaçmasın)
+                idle = idle + 1 if not any(p.is_alive() for p in self._procs) else 0
+                if idle > 1:
+                    break
+                continue
+            if item is None:
+                done += 1
+                continue
+            for args in item:
+                try:
+                    self.report_fn(*args)
+                except Exception as e:
+                    print(" Rapor hatası:", e)
+            self.reported += len(item)
+
+    def close(self):
+        """İşçilere kapanış gönder, kalan sonuçları raporla ve bekle."""
+        if self._closed:
+            return
+        self._closed = True
+        for i in range(self.n_workers):
+            self._put(i, None)
+        self._collector.join()
+        for p in self._procs:
+            p.join()
+        print(f" İşçiler kapandı: shard başına akış {self.sent}, raporlanan {self.reported}"
+              f"{f', düşürülen {self.dropped}' if self.dropped else ''}")
@@ -0,0 +1,207 @@
+# ip_utils.py
+"""
+Vektörel IPv4 / CIDR yardımcıları.
+
+Sütun işlemleri (eğitim / ön işleme) satır satır ipaddress nesnesi
+oluşturmaz: metin sütunu sabit genişlikli bayt matrisine çevrilir, her
+satırın rakam / nokta konumları 16 bitlik maskelere sıkıştırılır ve oktetler
+tablo aramasıyla tüm satırlarda birlikte okunur (uint32). Prefix maskeleme
+ve metne geri çevirme de vektöreldir.
+
+Dinleyicinin tek kayıt yolu için ipaddress tabanlı, LRU önbellekli skaler
+sürümler vardır (ip_to_int, cidr). Geçersiz adresler her iki yolda da
+ipaddress ile aynı kurallarla reddedilir (ör. baştaki sıfırlar, 255 üstü
+oktet) ve 0 / "0.0.0.0/N" olur.
+"""
+
+import ipaddress
+from functools import lru_cache
+
+import numpy as np
+
+# "255.255.255.255" 15 bayttır; 16. bayt doluysa metin fazla uzundur
+_WIDTH = 16
+CACHE_SIZE = 65536
+
+# 16 bitlik satır maskeleri için tablolar: bit sayısı ve tek bitin indeksi
+_POPCOUNT  = np.array([bin(i).count("1") for i in range(1 << _WIDTH)], dtype=np.intp)
+_BIT_INDEX = np.zeros(1 << _WIDTH, dtype=np.intp)
+_BIT_INDEX[1 << np.arange(_WIDTH)] = np.arange(_WIDTH)
+# 8 adet 0/1 bayttan oluşan uint64'ü 8 bitlik maskeye toplayan çarpan:
+# bayt i (bit 8i) çarpımda bit 56+i'ye kayar, üst bayt maskedir
+_GATHER_BITS = np.uint64(0x0102040810204080)
+
+
+def _octet_table() -> np.ndarray:
+    """
+    Oktet tablosu (2^18 girdi, int16). Anahtar, oktetin ilk 3 baytının
+    '0' ile XOR'lanmış alt 6'şar bitidir: rakamlar 0–9 olur, nokta ('.' ^ '0'
+    = 0x1E) ve NUL (0x30) ise > 9 olup sonlandırıcı sayılır. Değer ilk
+    sonlandırıcıya kadarki rakamlardır. ipaddress gibi boş oktet, baştaki
+    sıfır ve 255 üstü geçersizdir (-1); 3'ten uzun oktetler ayrıca nokta
+    konumlarından elenir.
+    """
+    key = np.arange(1 << 18)
+    c = [(key >> shift) & 0x3F for shift in (0, 6, 12)]
+    n1 = c[0] <= 9
+    n2 = n1 & (c[1] <= 9)
+    n3 = n2 & (c[2] <= 9)
+    val = np.where(n3, c[0] * 100 + c[1] * 10 + c[2], np.where(n2, c[0] * 10 + c[1], c[0]))
+    ok = n1 & ~(n2 & (c[0] == 0)) & (val <= 255)
+    return np.where(ok, val, -1).astype(np.int16)
+
+
+_OCTET = _octet_table()
+
+
+# -------------------------------------------------------------------
+# Vektörel yol
+# -------------------------------------------------------------------
+def _bitmask(mask: np.ndarray) -> np.ndarray:
+    """
+    (n, 16) bool matris → (n,) uint16 satır maskesi; bit i = sütun i.
+    Her satırın 16 baytı iki little-endian uint64 olarak okunur ve
+    _GATHER_BITS çarpımıyla 8'er bite toplanır.
+    """
+    words = np.ascontiguousarray(mask).view("<u8")
+    lo = (words[:, 0] * _GATHER_BITS) >> np.uint64(56)
+    hi = (words[:, 1] * _GATHER_BITS) >> np.uint64(56)
+    return (lo | (hi << np.uint64(8))).astype(np.uint16)
+
+
+def _to_bytes(values) -> np.ndarray:
+    arr = np.asarray(values)
+    try:
+        return arr.astype(f"S{_WIDTH}")
+    except UnicodeEncodeError:
+        # ASCII dışı karakter içeren değerler zaten geçersizdir
+        return np.array([v.encode("ascii", "replace") if isinstance(v, str) else str(v).encode()
+                         for v in arr.ravel()], dtype=f"S{_WIDTH}")
+
+
+def parse_ipv4(values, return_valid: bool = False):
+    """
+    IPv4 metinlerini (liste / ndarray / Series) uint32 dizisine çevir.
+    Geçersiz değerler 0 olur; return_valid=True ise (ips, geçerli_maske).
+    Tamsayı dizileri aralık kontrolüyle doğrudan uint32'ye çevrilir.
+    """
+    arr = np.asarray(values)
+    if arr.dtype.kind in "iu":
+        valid = (arr >= 0) & (arr <= 0xFFFFFFFF)
+        ips = np.where(valid, arr, 0).astype(np.uint32)
+        return (ips, valid) if return_valid else ips
+
+    raw = _to_bytes(arr)
+    n = raw.shape[0]
+    u = raw.view(np.uint8).reshape(n, _WIDTH)    # satır başına bayt, sonda NUL dolgu
+
+    # 1) Bayt sınıfları → 16 bitlik satır maskeleri (bit i = bayt i)
+    nonnul = _bitmask(u != 0)
+    dots   = _bitmask(u == ord("."))
+    digits = _bitmask(u - ord("0") <= 9)         # uint8 taşması: '0' altı > 9 olur
+
+    # 2) Biçim: yalnız rakam / nokta; içerik baştan ardışık (nonnul 0b0..01..1
+    #    biçiminde, yani nonnul + 1 ile ortak biti yok); en fazla 15 bayt
+    #    (bit 15 boş); tam 3 nokta
+    valid = ((nonnul & ~(digits | dots)) == 0) & ((nonnul & (nonnul + 1)) == 0) \
+        & (nonnul < 0x8000) & (_POPCOUNT[dots] == 3)
+
+    rows = np.flatnonzero(valid)
+    ips = np.zeros(n, dtype=np.uint32)
+    if rows.size:
+        dots, nonnul = dots[rows], nonnul[rows]
+        # 3) Her bayt konumundan başlayan hizasız little-endian uint32
+        #    görünümü: tek toplama (gather) ile oktetin ilk 3 baytı okunur.
+        #    Son satırın taşmaması için sona 4 bayt dolgu eklenir.
+        buf = np.zeros(n * _WIDTH + 4, dtype=np.uint8)
+        buf[:n * _WIDTH] = u.ravel()
+        words = np.ndarray((n * _WIDTH,), dtype="<u4", buffer=buf, strides=(1,))
+        base = rows * _WIDTH
+        acc = np.zeros(len(rows), dtype=np.uint32)
+        ok  = np.ones(len(rows), dtype=bool)
+        start = np.zeros(len(rows), dtype=np.intp)
+        for k in range(4):
+            # 4) Oktetin bitişi: ilk 3 oktette sıradaki nokta (maskenin en
+            #    düşük biti, sonra silinir), sonuncuda metnin uzunluğu
+            if k < 3:
+                end = _BIT_INDEX[dots & (~dots + 1)]
+                dots = dots & (dots - 1)
+            else:
+                end = _POPCOUNT[nonnul]
+            # 5) 3 baytı '0' ile XOR'la, alt 6'şar bitini 18 bitlik anahtara
+            #    topla, değeri (ya da geçersizse -1) tablodan oku
+            x = words[base + start] ^ 0x303030
+            val = _OCTET[(x & 0x3F) | ((x >> 2) & 0xFC0) | ((x >> 4) & 0x3F000)]
+            ok &= (val >= 0) & (end - start <= 3)
+            acc = (acc << 8) | (val & 0xFF).astype(np.uint32)
+            start = end + 1
+        valid[rows] = ok
+        ips[rows] = np.where(ok, acc, 0)
+    return (ips, valid) if return_valid else ips
+
+
+def mask_prefix(ips: np.ndarray, prefix: int) -> np.ndarray:
+    """uint32 adresleri /prefix ağ adresine indir."""
+    if not 0 <= prefix <= 32:
+        raise ValueError(f"Geçersiz prefix: {prefix}")
+    mask = np.uint32((0xFFFFFFFF << (32 - prefix)) & 0xFFFFFFFF)
+    return np.asarray(ips, dtype=np.uint32) & mask
+
+
+def format_ipv4(ips: np.ndarray, suffix: str = "") -> np.ndarray:
+    """
+    uint32 adresleri 'a.b.c.d' + suffix metinlerine (NumPy str dizisi)
+    çevir. Baytlar sabit genişlikli bir matrise satır başına imleçle yazılır.
+    """
+    ips = np.asarray(ips, dtype=np.uint32)
+    n = ips.shape[0]
+    tail = suffix.encode("ascii")
+    width = 15 + len(tail)
+    out = np.zeros((n, width), dtype=np.uint8)
+    flat = out.ravel()
+    pos = np.arange(n, dtype=np.intp) * width
+    for k, shift in enumerate((24, 16, 8, 0)):
+        v = ((ips >> shift) & 0xFF).astype(np.uint8)
+        if k:
+            flat[pos] = 46
+            pos += 1
+        # Her basamak imlece yazılır; imleç yalnız basamak varsa ilerler,
+        # böylece kullanılmayan yazımı bir sonraki basamak ezer
+        flat[pos] = 48 + v // 100
+        pos += v >= 100
+        flat[pos] = 48 + (v // 10) % 10
+        pos += v >= 10
+        flat[pos] = 48 + v % 10
+        pos += 1
+    for b in tail:
+        flat[pos] = b
+        pos += 1
+    return out.view(f"S{width}").ravel().astype(f"U{width}")
+
+
+def to_cidr(values, prefix: int = 24) -> np.ndarray:
+    """
+    IPv4 metinleri → 'ağ/prefix' metinleri (object dizisi); geçersizler
+    '0.0.0.0/prefix'. Yalnız farklı ağlar biçimlendirilir.
+    """
+    nets, inverse = np.unique(mask_prefix(parse_ipv4(values), prefix), return_inverse=True)
+    return format_ipv4(nets, suffix=f"/{prefix}").astype(object)[inverse.ravel()]
+
+
+# -------------------------------------------------------------------
+# Skaler (tek kayıt) yol
+# -------------------------------------------------------------------
+@lru_cache(maxsize=CACHE_SIZE)
+def ip_to_int(ip_str) -> int:
+    """Tek IPv4 adresi → int; geçersizse 0."""
+    try:
+        return int(ipaddress.IPv4Address(ip_str))
+    except (ValueError, TypeError):
+        return 0
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def cidr(ip_str, prefix: int = 24) -> str:
+    """Tek IPv4 adresi → 'ağ/prefix'; geçersizse '0.0.0.0/prefix'."""
+    ip = ip_to_int(ip_str) & ((0xFFFFFFFF << (32 - prefix)) & 0xFFFFFFFF)
+    return f"{ipaddress.IPv4Address(ip)}/{prefix}"
@@ -0,0 +1,125 @@
+# line_framer.py
+"""
+JSON-lines protokolü için artımlı satır çerçeveleyici.
+
+Gelen baytlar tek bir bytearray'e eklenir ve yalnızca yeni gelen kısımda
+"\\n" aranır; tamamlanan satırlar memoryview dilimi olarak (kopyasız)
+çözücüye verilir. Tüketilen önek her feed sonunda bir kez silinir, böylece
+tamponda en fazla bir yarım satır kalır. max_line'ı aşan satır atılır ve
+bir sonraki "\\n"e kadar gelen baytlar tampona alınmaz; satır sonu
+göndermeyen bir istemci belleği sınırsız büyütemez.
+
+Çözücü takılabilir: varsayılan olarak orjson (memoryview'ı doğrudan okur),
+yoksa standart json kullanılır. raw=True ise satırlar çözülmeden bytes
+olarak döner (çözme işçi süreçlerde yapılır); shard anahtarı gibi tek bir
+metin alanı peek_field ile satır çözülmeden okunabilir.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+MAX_LINE_BYTES = 1 << 20
+
+
+def json_decoder(line: memoryview):
+    return json.loads(bytes(line))
+
+
+def peek_field(line: bytes, key: str) -> str:
+    """
+    JSON satırını çözmeden üst düzey "key": "değer" metin alanını oku.
+    Alan yoksa ya da değeri metin değilse "" döner (kaçış dizileri çözülmez).
+    """
+    tag = b'"' + key.encode() + b'"'
+    i = line.find(tag)
+    if i == -1:
+        return ""
+    colon = line.find(b":", i + len(tag))
+    quote = line.find(b'"', colon + 1) if colon != -1 else -1
+    # İki nokta ile tırnak arasında yalnız boşluk olmalı (değer metin)
+    if quote == -1 or line[colon + 1:quote].strip():
+        return ""
+    end = line.find(b'"', quote + 1)
+    return line[quote + 1:end].decode("utf-8", "replace") if end != -1 else ""
+
+
+default_decoder = orjson.loads if orjson is not None else json_decoder
+
+
+class LineFramer:
+    def __init__(self, max_line: int = MAX_LINE_BYTES, decoder=None, raw: bool = False):
+        self.max_line = max_line
+        self.decode   = decoder or default_decoder
+        self.raw      = raw
+        self.lines        = 0   # çözülen kayıt
+        self.parse_errors = 0
+        self.oversized    = 0   # max_line'ı aştığı için atılan satır
+        self._buf = bytearray()
+        self._discarding = False
+
+    @property
+    def pending(self) -> int:
+        """Tamponda bekleyen (yarım satır) bayt sayısı."""
+        return len(self._buf)
+
+    def feed(self, data) -> list:
+        """Yeni baytları ekle; tamamlanan satırlardan çözülen nesneleri döndür."""
+        if self._discarding:
+            i = data.find(b"\n")
+            if i == -1:
+                return []
+            data = memoryview(data)[i + 1:]
+            self._discarding = False
+
+        buf  = self._buf
+        scan = len(buf)
+        buf += data
+        out  = []
+        pos  = 0
+        i = buf.find(b"\n", scan)
+        if i != -1:
+            with memoryview(buf) as mv:
+                while i != -1:
+                    if i - pos > self.max_line:
+                        self._drop(i - pos)
+                    elif i > pos:
+                        self._decode(mv[pos:i], out)
+                    pos = i + 1
+                    i = buf.find(b"\n", pos)
+            del buf[:pos]
+
+        if len(buf) > self.max_line:
+            self._drop(len(buf))
+            buf.clear()
+            self._discarding = True
+        return out
+
+    def _decode(self, line: memoryview, out: list):
+        if self.raw:
+            line = bytes(line)
+            if line.strip():
+                self.lines += 1
+                out.append(line)
+            return
+        try:
+            obj = self.decode(line)
+        except ValueError as e:
+            if not bytes(line).strip():
+                return
+            self.parse_errors += 1
+            print(" JSON parse hatası:", e)
+            return
+        if not isinstance(obj, dict):
+            self.parse_errors += 1
+            print(" JSON parse hatası: nesne bekleniyordu")
+            return
+        self.lines += 1
+        out.append(obj)
+
+    def _drop(self, size: int):
+        self.oversized += 1
+        print(f" Satır çok uzun ({size} bayt > {self.max_line}), atlandı")
@@ -1,3 +1,5 @@
+import os
+import tempfile
 import streamlit as st
 import pandas as pd
 from datetime import datetime
@@ -5,6 +7,9 @@ from streamlit_autorefresh import st_autorefresh
 import plotly.express as px
 import plotly.graph_objects as go
 
+from alert_tail import AlertTail, iter_csv as iter_alert_csv
+from alert_rollup import RollupStore, ROLLUP_DIR, RECENT_ROWS, lttb
+
 # --- SABITLER & KONFIGÜRASYON ---
 COLORS = {
     "primary":    "#005F73",   # Koyu petrol
@@ -19,10 +24,26 @@ COLORS = {
     "neutral":    "#ADB5BD"    # Açık gri
 }
 CSV_PATH     = "alerts.csv"
+# "parquet": alert'ler tcp_listener'ın yazdığı bölümlenmiş depodan okunur
+# (bkz. alert_store.py); "csv": alerts.csv
+ALERT_BACKEND   = "csv"
+ALERT_STORE_DIR = "alerts"
 REFRESH_MIN  = 5
 REFRESH_MAX  = 120
 REFRESH_DEFAULT = 30
 DOWNLOAD_TEMPLATE = "security_logs_{:%Y%m%d_%H%M%S}.csv"
+# Zaman aralığı seçenekleri: en yeni alert'ten geriye (None = tüm geçmiş)
+TIME_RANGES = {
+    "Last 1 hour":   pd.Timedelta(hours=1),
+    "Last 6 hours":  pd.Timedelta(hours=6),
+    "Last 24 hours": pd.Timedelta(hours=24),
+    "Last 7 days":   pd.Timedelta(days=7),
+    "Last 30 days":  pd.Timedelta(days=30),
+    "All":           None,
+}
+TIME_RANGE_DEFAULT = "Last 24 hours"
+SERIES_POINTS      = 1500   # çizgi serisi: en fazla kova (çözünürlük buna göre seçilir)
+MAX_MARKERS        = 500    # anomali noktaları: LTTB ile en fazla nokta
 
 # --- SAYFA AYARLARI & GLOBAL CSS ---
 st.set_page_config(
@@ -63,32 +84,83 @@ st.markdown(f"""
 """, unsafe_allow_html=True)
 
 # --- VERI ERIŞIM & ON-ISLEME ---
-def load_data(path: str = CSV_PATH) -> pd.DataFrame:
-    """CSV’den veriyi oku, timestamp/ek sütunları oluştur."""
+@st.cache_resource
+def get_tail(path: str = CSV_PATH) -> AlertTail:
+    """Oturumlar arasında paylaşılan artımlı okuyucu (bkz. alert_tail.py)."""
+    return AlertTail(path)
+
+@st.cache_resource
+def get_store(root: str = ALERT_STORE_DIR):
+    from alert_store import AlertStore
+    return AlertStore(root)
+
+@st.cache_resource
+def get_rollups(path: str = CSV_PATH, root: str = ROLLUP_DIR) -> RollupStore:
+    """Kalıcı ön-özetler (bkz. alert_rollup.py); grafikler ve metrikler buradan okunur."""
+    return RollupStore(get_store() if ALERT_BACKEND == "parquet" else path, root)
+
+def load_rollups(path: str = CSV_PATH) -> RollupStore:
+    rollups = get_rollups(path)
+    try:
+        rollups.refresh()
+    except Exception as e:
+        st.error(f"Özet güncelleme hatası: {e}")
+    return rollups
+
+def load_data(path: str = CSV_PATH, start=None, end=None) -> pd.DataFrame:
+    """
+    [start, end] aralığındaki alert'ler. CSV: son okumadan beri eklenen
+    satırlar okunur, önbellekten süzülür. Parquet: yalnız aralıkla kesişen
+    bölümler bellek eşlemeyle okunur. Yalnız son kayıtlar penceresinin
+    karşılamadığı (geçmişteki özel) aralıklarda çağrılır.
+    """
     try:
-        df = pd.read_csv(path)
-        df["timestamp"] = pd.to_datetime(df["timestamp"])
-        df["hour"]      = df["timestamp"].dt.hour
-        df["date"]      = df["timestamp"].dt.date
+        if ALERT_BACKEND == "parquet":
+            return get_store().read(start, end)
+        tail = get_tail(path)
+        tail.refresh()
+        df = tail.frame
+        if len(df) and start is not None:
+            df = df[df["timestamp"] >= start]
+        if len(df) and end is not None:
+            df = df[df["timestamp"] <= end]
         return df
     except Exception as e:
         st.error(f"Veri yükleme hatası: {e}")
         return pd.DataFrame()
 
+def iter_export(path: str = CSV_PATH, start=None, end=None):
+    """Dışa aktarım için alerts.csv biçiminde CSV metin parçaları."""
+    if ALERT_BACKEND == "parquet":
+        return get_store().iter_csv(start, end)
+    return iter_alert_csv(path, start, end)
+
+def write_export(start=None, end=None) -> str:
+    """Dışa aktarımı parça parça geçici dosyaya yaz; oturumun önceki dosyası silinir."""
+    old = st.session_state.pop("export", None)
+    if old and os.path.exists(old["path"]):
+        os.remove(old["path"])
+    with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False,
+                                     encoding="utf-8", newline="") as f:
+        for chunk in iter_export(start=start, end=end):
+            f.write(chunk)
+    return f.name
+
 # --- METRIK HESAPLAMA ---
-def compute_metrics(df: pd.DataFrame) -> dict:
-    """Anahtar metrikleri hesapla."""
-    total        = len(df)
-    unique_ips   = df["srcip"].nunique() if total else 0
-    peak_hour    = df["hour"].value_counts().idxmax() if total else 0
-    normal_count = len(df[df.get("attack_cat")=="Normal"]) if "attack_cat" in df.columns else 0
+def compute_metrics(rollups: RollupStore) -> dict:
+    """Anahtar metrikleri ön-özetlerden oku (geçmiş taranmaz)."""
+    total        = rollups.total
+    unique_ips   = rollups.distinct() if total else 0
+    peak_hour    = rollups.peak_hour()
+    normal_count = rollups.totals["attack_cat"].get("Normal", 0)
     anomaly_rate = (1 - normal_count/total)*100 if total else 0
     return {
         "total_flows":  total,
         "unique_ips":   unique_ips,
         "peak_hour":    peak_hour,
         "normal_count": normal_count,
-        "anomaly_rate": anomaly_rate
+        "anomaly_rate": anomaly_rate,
+        "skipped":      rollups.skipped
     }
 
 # --- AYARLAR PANELI ---
@@ -100,6 +172,23 @@ def render_settings() -> int:
         st_autorefresh(interval=rate*1000, key="auto_refresh")
     return rate
 
+def render_time_range(rollups: RollupStore):
+    """Zaman aralığı seçimi → (başlangıç, bitiş); aralık en yeni alert'e göre."""
+    end = rollups.last_ts
+    with st.sidebar:
+        choice = st.selectbox("Time Range", list(TIME_RANGES) + ["Custom"],
+                              index=list(TIME_RANGES).index(TIME_RANGE_DEFAULT))
+        if choice != "Custom" or end is None:
+            span = TIME_RANGES.get(choice)
+            return (None if span is None or end is None else end - span), end
+        first, last = pd.Timestamp(rollups.days[0]).date(), end.date()
+        picked = st.date_input("Dates", value=(max(first, last - pd.Timedelta(days=6)), last),
+                               min_value=first, max_value=last)
+    if not isinstance(picked, (tuple, list)):
+        picked = (picked,)
+    lo, hi = picked[0], picked[-1]
+    return pd.Timestamp(lo), pd.Timestamp(hi) + pd.Timedelta(days=1) - pd.Timedelta(minutes=1)
+
 # --- HEADER ---
 def render_header():
     st.markdown(f"""
@@ -127,12 +216,18 @@ def render_metrics(metrics: dict):
                   <h2 style='margin:5px 0;color:{list(COLORS.values())[idx]}'>{value}</h2>
                 </div>
             """, unsafe_allow_html=True)
+    if metrics["skipped"]:
+        st.caption(f"{metrics['skipped']} records with an invalid timestamp are not counted")
 
 # --- GRAFIK VE TABLO FONKSIYONLARI ---
-def render_tcp_dist(df: pd.DataFrame):
+def _totals_frame(counts, name: str) -> pd.DataFrame:
+    data = pd.Series(counts, dtype="int64").sort_values(ascending=False).reset_index()
+    data.columns = [name, "count"]
+    return data
+
+def render_tcp_dist(rollups: RollupStore):
     st.markdown("<div class='section-title'>🔄 TCP State Distribution</div>", unsafe_allow_html=True)
-    data = df["state"].value_counts().reset_index()
-    data.columns = ["state","count"]
+    data = _totals_frame(rollups.totals["state"], "state")
     fig = px.bar(data, x="state", y="count", color="count",
                  color_continuous_scale=[COLORS["light"], COLORS["primary"]],
                  height=300)
@@ -145,12 +240,11 @@ def render_tcp_dist(df: pd.DataFrame):
     )
     st.plotly_chart(fig, use_container_width=True)
 
-def render_attack_dist(df: pd.DataFrame):
-    if "attack_cat" not in df.columns: return
+def render_attack_dist(rollups: RollupStore):
+    if not rollups.totals["attack_cat"]: return
     st.markdown("<div class='attack-section'>", unsafe_allow_html=True)
     st.markdown("<div class='section-title'>🔍 Attack Type Analysis</div>", unsafe_allow_html=True)
-    data = df["attack_cat"].value_counts().reset_index()
-    data.columns = ["attack","count"]
+    data = _totals_frame(rollups.totals["attack_cat"], "attack")
     fig = px.pie(data, names="attack", values="count", hole=0.4,
                  color_discrete_map={
                      k: (COLORS["success"] if k=="Normal" else COLORS["danger"])
@@ -161,12 +255,18 @@ def render_attack_dist(df: pd.DataFrame):
     st.plotly_chart(fig, use_container_width=True)
     st.markdown("</div>", unsafe_allow_html=True)
 
-def render_time_series(df: pd.DataFrame):
-    if "attack_cat" not in df.columns: return
+def render_time_series(rollups: RollupStore, start=None, end=None):
+    if rollups.last_ts is None: return
     st.markdown("<div class='section-title'>⏱️ Time Series Analysis</div>", unsafe_allow_html=True)
-    ts = df.set_index("timestamp")
-    normal  = ts[ts["attack_cat"]=="Normal"].resample("1T").size().reset_index(name="count")
-    anomaly = ts[ts["attack_cat"]!="Normal"].resample("1T").size().reset_index(name="count")
+    # Yalnız aralıkla kesişen gün bölümleri okunur; çözünürlük aralığa göre
+    counts, freq = rollups.series("attack_cat", start, end, SERIES_POINTS)
+    normal  = counts["Normal"] if "Normal" in counts.columns else pd.Series(0, index=counts.index)
+    normal  = normal.rename_axis("timestamp").reset_index(name="count")
+    other   = counts.drop(columns=["Normal"], errors="ignore").sum(axis=1)
+    anomaly = other[other > 0].rename_axis("timestamp").reset_index(name="count")
+    keep    = lttb(anomaly["timestamp"].to_numpy(), anomaly["count"].to_numpy(), MAX_MARKERS)
+    anomaly = anomaly.iloc[keep]
+    st.caption(f"Resolution: {freq} | {len(anomaly)} anomaly points shown")
 
     fig = go.Figure()
     fig.add_trace(go.Scatter(x=normal["timestamp"], y=normal["count"], mode="lines",
@@ -185,16 +285,35 @@ def render_time_series(df: pd.DataFrame):
     )
     st.plotly_chart(fig, use_container_width=True)
 
-def render_data_table(df: pd.DataFrame):
-    st.markdown("<div class='section-title'>📄 Recent Records (Top 50)</div>", unsafe_allow_html=True)
-    sub = df.sort_values("timestamp", ascending=False).head(50).copy()
+def render_data_table(rollups: RollupStore, start=None, end=None):
+    st.markdown(f"<div class='section-title'>📄 Recent Records (Top {RECENT_ROWS})</div>", unsafe_allow_html=True)
+    # Rollup'ların tuttuğu en yeni RECENT_ROWS kayıt; kaynak yalnız aralık
+    # bu pencereden eskiye uzanıyorsa okunur
+    sub, complete = rollups.recent_rows(start, end)
+    if not complete:
+        df = load_data(start=start, end=end)
+        sub = df.nlargest(RECENT_ROWS, "timestamp", keep="last") if len(df) else df
+    sub = sub.drop(columns=["hour", "date"], errors="ignore")
     def style_attack(v):
         return f"background-color:{COLORS['success']}" if v=="Normal" else f"background-color:{COLORS['danger']}"
     if "attack_cat" in sub.columns:
-        st.dataframe(sub.style.applymap(style_attack, subset=["attack_cat"]), height=250)
+        st.dataframe(sub.style.map(style_attack, subset=["attack_cat"]), height=250)
     else:
         st.dataframe(sub, height=250)
 
+def render_export(start=None, end=None):
+    """CSV yalnız istenince hazırlanır (parça parça, geçici dosyaya)."""
+    only_range = st.checkbox("Only selected time range", value=True)
+    if st.button("📦 Prepare CSV"):
+        lo, hi = (start, end) if only_range else (None, None)
+        with st.spinner("Preparing CSV..."):
+            st.session_state["export"] = {"path": write_export(lo, hi),
+                                          "name": DOWNLOAD_TEMPLATE.format(datetime.now())}
+    export = st.session_state.get("export")
+    if export and os.path.exists(export["path"]):
+        with open(export["path"], "rb") as f:
+            st.download_button("⬇️ Download CSV", data=f, file_name=export["name"], mime="text/csv")
+
 # --- FOOTER ---
 def render_footer():
     st.markdown("---")
@@ -208,27 +327,23 @@ def render_footer():
 # --- ANA AKIS ---
 def main():
     refresh_rate = render_settings()
-    df = load_data()
-    if df.empty: return
+    rollups = load_rollups()
+    start, end = render_time_range(rollups)
+    if not rollups.total: return
 
-    metrics = compute_metrics(df)
+    metrics = compute_metrics(rollups)
     render_header()
     render_metrics(metrics)
 
     tabs = st.tabs(["Overview","Analysis","Data"])
     with tabs[0]:
-        render_tcp_dist(df)
-        render_attack_dist(df)
+        render_tcp_dist(rollups)
+        render_attack_dist(rollups)
     with tabs[1]:
-        render_time_series(df)
+        render_time_series(rollups, start, end)
     with tabs[2]:
-        render_data_table(df)
-        st.download_button(
-            "⬇️ Download CSV",
-            data=df.to_csv(index=False).encode("utf-8"),
-            file_name=DOWNLOAD_TEMPLATE.format(datetime.now()),
-            mime="text/csv"
-        )
+        render_data_table(rollups, start, end)
+        render_export(start, end)
 
     render_footer()
 
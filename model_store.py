@@ -0,0 +1,90 @@
+# model_store.py
+"""
+Paylaşımlı, bellek eşlemeli (memory-mapped) model yükleme.
+
+Modeller sıkıştırmasız joblib olarak kaydedilir; joblib bu biçimde her
+NumPy dizisini dosya içinde hizalı, ardışık bir blok olarak yazar.
+load_model(..., mmap=True) bu blokları np.memmap olarak açar: diziler
+kopyalanmaz, sayfalar işletim sisteminin sayfa önbelleğinden okunur ve aynı
+makinedeki tüm dinleyici / işçi süreçleri tek fiziksel kopyayı paylaşır.
+
+Eşleme yalnız düz NumPy dizi tabanlı artefaktlarda işe yarar (ör.
+tree_engine.CompiledForest içeren kaskad). sklearn ağaçları (Tree) unpickle
+sırasında düğüm dizilerini kendi belleğine kopyalar; bu yüzden sklearn
+pipeline'ları için mmap hiçbir şey paylaştırmaz ve varsayılan kapalıdır.
+
+BootReport açılışta her modelin yüklenme süresini ve sürecin yerleşik
+belleğini (RSS; paylaşılan / özel ayrımıyla) raporlar.
+"""
+
+import os
+import time
+import joblib
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def save_model(obj, path: str):
+    """Modeli bellek eşlemeye uygun (sıkıştırmasız) biçimde kaydet."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    joblib.dump(obj, path, compress=0)
+
+
+def load_model(path: str, mmap: bool = False):
+    """Modeli yükle; mmap=True ise NumPy dizileri salt-okunur eşlenir."""
+    return joblib.load(path, mmap_mode="r" if mmap else None)
+
+
+def memory_info() -> dict:
+    """
+    Sürecin bellek kullanımı (MB): rss, shared, private. Linux'ta
+    /proc/self/smaps_rollup, yoksa psutil kullanılır; ikisi de yoksa {}.
+    """
+    try:
+        fields = {}
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                    fields[parts[0][:-1]] = int(parts[1]) / 1024
+        shared  = fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0)
+        private = fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+        return {"rss": fields.get("Rss", 0.0), "shared": shared, "private": private}
+    except OSError:
+        pass
+    if psutil is not None:
+        mi = psutil.Process().memory_full_info()
+        return {"rss": mi.rss / 2**20, "shared": getattr(mi, "shared", 0) / 2**20,
+                "private": getattr(mi, "uss", 0) / 2**20}
+    return {}
+
+
+class BootReport:
+    """Açılışta model yükleme sürelerini ve bellek kullanımını toplar."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.mem_before = memory_info()
+        self.loads = []      # (path, saniye, dosya MB)
+
+    def load(self, path: str, mmap: bool = False):
+        t0 = time.perf_counter()
+        obj = load_model(path, mmap=mmap)
+        self.loads.append((path, time.perf_counter() - t0, os.path.getsize(path) / 2**20))
+        return obj
+
+    def report(self):
+        for path, secs, size in self.loads:
+            print(f" Model yüklendi: {path} ({size:.1f} MB, {secs:.2f} sn)")
+        total = time.perf_counter() - self.started
+        mem   = memory_info()
+        if mem:
+            grown = mem["rss"] - self.mem_before.get("rss", 0)
+            print(f" Açılış: {total:.2f} sn | RSS {mem['rss']:.0f} MB "
+                  f"(+{grown:.0f} MB modeller; paylaşılan {mem['shared']:.0f} MB, "
+                  f"özel {mem['private']:.0f} MB)")
+        else:
+            print(f" Açılış: {total:.2f} sn")
@@ -0,0 +1,218 @@
+# rule_engine.py
+"""
+Veri olarak tanımlanan alan kuralları (is_dos_like, is_recon_like, …) ve
+iki derleme yolu:
+  – Toplu (vektörel): her koşul tek bir NumPy karşılaştırması; eğitimde
+    kural sütunlarını üretir (data_utils._select_features).
+  – Tekil (skaler): canlı akış için sözlükten doğrudan okuyan, ilk sağlanmayan
+    koşulda duran (short-circuit) değerlendirme (tcp_listener).
+
+Kural biçimi (RULES ya da aynı yapıda bir JSON dosyası, bkz. load_rules):
+    {"name": "is_dos_like",
+     "when": [["sbytes", ">", 40000], ["dur", "<", 2.0], ["sinpkt", "<", 0.01]],
+     "decide": "DoS"}          # isteğe bağlı
+  – when  : koşulların VE'si; [sütun, operatör, değer]. Eksik sütun / None /
+            NaN = 0 (toplu ve tekil yolda aynı).
+  – decide: kesin (decisive) kural. Eşleşen akış modellere gitmeden bu
+            etiketle karara bağlanır ("Normal" = saldırı değil). Kesin kurallar
+            listedeki sırayla denenir, ilk eşleşen karar verir.
+
+Varsayılan kuralların hiçbiri kesin değildir (yalnız özellik sütunu); bir
+kuralı kesin yapmadan önce etiketli veride isabetine bakılır:
+    python rule_engine.py [csv ...]
+"""
+
+import sys
+import json
+import operator
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+RULES = [
+    {"name": "is_dos_like",
+     "when": [["sbytes", ">", 40000], ["dur", "<", 2.0], ["sinpkt", "<", 0.01]]},
+    {"name": "is_backdoor_like",
+     "when": [["ct_src_dport_ltm", ">", 0], ["is_ftp_login", "==", 1], ["ct_ftp_cmd", ">", 1]]},
+    {"name": "is_recon_like",
+     "when": [["ct_dst_ltm", ">", 7], ["ct_dst_sport_ltm", ">", 4], ["dur", "<", 0.2]]},
+    {"name": "is_fuzzers_like",
+     "when": [["sjit", ">", 0.7], ["djit", ">", 0.7], ["sbytes", ">", 20000]]},
+    {"name": "is_exploit_like",
+     "when": [["trans_depth", ">", 4], ["res_bdy_len", ">", 1000], ["dbytes", ">", 30000]]},
+    {"name": "is_analysis_like",
+     "when": [["ct_flw_http_mthd", ">", 0], ["trans_depth", ">", 2], ["res_bdy_len", ">", 5000]]},
+]
+
+# operatör → (vektörel, skaler)
+OPS = {
+    ">":  (np.greater,       operator.gt),
+    ">=": (np.greater_equal, operator.ge),
+    "<":  (np.less,          operator.lt),
+    "<=": (np.less_equal,    operator.le),
+    "==": (np.equal,         operator.eq),
+    "!=": (np.not_equal,     operator.ne),
+    "in": (np.isin,          lambda a, b: a in b),
+}
+
+
+def load_rules(path: str) -> list:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class Rule:
+    __slots__ = ("name", "conds", "decide")
+
+    def __init__(self, spec: dict):
+        self.name   = spec["name"]
+        self.decide = spec.get("decide")
+        self.conds  = []
+        for col, op, value in spec["when"]:
+            if op not in OPS:
+                raise ValueError(f"{self.name}: bilinmeyen operatör {op!r}")
+            if op == "in":
+                value = frozenset(value)
+            self.conds.append((str(col).strip().lower(), op, value))
+        if not self.conds:
+            raise ValueError(f"{self.name}: koşul yok")
+
+    def mask(self, df: pd.DataFrame) -> np.ndarray:
+        n = len(df)
+        out = np.ones(n, dtype=bool)
+        for col, op, value in self.conds:
+            x = df[col].to_numpy() if col in df.columns else np.zeros(n)
+            # Eksik değer 0 sayılır (match ile aynı; NaN karşılaştırması hep False olurdu)
+            na = pd.isna(x)
+            if na.any():
+                x = np.where(na, 0, x)
+            if op == "in":
+                out &= np.isin(x, list(value))
+            else:
+                out &= OPS[op][0](x, value)
+        return out
+
+    def match(self, get) -> bool:
+        for col, op, value in self.conds:
+            v = get(col)
+            if v is None or v != v:     # None / NaN
+                v = 0
+            if not OPS[op][1](v, value):
+                return False
+        return True
+
+
+class RuleEngine:
+    """
+    rules: kural sözlükleri listesi (varsayılan RULES).
+    track_all: decide_one kesin olmayan kuralların isabetini de sayar
+               (karar verilmeyen akışlarda, ek koşul değerlendirmesi).
+
+    add_columns(df)  → kural sütunları eklenmiş df (vektörel)
+    decide_one(obj)  → (kural adı, etiket) ya da None (skaler; yalnız kesin
+                       kurallar, ilk eşleşen)
+    hits             → Counter: kural adı → eşleşme sayısı
+    """
+
+    def __init__(self, rules: list = None, track_all: bool = False):
+        self.rules    = [Rule(r) for r in (RULES if rules is None else rules)]
+        names = [r.name for r in self.rules]
+        if len(set(names)) != len(names):
+            raise ValueError("kural adları tekil olmalı")
+        self.decisive = [r for r in self.rules if r.decide is not None]
+        self.passive  = [r for r in self.rules if r.decide is None] if track_all else []
+        self.hits     = Counter()
+        self.seen     = 0
+        self.decided  = 0
+        self.errors   = 0
+
+    @property
+    def names(self) -> list:
+        return [r.name for r in self.rules]
+
+    # ---------------------------------------------------------------
+    # Toplu yol
+    # ---------------------------------------------------------------
+    def evaluate(self, df: pd.DataFrame) -> dict:
+        """Kural adı → bool dizisi; eşleşmeler hits'e eklenir."""
+        out = {r.name: r.mask(df) for r in self.rules}
+        for name, m in out.items():
+            self.hits[name] += int(m.sum())
+        self.seen += len(df)
+        return out
+
+    def add_columns(self, df: pd.DataFrame) -> pd.DataFrame:
+        for name, m in self.evaluate(df).items():
+            df[name] = m
+        return df
+
+    # ---------------------------------------------------------------
+    # Tekil (canlı) yol
+    # ---------------------------------------------------------------
+    def decide_one(self, obj: dict):
+        """
+        Kesin kuralları sırayla dene → (kural adı, etiket) ya da None.
+        Değerlendirilemeyen kayıt (ör. sayı olmayan alan) karar vermez.
+        """
+        self.seen += 1
+        if not (self.decisive or self.passive):
+            return None
+        get = obj.get
+        if any(k != k.strip().lower() for k in obj):
+            norm = {k.strip().lower(): v for k, v in obj.items()}
+            get  = norm.get
+        try:
+            for rule in self.decisive:
+                if rule.match(get):
+                    self.hits[rule.name] += 1
+                    self.decided += 1
+                    return rule.name, rule.decide
+            for rule in self.passive:
+                if rule.match(get):
+                    self.hits[rule.name] += 1
+        except TypeError:
+            self.errors += 1
+        return None
+
+    def summary(self) -> str:
+        parts = ", ".join(f"{r.name}={self.hits[r.name]}" for r in self.rules if self.hits[r.name])
+        return (f"{self.seen} akış, {self.decided} kuralla karara bağlandı"
+                f"{f', {self.errors} değerlendirilemedi' if self.errors else ''}"
+                f" | isabet: {parts or '-'}")
+
+
+# -------------------------------------------------------------------
+# Etiketli veride kural isabeti
+# -------------------------------------------------------------------
+def rule_report(df: pd.DataFrame, engine: RuleEngine = None) -> pd.DataFrame:
+    """
+    Kural başına eşleşme sayısı, saldırı oranı (label == 1) ve eşleşenlerin
+    en sık attack_cat'i. Kesin yapılacak kurallar için saldırı oranı ≈ 1 ve
+    tür payı yüksek olmalıdır.
+    """
+    engine = engine or RuleEngine()
+    rows = {}
+    for name, m in engine.evaluate(df).items():
+        row = {"eşleşme": int(m.sum()), "oran_%": 100 * m.mean() if len(m) else 0.0}
+        if "label" in df.columns and m.any():
+            row["saldırı_%"] = 100 * float((df["label"].to_numpy()[m] != 0).mean())
+        if "attack_cat" in df.columns and m.any():
+            cats = df["attack_cat"][m].astype(str).str.strip().value_counts()
+            row["en_sık_tür"] = cats.index[0]
+            row["tür_payı_%"] = 100 * cats.iloc[0] / cats.sum()
+        rows[name] = row
+    return pd.DataFrame.from_dict(rows, orient="index")
+
+
+def main(paths):
+    from dataset_store import TRAIN_FILE, load_dataset
+
+    for path in paths or [TRAIN_FILE]:
+        df = load_dataset(path)
+        print(f"\n› {path} ({len(df):,} satır)")
+        print(rule_report(df).to_string(float_format=lambda v: f"{v:.2f}"))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -7,8 +7,8 @@ Stage-1 Random-Forest (binary) modeli için:
 """
 
 import joblib
-import pandas as pd
 import matplotlib.pyplot as plt
+from dataset_store import load_dataset
 from sklearn.metrics import (
     confusion_matrix,
     ConfusionMatrixDisplay,
@@ -26,8 +26,7 @@ print("› Model yükleniyor…")
 model = joblib.load(MODEL_FILE)
 
 print("› Test seti yükleniyor…")
-df_test = pd.read_csv(TEST_FILE)
-df_test.columns = df_test.columns.str.strip().str.lower()
+df_test = load_dataset(TEST_FILE)
 
 # Hedef ve özellik ayır
 y_true = (df_test["label"] != 0).astype(int)           # 0=Normal, 1=Attack
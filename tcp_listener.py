@@ -1,12 +1,16 @@
-
-import socket
-import json
-import csv
-from datetime import datetime
-from collections import deque
+import os
+import asyncio
+import time
+import threading
 import pandas as pd
-import ipaddress
-import joblib
+from model_store import BootReport
+from cascade import TwoStageCascade, CASCADE_PATH
+from alert_sink import AlertSink
+from inference_workers import WorkerPool
+from line_framer import LineFramer, peek_field
+from flow_stats import FlowAnomalyDetector
+from ip_utils import cidr
+from rule_engine import RuleEngine, load_rules
 
 # -------------------------------------------------------------------
 # Ayarlar
@@ -14,18 +18,121 @@ import joblib
 HOST = "0.0.0.0"
 PORT = 5050
 
-# Sliding‐window anomaly detection
-WINDOW_SIZE  = 500
-THRESHOLD    = 500.0
-window       = deque(maxlen=WINDOW_SIZE)
-total_sbytes = 0
+# Sliding‐window anomaly detection: srcip ve /24 başına zaman pencereli
+# sayaçlar (LRU + count-min sketch ile sınırlı bellek, bkz. flow_stats.py)
+WINDOW_SECONDS   = 60.0
+WINDOW_BUCKETS   = 6
+THRESHOLD        = 500.0    # pencere içi ortalama sbytes
+MAX_FLOWS        = 1000     # pencere içi akış sayısı
+MIN_FLOWS        = 20       # bu sayının altındaki anahtarlar değerlendirilmez
+MAX_TRACKED_KEYS = 100_000  # düzey başına tam takip edilen anahtar
+
+# Mikro-batch çıkarım: akışlar biriktirilip tek vektörel çağrıda skorlanır.
+# Hangisi önce dolarsa: BATCH_SIZE akış ya da en eski akış için
+# BATCH_MAX_LATENCY saniye. BATCH_SIZE = 1 eski tek-satır davranışıdır.
+BATCH_SIZE        = 64
+BATCH_MAX_LATENCY = 0.05
+STAGE1_THRESHOLD  = 0.6
+
+# Eşzamanlı sunucu: bağlantı limiti ve okuma → skorlama arası sınırlı kuyruk
+MAX_CONNECTIONS = 64
+QUEUE_MAXSIZE   = 10000
+RECV_SIZE       = 8192
+MAX_LINE_BYTES  = 1 << 20   # daha uzun satırlar atılır
+
+# Kural motoru (bkz. rule_engine.py): "decide" alanı olan kesin kurallara
+# uyan akışlar modeller çağrılmadan karara bağlanır. RULES_PATH yoksa
+# varsayılan kurallar (hiçbiri kesin değil) kullanılır. Kural isabetleri
+# RULE_REPORT_INTERVAL saniyede bir yazdırılır (0 = yalnız kapanışta);
+# RULE_TRACK_ALL kesin olmayan kuralların isabetlerini de sayar.
+RULES_PATH           = "rules.json"
+RULE_REPORT_INTERVAL = 300.0
+RULE_TRACK_ALL       = True
+
+# Çok çekirdekli mod: akışlar srcip'in /24 ağına göre WORKERS sürece
+# dağıtılır. Ana süreç satırları çözmeden (yalnız srcip okunarak) dağıtır;
+# JSON çözme, skorlama ve akış satırlarının yazdırılması işçilerde yapılır,
+# ana sürece yalnız alert'ler döner. 0 = tek süreç.
+WORKERS = 0
+
+# Akış başına konsol satırı (Normal / Saldırı Türü). Yüksek debide stdout
+# darboğaz olur; False ile yalnız alert'ler ve özetler yazılır.
+FLOW_LOG = True
+
+# Alert yazıcı: dosya açık kalır, satırlar arka planda toplu yazılır.
+# Rotasyon (bayt / saniye) ve fsync (satır / saniye) için 0 = kapalı.
+# ALERT_BACKEND = "parquet": alert'ler ALERT_STORE_DIR altında tarihe göre
+# bölümlenmiş Parquet dosyalarına yazılır (bkz. alert_store.py; CSV'ye
+# dışa aktarım: python alert_store.py export). Dashboard'da da aynı ayar.
+ALERT_BACKEND         = "csv"
+ALERT_STORE_DIR       = "alerts"
+ALERT_PATH            = "alerts.csv"
+ALERT_FLUSH_INTERVAL  = 0.5
+ALERT_ROTATE_BYTES    = 0
+ALERT_ROTATE_INTERVAL = 0
+ALERT_FSYNC_ROWS      = 0
+ALERT_FSYNC_INTERVAL  = 5.0
+
+# Modeller. Sıcak yol kaskad artefaktıdır (bkz. cascade.py): ağaçlar düz
+# NumPy dizileri (tree_engine.CompiledForest) olarak saklandığından MODEL_MMAP
+# ile bellek eşlemeli açılır ve aynı makinedeki süreçler tek fiziksel kopyayı
+# paylaşır. sklearn pipeline'ları eşlenemez (Tree unpickle sırasında düğüm
+# dizilerini kopyalar); yalnız kaskad artefaktı yoksa / eskiyse ya da
+# DataFrame yoluna düşülünce load_pipelines() ile yüklenir.
+MODEL_MMAP  = True
+STAGE1_PATH = "stage1_binary_pipe.joblib"
+STAGE2_PATH = "models/stage2_pipe.joblib"
+boot = BootReport()
+_pipes = None
+_in_worker = False
 
-# Her IP için flow sayacı
-ip_flow_counts = {}
+def load_pipelines():
+    """(stage1_pipe, stage2_pipe); ilk çağrıda yüklenir."""
+    global _pipes
+    if _pipes is None:
+        _pipes = (boot.load(STAGE1_PATH, mmap=False), boot.load(STAGE2_PATH, mmap=False))
+        if _in_worker:
+            _single_thread(_pipes)
+    return _pipes
 
-# Stage-1 ve Stage-2 modellerini yükle
-stage1_pipe = joblib.load("stage1_binary_pipe.joblib")
-stage2_pipe = joblib.load("models/stage2_pipe.joblib")
+def _single_thread(pipes):
+    for pipe in pipes:
+        clf = pipe.steps[-1][1]
+        if hasattr(clf, "n_jobs"):
+            clf.n_jobs = 1
+
+# Kaynak modellerden yeni bir kaskad artefaktı varsa o ve onunla kaydedilmiş
+# eşik kullanılır; yoksa kaskad pipeline'lardan STAGE1_THRESHOLD ile bellekte
+# kurulur (paylaşılmaz; dışa aktarım: python cascade.py). Kurulamazsa None ve
+# skorlama DataFrame yoluna döner.
+def _load_cascade():
+    sources = [STAGE1_PATH, STAGE2_PATH]
+    if os.path.exists(CASCADE_PATH) and \
+            all(os.path.getmtime(CASCADE_PATH) >= os.path.getmtime(s) for s in sources):
+        return boot.load(CASCADE_PATH, mmap=MODEL_MMAP)
+    print(f" {CASCADE_PATH} yok ya da eski; kaskad pipeline'lardan kuruluyor")
+    try:
+        return TwoStageCascade.from_pipelines(*load_pipelines(), STAGE1_THRESHOLD)
+    except (ValueError, AttributeError) as e:
+        print(" Kaskad kurulamadı, DataFrame yolu kullanılacak:", e)
+        return None
+
+cascade = _load_cascade()
+boot.report()
+
+detector = FlowAnomalyDetector(window=WINDOW_SECONDS, buckets=WINDOW_BUCKETS,
+                               max_flows=MAX_FLOWS, max_avg_sbytes=THRESHOLD,
+                               min_flows=MIN_FLOWS, max_keys=MAX_TRACKED_KEYS)
+
+rules = RuleEngine(load_rules(RULES_PATH) if os.path.exists(RULES_PATH) else None,
+                   track_all=RULE_TRACK_ALL)
+_rules_reported = time.monotonic()
+if rules.decisive:
+    print(f" {len(rules.decisive)} kesin kural: {', '.join(r.name for r in rules.decisive)}")
+
+# İlk alert'te açılır; işçi süreçler modülü içe aktarınca dosya açmaz.
+alert_sink = None
+_alert_lock = threading.Lock()
 
 
 # Kategorik mapping’ler
@@ -36,131 +143,355 @@ STATE_MAP   = {"SF":0,"S0":1,"REJ":2,"RSTR":3,"SH":4}
 # -------------------------------------------------------------------
 # Yardımcı Fonksiyonlar
 # -------------------------------------------------------------------
-def ip_to_int(ip_str: str) -> int:
+def check_anomaly(rec: dict):
+    for msg in detector.observe(rec):
+        print(f" Anomali tespit: {msg}")
+
+# -------------------------------------------------------------------
+# Model Skorlama
+# -------------------------------------------------------------------
+def get_alert_sink() -> AlertSink:
+    global alert_sink
+    with _alert_lock:
+        if alert_sink is None and ALERT_BACKEND == "parquet":
+            from alert_store import StoreAlertSink
+            alert_sink = StoreAlertSink(ALERT_STORE_DIR, flush_interval=ALERT_FLUSH_INTERVAL)
+        elif alert_sink is None:
+            alert_sink = AlertSink(ALERT_PATH,
+                                   flush_interval=ALERT_FLUSH_INTERVAL,
+                                   rotate_bytes=ALERT_ROTATE_BYTES,
+                                   rotate_interval=ALERT_ROTATE_INTERVAL,
+                                   fsync_rows=ALERT_FSYNC_ROWS,
+                                   fsync_interval=ALERT_FSYNC_INTERVAL)
+        return alert_sink
+
+def write_alert(obj: dict, att_label: str, prob_attack: float):
+    get_alert_sink().write_alert(obj, att_label, prob_attack)
+
+def _normalize_label(att_label):
+    if att_label in ["-", "", None]:
+        return "Normal"
+    return att_label
+
+def log_flow(obj: dict, att_label=None):
+    if not FLOW_LOG:
+        return
+    if att_label is None:
+        print(f" Normal: srcip={obj.get('srcip')}")
+        print("                                                           ")
+        return
+    print(f" Saldırı Türü: {att_label} | srcip={obj.get('srcip')}")
+
+def report_flow(obj: dict, prob_attack: float, att_label=None):
+    """Tek akışın sonucunu yazdır; saldırıysa alerts.csv'ye ekle."""
+    log_flow(obj, att_label)
+    if att_label is not None:
+        write_alert(obj, att_label, prob_attack)
+
+def _records_to_frame(records: list) -> pd.DataFrame:
+    df_raw = pd.DataFrame(records)
+    # sütun adlarını normalize et (strip+lower)
+    df_raw.columns = df_raw.columns.str.strip().str.lower()
+    return df_raw
+
+def stage1_proba(records: list):
+    """Stage-1 saldırı olasılıkları (kaskad yokken DataFrame yolu)."""
+    return load_pipelines()[0].predict_proba(_records_to_frame(records))[:,1]
+
+def stage2_predict(records: list):
+    return load_pipelines()[1].predict(_records_to_frame(records))
+
+def score_single(obj: dict):
+    """
+    Eski tek-satır yolu. (prob_attack, att_label) döndürür; normal akışta
+    att_label None'dır. Hata olursa yalnız bu akış atlanır (None).
+    """
+    if cascade is not None:
+        try:
+            prob_attack, _, att_label = cascade.predict_one(obj)
+        except Exception as e:
+            print(" Skorlama atlandı:", e)
+            return None
+        return prob_attack, att_label
+
+    # --- Stage-1: Normal vs Attack ---
     try:
-        return int(ipaddress.IPv4Address(ip_str))
-    except:
-        return 0
+        prob_attack = stage1_proba([obj])[0]
+        is_attack  = prob_attack > STAGE1_THRESHOLD
+    except Exception as e:
+        print(" Stage-1 atlandı:", e)
+        return None
 
-def get_cidr(ip_str: str, prefix: int = 24) -> str:
-    from ipaddress import ip_network
-    net = ip_network(f"{ip_str}/{prefix}", strict=False)
-    return f"{net.network_address}/{prefix}"
+    if not is_attack:
+        return prob_attack, None
 
-def check_anomaly(rec: dict):
-    global total_sbytes
-    # Sliding‐window average
-    if len(window) == WINDOW_SIZE:
-        total_sbytes -= window[0]["sbytes"]
-    window.append(rec)
-    total_sbytes += rec["sbytes"]
-    avg = total_sbytes / len(window)
-    if avg > THRESHOLD:
-        print(f" Anomali tespit: Ortalama sbytes = {avg:.2f}")
+    # --- Stage-2: Saldırı Türü Tahmini ---
+    try:
+        # Model.predict doğrudan string etiket döndürür
+        att_label = _normalize_label(stage2_predict([obj])[0])
+    except Exception as e:
+        print(" Stage-2 atlandı:", e)
+        return None
+
+    return prob_attack, att_label
+
+def score_records(records: list) -> list:
+    """
+    Akış listesini tek predict_proba çağrısıyla skorlar; Stage-2 yalnızca
+    saldırı satırlarında tek çağrıyla çalışır. Her akış için score_single
+    ile aynı sonucu döndürür. Toplu çağrı hata verirse (ör. bozuk bir kayıt)
+    batch satır satır skorlanır ki yalnızca hatalı akış atlansın.
+    """
+    if len(records) == 1:
+        return [score_single(records[0])]
+
+    try:
+        if cascade is not None:
+            probs, _, att_types = cascade.predict(records)
+            return list(zip(probs, att_types))
+        probs  = stage1_proba(records)
+        attack_idx = [i for i, p in enumerate(probs) if p > STAGE1_THRESHOLD]
+        labels = {}
+        if attack_idx:
+            preds = stage2_predict([records[i] for i in attack_idx])
+            labels = {i: _normalize_label(lbl) for i, lbl in zip(attack_idx, preds)}
+    except Exception as e:
+        print(f" Toplu skorlama başarısız ({len(records)} akış), tek tek deneniyor:", e)
+        return [score_single(obj) for obj in records]
+
+    return [(probs[i], labels.get(i)) for i in range(len(records))]
+
+def apply_rules(obj: dict):
+    """Kesin kural eşleşirse (prob_attack, att_label), yoksa None."""
+    hit = rules.decide_one(obj)
+    if hit is None:
+        return None
+    att_label = _normalize_label(hit[1])
+    if att_label == "Normal":
+        return 0.0, None
+    return 1.0, att_label
+
+def report_rules(force: bool = False):
+    global _rules_reported
+    now = time.monotonic()
+    if force or (RULE_REPORT_INTERVAL and now - _rules_reported >= RULE_REPORT_INTERVAL):
+        _rules_reported = now
+        print(f" Kurallar [{os.getpid()}]: {rules.summary()}")
+
+def process_records(records: list) -> list:
+    """
+    Akış başına durum güncellemesi (anomali kontrolü), kesin kurallar ve
+    kalan akışların skorlanması. Sonuçlar geliş sırasıyla döner.
+    """
+    for obj in records:
+        # Anomali kontrolü
+        try:
+            check_anomaly(obj)
+        except Exception as e:
+            print(" Anomali kontrol hatası:", e)
+    decided = [apply_rules(obj) for obj in records]
+    report_rules()
+    rest = [obj for obj, d in zip(records, decided) if d is None]
+    if len(rest) == len(records):
+        return score_records(records)
+    scored = iter(score_records(rest) if rest else [])
+    return [d if d is not None else next(scored) for d in decided]
+
+def score_batch(records: list):
+    """Batch'i işle ve akış başına sonucu geliş sırasıyla raporla."""
+    if not records:
+        return
+    for obj, res in zip(records, process_records(records)):
+        if res is not None:
+            report_flow(obj, *res)
+
+def init_worker():
+    """
+    İşçi süreç başlangıcı: paralellik süreçler arasında olduğundan
+    sınıflandırıcıların kendi iş parçacığı havuzları kapatılır (pipeline'lar
+    sonradan yüklenirse load_pipelines uygular).
+    """
+    global _in_worker
+    _in_worker = True
+    if _pipes is not None:
+        _single_thread(_pipes)
+
+# İşçi süreçte ham satırları çözen çerçeveleyici (ilk batch'te oluşturulur)
+_worker_framer = None
+
+def process_lines(lines: list) -> list:
+    """
+    İşçi tarafı (WORKERS > 0): ham JSON satırlarını çözer, process_records
+    ile işler ve akış satırlarını bu süreçte yazdırır. Ana sürece yalnız
+    saldırıların write_alert argümanları döner.
+    """
+    global _worker_framer
+    if _worker_framer is None:
+        _worker_framer = LineFramer(MAX_LINE_BYTES)
+    records = [prepare_record(obj) for obj in _worker_framer.feed(b"\n".join(lines) + b"\n")]
+    if not records:
+        return []
+    alerts = []
+    for obj, res in zip(records, process_records(records)):
+        if res is None:
+            continue
+        prob_attack, att_label = res
+        log_flow(obj, att_label)
+        if att_label is not None:
+            alerts.append(({"srcip": obj.get("srcip"), "state": obj.get("state")},
+                           att_label, prob_attack))
+    return alerts
+
+def close_worker():
+    """İşçi süreç kapanışı: sürecin kural isabetlerini ve parse hatalarını yazdır."""
+    report_rules(force=True)
+    if _worker_framer is not None and _worker_framer.parse_errors:
+        print(f" Parse hatası [{os.getpid()}]: {_worker_framer.parse_errors}")
 
 # -------------------------------------------------------------------
 # Bağlantı İşleyicisi
 # -------------------------------------------------------------------
-def handle_connection(conn: socket.socket, addr):
+def prepare_record(obj: dict) -> dict:
+    """Çözülmüş kayıtta zorunlu alanları doldur."""
+    obj.setdefault("service", "-")
+    obj.setdefault("state", "-")
+    return obj
+
+# -------------------------------------------------------------------
+# Eşzamanlı Sunucu (asyncio)
+# -------------------------------------------------------------------
+class ConnStats:
+    """Bağlantı başına sayaçlar; bağlantı kapanınca özet yazdırılır."""
+
+    def __init__(self, addr):
+        self.addr         = addr
+        self.opened       = time.monotonic()
+        self.bytes        = 0
+        self.records      = 0
+        self.parse_errors = 0
+        self.oversized    = 0   # MAX_LINE_BYTES'ı aşan satır
+        self.queue_stalls = 0   # kuyruk doluyken bekleme sayısı
+
+    def summary(self) -> str:
+        dur  = time.monotonic() - self.opened
+        rate = self.records / dur if dur > 0 else 0.0
+        return (f"{self.addr} | {self.records} kayıt, {self.bytes} bayt, "
+                f"{self.parse_errors} parse hatası, {self.oversized} uzun satır, "
+                f"{self.queue_stalls} kuyruk beklemesi, "
+                f"{dur:.1f} sn ({rate:.0f} kayıt/sn)")
+
+# Açık bağlantıların istatistikleri (addr → ConnStats)
+conn_stats = {}
+
+async def read_client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                      queue: asyncio.Queue):
+    """
+    Tek istemciyi okur: satırları ayrıştırıp sınırlı kuyruğa koyar. Skorlama
+    ayrı bir görevde yapıldığından yavaş bir istemci diğerlerini bekletmez;
+    kuyruk dolarsa yalnızca okuma yavaşlar (geri basınç).
+    """
+    addr = writer.get_extra_info("peername")
+    if len(conn_stats) >= MAX_CONNECTIONS:
+        print(f" Bağlantı reddedildi (limit {MAX_CONNECTIONS}): {addr}")
+        writer.close()
+        return
+
+    stats = ConnStats(addr)
+    conn_stats[addr] = stats
     print(f" Bağlantı: {addr}")
-    buffer = ""
+    # İşçi modunda satırlar çözülmeden kuyruğa girer (bkz. process_lines)
+    raw    = WORKERS > 0
+    framer = LineFramer(MAX_LINE_BYTES, raw=raw)
+    try:
+        while True:
+            data = await reader.read(RECV_SIZE)
+            if not data:
+                break
+            stats.bytes += len(data)
+            for obj in framer.feed(data):
+                if queue.full():
+                    stats.queue_stalls += 1
+                await queue.put(obj if raw else prepare_record(obj))
+            stats.records      = framer.lines
+            stats.parse_errors = framer.parse_errors
+            stats.oversized    = framer.oversized
+    except ConnectionError as e:
+        print(f" Bağlantı hatası {addr}:", e)
+    finally:
+        del conn_stats[addr]
+        writer.close()
+        print(f" Bağlantı kapandı: {stats.summary()}")
 
-    while True:
-        chunk = conn.recv(8192).decode("utf-8", errors="ignore")
-        if not chunk:
+async def _next_batch(queue: asyncio.Queue) -> list:
+    """İlk kaydı bekle; sonra BATCH_SIZE ya da BATCH_MAX_LATENCY dolana kadar topla."""
+    loop  = asyncio.get_running_loop()
+    batch = [await queue.get()]
+    deadline = loop.time() + BATCH_MAX_LATENCY
+    while len(batch) < BATCH_SIZE:
+        if not queue.empty():
+            batch.append(queue.get_nowait())
+            continue
+        remaining = deadline - loop.time()
+        if remaining <= 0:
             break
-        buffer += chunk
-        lines = buffer.split("\n")
-
-        for line in lines[:-1]:
-            if not line.strip():
-                continue
-            try:
-                obj = json.loads(line)
-            except json.JSONDecodeError as e:
-                print(" JSON parse hatası:", e)
-                continue
-
-            # Zorunlu alanlar
-            obj.setdefault("service", "-")
-            obj.setdefault("state", "-")
-
-            # Anomali kontrolü
-            try:
-                check_anomaly(obj)
-            except Exception as e:
-                print(" Anomali kontrol hatası:", e)
-
-            # Model için DataFrame
-            df_raw = pd.DataFrame([obj])
-         # sütun adlarını normalize et (strip+lower)
-            df_raw.columns = df_raw.columns.str.strip().str.lower()
-
-            # --- Stage-1: Normal vs Attack ---
-            try:
-                prob_attack = stage1_pipe.predict_proba(df_raw)[0,1]
-                is_attack  = prob_attack > 0.6   # Eşik: 0.6
-            except Exception as e:
-                print(" Stage-1 atlandı:", e)
-                continue
-
-            if not is_attack:
-                print(f" Normal: srcip={obj.get('srcip')}")
-                print("                                                           ")
-                continue
-
-            # --- Stage-2: Saldırı Türü Tahmini ---
-            try:
-                # Model.predict doğrudan string etiket döndürür
-                att_label = stage2_pipe.predict(df_raw)[0]
-                if att_label in ["-", "", None]:
-                 att_label = "Normal"
-
-            except Exception as e:
-                print(" Stage-2 atlandı:", e)
-                continue
-
-
-            # Log ve bildirim
-            
-            print(f" Saldırı Türü: {att_label} | srcip={obj.get('srcip')}")
-            
-            with open(f"alerts.csv", "a", newline="", encoding="utf-8") as f:
-                w = csv.writer(f)
-                if f.tell()==0:
-                    w.writerow(["timestamp","srcip","state","attack_cat","prob_attack"])
-                w.writerow([
-                    datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    obj.get("srcip","-"),
-                    obj.get("state","-"),
-                    att_label,
-                    f"{prob_attack:.3f}"
-                ])
-
-        buffer = lines[-1]
-
-    conn.close()
-    print(f" Bağlantı kapandı: {addr}")
+        try:
+            batch.append(await asyncio.wait_for(queue.get(), remaining))
+        except asyncio.TimeoutError:
+            break
+    return batch
+
+async def score_worker(queue: asyncio.Queue, pool: WorkerPool = None):
+    """
+    Kuyruktan batch'ler çekip score_batch'i executor'da sırayla çalıştırır;
+    skorlama sürerken olay döngüsü okumaya devam eder, aynı anda tek batch
+    skorlandığı için alert sırası korunur. İşçi havuzu varsa batch srcip'e
+    göre işçilere dağıtılır.
+    """
+    loop  = asyncio.get_running_loop()
+    score = score_batch if pool is None else pool.submit
+    while True:
+        batch = await _next_batch(queue)
+        try:
+            await loop.run_in_executor(None, score, batch)
+        except Exception as e:
+            print(" Skorlama hatası:", e)
+
+async def serve(pool: WorkerPool = None):
+    queue  = asyncio.Queue(maxsize=QUEUE_MAXSIZE)
+    worker = asyncio.create_task(score_worker(queue, pool))
+    server = await asyncio.start_server(
+        lambda r, w: read_client(r, w, queue), HOST, PORT, reuse_address=True)
+    print(f" TCP dinleyici {HOST}:{PORT} – beklemede… (Ctrl-C ile çık)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        worker.cancel()
 
 # -------------------------------------------------------------------
 # Sunucu Döngüsü
 # -------------------------------------------------------------------
 def start_server():
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server:
-        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        server.bind((HOST, PORT))
-        server.listen()
-        print(f" TCP dinleyici {HOST}:{PORT} – beklemede… (Ctrl-C ile çık)")
-
-        while True:
-            try:
-                conn, addr = server.accept()
-                handle_connection(conn, addr)
-            except KeyboardInterrupt:
-                print(" Dinleyici kapatılıyor…")
-                break
-            except Exception as e:
-                print(" Sunucu hatası:", e)
+    # İşçiler olay döngüsü ve iş parçacıkları başlamadan oluşturulur
+    pool = None
+    if WORKERS > 0:
+        # srcip'in /24 ağına göre shard: aynı IP hep aynı işçiye gider ve
+        # /24 pencere sayaçları da tek işçide kalır. srcip satır çözülmeden okunur.
+        pool = WorkerPool(WORKERS, process_lines, write_alert, init_fn=init_worker,
+                          exit_fn=close_worker,
+                          shard_key=lambda line: cidr(peek_field(line, "srcip")))
+        print(f" {WORKERS} çıkarım işçisi başlatıldı (srcip /24 shard)")
+    try:
+        asyncio.run(serve(pool))
+    except KeyboardInterrupt:
+        print(" Dinleyici kapatılıyor…")
+    finally:
+        if pool is not None:
+            pool.close()
+        else:
+            report_rules(force=True)
+        if alert_sink is not None:
+            alert_sink.close()
 
 if __name__ == "__main__":
     start_server()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+test_frame_schema.py
+
+Sıkı tiplerle (load_dataset(..., compact=True)) eğitilen stage
+pipeline'larının, dinleyicinin gördüğü ham tiplerle (float64 / str) aynı
+tahmini verdiğini doğrular. Stage-1 ve Stage-2 yapısındaki pipeline'lar
+(ColumnTransformer + RF) hem sıkı hem ham eğitim çerçevesiyle eğitilir;
+ham test çerçevesinde:
+  – sıkı eğitilen ile ham eğitilen pipeline aynı olasılıkları verir
+  – sıkı eğitilen pipeline sıkı ve ham test çerçevesinde aynı sonucu verir
+  – derlenmiş vektörleyici (dinleyicinin kayıt yolu) pipeline ile aynıdır
+
+Kullanım (CSV'lerin olduğu dizinde): python test_frame_schema.py
+"""
+
+import numpy as np
+import pandas as pd
+from sklearn.pipeline import Pipeline
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import StandardScaler, OneHotEncoder
+from sklearn.ensemble import RandomForestClassifier
+
+from dataset_store import load_dataset, TRAIN_FILE, TEST_FILE
+from feature_vectorizer import FeatureVectorizer
+from hyperparameter_tuning_stage1 import split_xy
+from train_stage2 import attack_frame, top_attack_types
+
+TRAIN_ROWS   = 20_000
+N_ESTIMATORS = 50
+
+
+def make_pipe(X):
+    num_cols = X.select_dtypes(include=["number"]).columns.tolist()
+    cat_cols = X.select_dtypes(include=["object", "string", "category", "bool"]).columns.tolist()
+    return Pipeline([
+        ("pre", ColumnTransformer([
+            ("num", StandardScaler(), num_cols),
+            ("cat", OneHotEncoder(handle_unknown="ignore"), cat_cols)
+        ])),
+        ("clf", RandomForestClassifier(N_ESTIMATORS, random_state=42, n_jobs=1))
+    ])
+
+
+def listener_frame(X: pd.DataFrame) -> pd.DataFrame:
+    """Dinleyicinin DataFrame yolu: JSON kayıtlarından ham çerçeve."""
+    return pd.DataFrame(X.to_dict("records"))
+
+
+def check_same(name, X_compact, X_raw, y_compact, y_raw, X_test_compact, X_test_raw):
+    compact_pipe = make_pipe(X_compact).fit(X_compact, y_compact)
+    raw_pipe     = make_pipe(X_raw).fit(X_raw, y_raw)
+    served = listener_frame(X_test_raw)
+
+    p_compact = compact_pipe.predict_proba(served)
+    assert np.array_equal(p_compact, raw_pipe.predict_proba(served)), \
+        f"{name}: sıkı ve ham eğitilen pipeline farklı"
+    assert np.array_equal(p_compact, compact_pipe.predict_proba(X_test_compact)), \
+        f"{name}: sıkı ve ham test çerçevesi farklı"
+    vec = FeatureVectorizer(compact_pipe)
+    p_vec = vec.estimator.predict_proba(vec.transform(served.to_dict("records")))
+    assert np.array_equal(p_compact, p_vec), f"{name}: vektörleyici pipeline'dan farklı"
+    print(f"✓ {name}: {len(served):,} kayıt, olasılıklar birebir aynı")
+
+
+def load_frames():
+    raw     = load_dataset(TRAIN_FILE).iloc[:TRAIN_ROWS]
+    compact = load_dataset(TRAIN_FILE, compact=True).iloc[:TRAIN_ROWS]
+    return raw, compact, load_dataset(TEST_FILE), load_dataset(TEST_FILE, compact=True)
+
+
+def test_stage1_compact_matches_raw():
+    raw, compact, test_raw, test_compact = load_frames()
+    (X_c, y_c), (X_r, y_r) = split_xy(compact), split_xy(raw)
+    check_same("Stage-1", X_c, X_r, y_c, y_r, split_xy(test_compact)[0], split_xy(test_raw)[0])
+
+
+def test_stage2_compact_matches_raw():
+    raw, compact, test_raw, test_compact = load_frames()
+    top5 = top_attack_types(raw)
+    (X_c, y_c), (X_r, y_r) = attack_frame(compact, top5), attack_frame(raw, top5)
+    check_same("Stage-2", X_c, X_r, np.asarray(y_c, dtype=object), np.asarray(y_r, dtype=object),
+               attack_frame(test_compact, top5)[0], attack_frame(test_raw, top5)[0])
+
+
+def main():
+    test_stage1_compact_matches_raw()
+    test_stage2_compact_matches_raw()
+
+
+if __name__ == "__main__":
+    main()
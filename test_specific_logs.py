@@ -1,17 +1,17 @@
 
 import pandas as pd
-import joblib
-from tcp_listener import prepare_dataframe  # JSON → DataFrame helper
+from cascade import load_cascade, CASCADE_PATH
 
 # ────────────────────────────────────────────────────────────────
-# 1) Modeller ve özellik listeleri
+# 1) Kaskad model (Stage-1 + eşik + Stage-2 tek artefakt; cascade.py ile üretilir)
+#    Not: kaskad stage1_pipe / stage2_pipe modellerinden üretilir (eski
+#    stage1_binary_rf / stage2_collapsed_rf değil); sonuçlar bu nedenle
+#    önceki çıktılardan farklı olabilir. Eşik artefaktınkini (0.6) değil,
+#    bu betiğin THRESHOLD değerini kullanır.
 # ────────────────────────────────────────────────────────────────
-stage1 = joblib.load("stage1_binary_rf.joblib")
-stage2 = joblib.load("models/stage2_collapsed_rf.joblib")
-
-STAGE1_COLS = list(stage1.feature_names_in_)
-STAGE2_COLS = list(stage2.feature_names_in_)
 THRESHOLD   = 0.7   # 0-1 arası; fp oranını ayarlamak için gerekirse değiştirin
+cascade = load_cascade(CASCADE_PATH)
+cascade.threshold = THRESHOLD
 NEEDED = ["srcip","dstip","proto","service","state",
           "sport","dport","dur","sbytes","dbytes"]
 # ────────────────────────────────────────────────────────────────
@@ -48,19 +48,10 @@ records = [
 
 def predict_flow(json_rec: dict):
     """ Tek bir JSON kaydı için Stage-1 olasılığı, karar ve (varsa) Stage-2 etiketi döndür. """
-    df = prepare_dataframe(json_rec)
-
-    # Stage-1 öznitelik hizalaması
-    df1 = df.reindex(columns=STAGE1_COLS, fill_value=0)
-    prob = stage1.predict_proba(df1)[0, 1]
-    is_attack = prob > THRESHOLD
-
+    # Girdi bir kez hazırlanır; Stage-2 yalnızca kaskadın eşiği geçilirse çalışır
+    prob, is_attack, attack_type = cascade.predict_one(json_rec)
     if not is_attack:
         return prob, "Normal", None
-
-    # Stage-2 öznitelik hizalaması
-    df2 = df.reindex(columns=STAGE2_COLS, fill_value=0)
-    attack_type = stage2.predict(df2)[0]
     return prob, "Attack", attack_type
 
 # ────────────────────────────────────────────────────────────────
@@ -1,5 +1,5 @@
-import pandas as pd
 from data_utils import preprocess_data
+from dataset_store import load_dataset
 import lightgbm as lgb
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import roc_auc_score, f1_score
@@ -9,11 +9,11 @@ TRAIN_FILE = "UNSW_NB15_training-set.csv"
 TEST_FILE  = "UNSW_NB15_testing-set.csv"
 
 # 2) Veri yükleme
-df_train = pd.read_csv(TRAIN_FILE)
-df_test  = pd.read_csv(TEST_FILE)
+df_train = load_dataset(TRAIN_FILE, normalize=False, compact=True)
+df_test  = load_dataset(TEST_FILE, normalize=False, compact=True)
 
-# 3) Ön işleme
-X_train, y_train, X_test, y_test = preprocess_data(df_train, df_test)
+# 3) Ön işleme (sıkı tipler)
+X_train, y_train, X_test, y_test = preprocess_data(df_train, df_test, compact=True)
 
 # 4) RandomForest modeli
 rf = RandomForestClassifier(n_estimators=100, random_state=42, class_weight='balanced')
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+train_pipeline.py
+
+Stage-1, Stage-2, kaskad ve değerlendirmeyi tek komutla çalıştıran eğitim
+düzenleyicisi.
+
+Her adım girdilerini (veri / model dosyaları), parametrelerini ve kod
+dosyalarını açıkça bildirir. Adımın imzası bunların özetinden (blake2b)
+oluşur ve STATE_PATH'e çıktı dosyalarının özetleriyle birlikte yazılır.
+Yeniden çalıştırmada imza değişmemişse ve çıktılar kayıtlı hâlleriyle
+duruyorsa adım atlanır; bir adımın çıktısı değişince onu girdi olarak
+kullanan sonraki adımlar da yeniden çalışır. Her çalışan adım için süre
+(duvar saati + CPU) ve tepe bellek (RSS) kaydedilir.
+
+Kullanım:
+    python train_pipeline.py                  # tüm adımlar (gerekenler)
+    python train_pipeline.py stage2 evaluate  # yalnız seçilen adımlar
+    python train_pipeline.py --force stage1   # imzaya bakmadan çalıştır
+    python train_pipeline.py --list           # durum, çalıştırmadan
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+
+import numpy as np
+
+from dataset_store import TRAIN_FILE, TEST_FILE, file_digest, load_dataset
+from model_store import save_model, load_model
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+STATE_PATH  = "models/pipeline_state.json"
+REPORT_PATH = "reports/metrics.json"
+SAMPLE_SECS = 0.05      # tepe bellek örnekleme aralığı
+SRC_DIR     = os.path.dirname(os.path.abspath(__file__))
+
+
+# -------------------------------------------------------------------
+# Tepe bellek
+# -------------------------------------------------------------------
+def _rss_mb() -> float:
+    """Sürecin anlık RSS'i (MB); /proc/self/statm, yoksa psutil, yoksa 0."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, IndexError):
+        pass
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / 2**20
+    return 0.0
+
+
+class PeakMemory:
+    """with bloğu boyunca RSS'i arka planda örnekler; peak / start (MB)."""
+
+    def __init__(self, interval: float = SAMPLE_SECS):
+        self.interval = interval
+        self.start = self.peak = 0.0
+        self._stop = threading.Event()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, _rss_mb())
+
+    def __enter__(self):
+        self.start = self.peak = _rss_mb()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _rss_mb())
+        return False
+
+
+# -------------------------------------------------------------------
+# Adımlar
+# -------------------------------------------------------------------
+class Step:
+    """
+    name    : adım adı (CLI'de kullanılır)
+    fn      : () → bilgi sözlüğü (JSON'a yazılabilir metrikler)
+    inputs  : okunan dosyalar
+    outputs : yazılan dosyalar
+    params  : sonucu etkileyen parametreler
+    code    : adımın davranışını belirleyen modül dosyaları (SRC_DIR'e göre)
+    """
+
+    def __init__(self, name, fn, inputs, outputs, params=None, code=()):
+        self.name    = name
+        self.fn      = fn
+        self.inputs  = list(inputs)
+        self.outputs = list(outputs)
+        self.params  = params or {}
+        self.code    = [os.path.join(SRC_DIR, c) for c in code]
+
+
+def _stage1():
+    from hyperparameter_tuning_stage1 import MODEL_PATH, PARAM_GRID, train_stage1
+    model, info = train_stage1(load_dataset(TRAIN_FILE, compact=True), param_grid=PARAM_GRID)
+    save_model(model, MODEL_PATH)
+    return info
+
+
+def _stage2():
+    from train_stage2 import MODEL_PATH, PARAM_GRID, train_stage2
+    model, info = train_stage2(load_dataset(TRAIN_FILE, compact=True), param_grid=PARAM_GRID)
+    save_model(model, MODEL_PATH)
+    return info
+
+
+def _cascade():
+    import cascade as mod
+    from hyperparameter_tuning_stage1 import MODEL_PATH as STAGE1_PATH
+    from train_stage2 import MODEL_PATH as STAGE2_PATH
+
+    stage1_pipe = load_model(STAGE1_PATH, mmap=False)
+    stage2_pipe = load_model(STAGE2_PATH, mmap=False)
+    cascade = mod.export_cascade(stage1_pipe, stage2_pipe, mod.CASCADE_PATH, mod.DEFAULT_THRESHOLD)
+    X_raw = load_dataset(TEST_FILE).head(5000).drop(columns=["label", "attack_cat"], errors="ignore")
+    ok = mod.verify(stage1_pipe, stage2_pipe, cascade, X_raw)
+    print(f"✓ Kaskad kaydedildi → {mod.CASCADE_PATH} | birebir aynı: {ok}")
+    return {"verified": ok, "threshold": cascade.threshold}
+
+
+def _evaluate():
+    from sklearn.metrics import (classification_report, f1_score, precision_score,
+                                 recall_score, roc_auc_score)
+    from sklearn.preprocessing import label_binarize
+    from cascade import CASCADE_PATH, load_cascade
+    from train_stage2 import MODEL_PATH as STAGE2_PATH, attack_frame
+    from hyperparameter_tuning_stage1 import split_xy
+
+    test_df = load_dataset(TEST_FILE)
+    cascade = load_cascade(CASCADE_PATH)
+
+    # Stage-1 (kaskad eşiğiyle) ve uçtan uca saldırı tespiti
+    X_test, y_test = split_xy(test_df)
+    prob, is_attack, attack_type = cascade.predict(X_test)
+    stage1 = {
+        "roc_auc":   roc_auc_score(y_test, prob),
+        "precision": precision_score(y_test, is_attack, zero_division=0),
+        "recall":    recall_score(y_test, is_attack, zero_division=0),
+        "f1":        f1_score(y_test, is_attack, zero_division=0),
+        "threshold": cascade.threshold,
+    }
+
+    # Stage-2: yalnız gerçek saldırı kayıtları
+    stage2_pipe = load_model(STAGE2_PATH)
+    labels = list(stage2_pipe.classes_)
+    X_att, y_att = attack_frame(test_df, [c for c in labels if c != "Other"])
+    proba = stage2_pipe.predict_proba(X_att)
+    y_pred = np.asarray(labels, dtype=object)[proba.argmax(axis=1)]
+    stage2 = {
+        "f1_macro":      f1_score(y_att, y_pred, average="macro", zero_division=0),
+        "micro_roc_auc": roc_auc_score(label_binarize(y_att, classes=labels), proba, average="micro"),
+        "report":        classification_report(y_att, y_pred, zero_division=0, output_dict=True),
+    }
+
+    metrics = {"n_test": int(len(test_df)), "stage1": stage1, "stage2": stage2}
+    os.makedirs(os.path.dirname(REPORT_PATH) or ".", exist_ok=True)
+    with open(REPORT_PATH, "w", encoding="utf-8") as f:
+        json.dump(metrics, f, indent=2, default=float)
+    print(f"✓ Stage-1 AUC {stage1['roc_auc']:.4f} recall {stage1['recall']:.4f} | "
+          f"Stage-2 macro-F1 {stage2['f1_macro']:.4f} → {REPORT_PATH}")
+    return {"stage1": stage1, "stage2_f1_macro": stage2["f1_macro"],
+            "stage2_micro_roc_auc": stage2["micro_roc_auc"]}
+
+
+def build_steps() -> list:
+    import cascade as cascade_mod
+    import hyperparameter_tuning_stage1 as s1
+    import train_stage2 as s2
+
+    # Modeller bu modüllerin ön işleme / kural / şema koduyla üretilir
+    data_code = ["data_utils.py", "rule_engine.py", "dataset_store.py", "frame_schema.py"]
+    return [
+        Step("stage1", _stage1,
+             inputs=[TRAIN_FILE], outputs=[s1.MODEL_PATH],
+             params={"grid": s1.PARAM_GRID},
+             code=["hyperparameter_tuning_stage1.py", "halving_search.py", *data_code]),
+        Step("stage2", _stage2,
+             inputs=[TRAIN_FILE], outputs=[s2.MODEL_PATH],
+             params={"grid": s2.PARAM_GRID},
+             code=["train_stage2.py", "halving_search.py", *data_code]),
+        Step("cascade", _cascade,
+             inputs=[s1.MODEL_PATH, s2.MODEL_PATH, TEST_FILE], outputs=[cascade_mod.CASCADE_PATH],
+             params={"threshold": cascade_mod.DEFAULT_THRESHOLD},
+             code=["cascade.py", "feature_vectorizer.py", "tree_engine.py"]),
+        Step("evaluate", _evaluate,
+             inputs=[cascade_mod.CASCADE_PATH, s2.MODEL_PATH, TEST_FILE], outputs=[REPORT_PATH],
+             code=["cascade.py", "train_stage2.py", "hyperparameter_tuning_stage1.py", *data_code]),
+    ]
+
+
+# -------------------------------------------------------------------
+# Düzenleyici
+# -------------------------------------------------------------------
+class Orchestrator:
+    def __init__(self, steps: list, state_path: str = STATE_PATH):
+        self.steps = steps
+        self.state_path = state_path
+        self.state = self._read_state()
+
+    def _read_state(self) -> dict:
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        state.setdefault("files", {})
+        state.setdefault("steps", {})
+        return state
+
+    def _write_state(self):
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2, default=str)
+        os.replace(tmp, self.state_path)
+
+    def digest(self, path: str):
+        """Dosya özeti; boyut + değiştirilme zamanı aynıysa kayıtlı özet. Yoksa None."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        key = os.path.abspath(path)
+        entry = self.state["files"].get(key, {})
+        if entry.get("size") == st.st_size and entry.get("mtime_ns") == st.st_mtime_ns:
+            return entry["digest"]
+        digest = file_digest(path)
+        self.state["files"][key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "digest": digest}
+        return digest
+
+    def signature(self, step: Step) -> str:
+        missing = [p for p in step.inputs + step.code if self.digest(p) is None]
+        if missing:
+            raise FileNotFoundError(f"{step.name}: girdi bulunamadı: {', '.join(missing)}")
+        parts = {
+            "inputs": {p: self.digest(p) for p in step.inputs},
+            "params": step.params,
+            "code":   {os.path.basename(p): self.digest(p) for p in step.code},
+        }
+        blob = json.dumps(parts, sort_keys=True, default=str).encode()
+        return hashlib.blake2b(blob, digest_size=16).hexdigest()
+
+    def is_fresh(self, step: Step) -> bool:
+        """İmza aynı ve çıktılar kayıtlı özetleriyle duruyor mu?"""
+        rec = self.state["steps"].get(step.name)
+        if not rec or rec.get("signature") != self.signature(step):
+            return False
+        return all(self.digest(p) == rec["outputs"].get(p) for p in step.outputs)
+
+    def run(self, names=None, force: bool = False) -> list:
+        """Seçilen adımları sırayla çalıştır → [(ad, durum, kayıt)]."""
+        selected = [s for s in self.steps if not names or s.name in names]
+        summary = []
+        for step in selected:
+            if not force and self.is_fresh(step):
+                print(f"\n=== {step.name}: değişiklik yok, atlandı")
+                summary.append((step.name, "atlandı", self.state["steps"][step.name]))
+                continue
+            print(f"\n=== {step.name}")
+            signature = self.signature(step)
+            wall0, cpu0 = time.perf_counter(), time.process_time()
+            with PeakMemory() as mem:
+                info = step.fn()
+            rec = {
+                "signature": signature,
+                "outputs":   {p: self.digest(p) for p in step.outputs},
+                "wall_s":    round(time.perf_counter() - wall0, 3),
+                "cpu_s":     round(time.process_time() - cpu0, 3),
+                "peak_rss_mb":  round(mem.peak, 1),
+                "start_rss_mb": round(mem.start, 1),
+                "finished":  time.strftime("%Y-%m-%d %H:%M:%S"),
+                "info":      info,
+            }
+            self.state["steps"][step.name] = rec
+            self._write_state()
+            summary.append((step.name, "çalıştı", rec))
+        return summary
+
+    def status(self) -> list:
+        out = []
+        for step in self.steps:
+            try:
+                out.append((step.name, "güncel" if self.is_fresh(step) else "çalışacak"))
+            except FileNotFoundError as e:
+                out.append((step.name, f"eksik girdi ({e})"))
+        return out
+
+
+def print_summary(summary: list):
+    print(f"\n{'adım':<10}{'durum':<10}{'süre (sn)':>11}{'CPU (sn)':>10}{'tepe RSS (MB)':>15}")
+    for name, status, rec in summary:
+        print(f"{name:<10}{status:<10}{rec['wall_s']:>11.1f}{rec['cpu_s']:>10.1f}"
+              f"{rec['peak_rss_mb']:>15.0f}")
+
+
+def main(argv=None):
+    steps = build_steps()
+    names = [s.name for s in steps]
+    parser = argparse.ArgumentParser(description="Stage-1 / Stage-2 eğitim düzenleyicisi")
+    parser.add_argument("steps", nargs="*",
+                        help=f"çalıştırılacak adımlar: {', '.join(names)} (varsayılan: hepsi)")
+    parser.add_argument("--force", action="store_true", help="imzaya bakmadan çalıştır")
+    parser.add_argument("--list", action="store_true", help="yalnız durumu göster")
+    args = parser.parse_args(argv)
+    unknown = [n for n in args.steps if n not in names]
+    if unknown:
+        parser.error(f"bilinmeyen adım: {', '.join(unknown)}")
+
+    orch = Orchestrator(steps)
+    if args.list:
+        for name, status in orch.status():
+            print(f"{name:<10}{status}")
+        return
+    try:
+        summary = orch.run(args.steps, force=args.force)
+    except FileNotFoundError as e:
+        sys.exit(f"✗ {e}")
+    print_summary(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,94 +1,107 @@
-
-import joblib, pandas as pd
-from sklearn.pipeline import Pipeline
+from model_store import save_model
+from dataset_store import load_dataset
+from halving_search import HalvingSearch
 from sklearn.compose import ColumnTransformer
 from sklearn.preprocessing import OneHotEncoder, StandardScaler
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split, RandomizedSearchCV
-from sklearn.metrics import classification_report, confusion_matrix
+from sklearn.model_selection import train_test_split
+from sklearn.metrics import classification_report
 
-# ----------------------------------------------------------------------------
-# 1) Veri yükle & temel temizlik
-# ----------------------------------------------------------------------------
+MODEL_PATH = "models/stage2_pipe.joblib"
+TUNING_LOG = "logs/tuning_stage2.jsonl"
 
-def load_dataset(path: str) -> pd.DataFrame:
-    df = pd.read_csv(path)
-    # sütun adlarını trim + lower
-    df.columns = df.columns.str.strip().str.lower()
-    return df
-
-train_df = load_dataset("UNSW_NB15_training-set.csv")
-test_df  = load_dataset("UNSW_NB15_testing-set.csv")
+PARAM_GRID = {
+    "n_estimators":      [100, 200, 300],
+    "max_depth":         [None, 15, 25],
+    "min_samples_split": [2, 5, 10],
+}
 
 # ----------------------------------------------------------------------------
-# 2) Yalnız saldırı kayıtları + 5 ana tür + Other
+# 1) Yalnız saldırı kayıtları + 5 ana tür + Other
 # ----------------------------------------------------------------------------
-train_att = train_df[train_df["label"] != 0].reset_index(drop=True)
-test_att  = test_df [test_df ["label"] != 0].reset_index(drop=True)
+def attack_frame(df, top5):
+    """Saldırı kayıtları; nadir kategoriler “Other” altında toplanır → (X, y)."""
+    att = df[df["label"] != 0].reset_index(drop=True)
+    cat = att["attack_cat"].astype(str)     # category (sıkı tipler) → metin
+    y   = cat.where(cat.isin(top5), other="Other")
+    X   = att.drop(columns=["label", "attack_cat"])
+    return X, y
 
 
-top5 = train_att["attack_cat"].value_counts().nlargest(5).index.tolist()
-print(" 5 ana tür:", top5)
-
-#  collapse adımı – nadir kategorileri “Other” altında topla
-train_att["attack_collapsed"] = train_att["attack_cat"].where(
-    train_att["attack_cat"].isin(top5), other="Other")
-test_att ["attack_collapsed"] = test_att ["attack_cat"].where(
-    test_att ["attack_cat"].isin(top5), other="Other")
-
-#  Modelin hedefi olarak bu yeni sütunu kullan
-train_att["y"] = train_att["attack_collapsed"]
-test_att ["y"] = test_att ["attack_collapsed"]
-# ----------------------------------------------------------------------------
-# 3) Özellik / hedef ayır
-# ----------------------------------------------------------------------------
-X_train_raw = train_att.drop(columns=["label","attack_cat","attack_collapsed","y"])
-y_train     = train_att["y"]
-X_test_raw  = test_att.drop(columns=["label","attack_cat","attack_collapsed","y"])
-y_test      = test_att["y"]
-
-# otomatik sayısal / kategorik
-num_cols = X_train_raw.select_dtypes(include=["int64","float64"]).columns.tolist()
-cat_cols = X_train_raw.select_dtypes(include=["object","bool"]).columns.tolist()
-print(f" {len(num_cols)} sayısal, {len(cat_cols)} kategorik sütun kullanılacak")
-
-preproc = ColumnTransformer([
-    ("num",  StandardScaler(), num_cols),
-    ("cat",  OneHotEncoder(handle_unknown="ignore"), cat_cols)
-])
-
-pipe = Pipeline([
-    ("pre", preproc),
-    ("clf", RandomForestClassifier(random_state=42,
-                                    class_weight="balanced_subsample",
-                                    n_jobs=-1))
-])
-
-param_dist = {
-    "clf__n_estimators":      [100, 200, 300],
-    "clf__max_depth":         [None, 15, 25],
-    "clf__min_samples_split": [2, 5, 10],
-}
+def top_attack_types(train_df, n=5):
+    att = train_df[train_df["label"] != 0]
+    return att["attack_cat"].value_counts().nlargest(n).index.tolist()
 
-rs = RandomizedSearchCV(pipe, param_dist, n_iter=10, cv=3,
-                        scoring="f1_macro", random_state=42,
-                        verbose=2, n_jobs=-1, error_score="raise")
-print(" Hiperparametre araması…")
-rs.fit(X_train_raw, y_train)
-print("✓ En iyi:", rs.best_params_)
-model = rs.best_estimator_
 
 # ----------------------------------------------------------------------------
-# 4) Değerlendirme
+# 2) Arama + eğitim
 # ----------------------------------------------------------------------------
-X_tr, X_val, y_tr, y_val = train_test_split(X_train_raw, y_train,
-                                            test_size=0.2, stratify=y_train,
-                                            random_state=42)
-model.fit(X_tr, y_tr)
-print("\n Validation:")
-print(classification_report(y_val, model.predict(X_val)))
-print("\n Test:")
-print(classification_report(y_test, model.predict(X_test_raw)))
-
-joblib.dump(model, "models/stage2_pipe.joblib")
-print("\n Kaydedildi: models/stage2_pipe.joblib")
+def train_stage2(train_df, log_path=TUNING_LOG, param_grid=PARAM_GRID):
+    """
+    Stage-2 pipeline'ını eğit → (model, bilgi). Arama %80'lik eğitim
+    bölümünde yapılır; en iyi aday bu bölümde bir kez eğitilir ve %20
+    doğrulama raporu aynı modelden alınır (ikinci eğitim yok).
+    """
+    top5 = top_attack_types(train_df)
+    print(" 5 ana tür:", top5)
+    X_train_raw, y_train = attack_frame(train_df, top5)
+
+    # otomatik sayısal / kategorik
+    num_cols = X_train_raw.select_dtypes(include=["number"]).columns.tolist()
+    cat_cols = X_train_raw.select_dtypes(include=["object", "string", "category", "bool"]).columns.tolist()
+    print(f" {len(num_cols)} sayısal, {len(cat_cols)} kategorik sütun kullanılacak")
+
+    X_tr, X_val, y_tr, y_val = train_test_split(X_train_raw, y_train,
+                                                test_size=0.2, stratify=y_train,
+                                                random_state=42)
+
+    def make_preproc():
+        return ColumnTransformer([
+            ("num",  StandardScaler(), num_cols),
+            ("cat",  OneHotEncoder(handle_unknown="ignore"), cat_cols)
+        ])
+
+    rf = RandomForestClassifier(random_state=42,
+                                class_weight="balanced_subsample",
+                                n_jobs=-1)
+
+    # Ön işleme fold başına bir kez; ızgaradan 10 aday successive halving
+    # ile elenir, bir turun aday × fold eğitimleri paralel. Kesilen arama
+    # log_path'ten devam eder.
+    search = HalvingSearch(make_preproc, rf, param_grid, scoring="f1_macro",
+                           cv=3, factor=3, n_candidates=10, random_state=42,
+                           log_path=log_path, n_jobs=-1)
+    print(" Hiperparametre araması…")
+    search.fit(X_tr, y_tr)
+    print("✓ En iyi:", search.best_params_)
+    model = search.best_estimator_
+
+    print("\n Validation:")
+    y_val_pred = model.predict(X_val)
+    print(classification_report(y_val, y_val_pred, zero_division=0))
+    info = {
+        "top5":        top5,
+        "best_params": search.best_params_,
+        "cv_f1_macro": search.best_score_,
+        "validation":  classification_report(y_val, y_val_pred, zero_division=0, output_dict=True),
+    }
+    return model, info
+
+
+def main():
+    # load_dataset: sütunlu önbellekten yükler, sütun adları trim + lower
+    train_df = load_dataset("UNSW_NB15_training-set.csv", compact=True)
+    test_df  = load_dataset("UNSW_NB15_testing-set.csv")
+
+    model, info = train_stage2(train_df)
+
+    X_test_raw, y_test = attack_frame(test_df, info["top5"])
+    print("\n Test:")
+    print(classification_report(y_test, model.predict(X_test_raw), zero_division=0))
+
+    save_model(model, MODEL_PATH)
+    print(f"\n Kaydedildi: {MODEL_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+tree_engine.py
+
+Düzleştirilmiş ağaç topluluğu (RandomForest / ExtraTrees) çıkarım motoru.
+
+Eğitilmiş bir stage pipeline'ı dışa aktarılırken:
+  – Ön işleme (StandardScaler sabitleri, OneHotEncoder sözlükleri)
+    FeatureVectorizer olarak derlenir,
+  – Tüm ağaçların düğümleri tek bir ardışık dizi kümesinde birleştirilir:
+    feature, threshold, left, right, nan_left ve yaprak değerleri (value).
+Skorlama, satırlar × ağaçlar matrisi üzerinde seviye seviye vektörel
+gezinmeyle yapılır; tek satır ve batch aynı kodu kullanır.
+
+Sonuçlar sklearn ile birebir aynıdır: girdi sklearn gibi float32'ye
+çevrilir, eşik karşılaştırması float64'te yapılır, ağaç olasılıkları sklearn'ün
+sırayla toplayıp ağaç sayısına böldüğü gibi birleştirilir (n_jobs=1 sırası;
+n_jobs>1'de sklearn'ün kendi toplama sırası da iş parçacıklarına bağlıdır).
+
+Dışa aktarılan artefakt model_store ile sıkıştırmasız kaydedilir; düğüm
+dizileri düz NumPy dizisi olduğundan load_model(mmap=True) ile süreçler
+arasında tek fiziksel kopya paylaşılır.
+"""
+
+import numpy as np
+import sklearn
+from sklearn.utils.fixes import parse_version
+
+from feature_vectorizer import FeatureVectorizer
+from model_store import save_model, load_model
+
+# sklearn 1.4'ten itibaren sınıflandırıcı ağaçlarında tree_.value oranları
+# tutar; öncesinde ağırlıklı sayılar tutulur ve predict_proba normalize eder.
+_VALUE_IS_FRACTION = parse_version(sklearn.__version__) >= parse_version("1.4")
+
+# Dışa aktarılan artefaktlar (tcp_listener bunları varsa tercih eder)
+STAGE1_COMPILED = "stage1_binary_compiled.joblib"
+STAGE2_COMPILED = "models/stage2_compiled.joblib"
+
+
+class CompiledForest:
+    """Eğitilmiş bir orman sınıflandırıcısının düz dizi temsili."""
+
+    def __init__(self, forest):
+        if getattr(forest, "n_outputs_", 1) != 1:
+            raise ValueError("Çok çıktılı ormanlar desteklenmiyor")
+        trees = [est.tree_ for est in forest.estimators_]
+        self.classes_       = np.asarray(forest.classes_)
+        self.n_features_in_ = forest.n_features_in_
+        self.n_trees        = len(trees)
+        n_classes = len(self.classes_)
+
+        sizes = [t.node_count for t in trees]
+        self.roots = np.cumsum([0] + sizes[:-1]).astype(np.intp)
+        n = sum(sizes)
+        self.feature   = np.zeros(n, dtype=np.intp)
+        self.threshold = np.zeros(n, dtype=np.float64)
+        self.left      = np.zeros(n, dtype=np.intp)
+        self.right     = np.zeros(n, dtype=np.intp)
+        self.nan_left  = np.zeros(n, dtype=bool)
+        self.value     = np.zeros((n, n_classes), dtype=np.float64)
+
+        for off, t in zip(self.roots, trees):
+            sl  = slice(off, off + t.node_count)
+            idx = np.arange(off, off + t.node_count)
+            leaf = t.children_left == -1
+            self.feature[sl]   = np.where(leaf, 0, t.feature)
+            self.threshold[sl] = np.where(leaf, np.inf, t.threshold)
+            # Yapraklar kendine döner; böylece gezinme sabit adım sayısıyla biter
+            self.left[sl]      = np.where(leaf, idx, t.children_left + off)
+            self.right[sl]     = np.where(leaf, idx, t.children_right + off)
+            if hasattr(t, "missing_go_to_left"):
+                self.nan_left[sl] = t.missing_go_to_left.astype(bool)
+            value = t.value[:, 0, :n_classes]
+            if not _VALUE_IS_FRACTION:
+                norm = value.sum(axis=1, keepdims=True)
+                norm[norm == 0.0] = 1.0
+                value = value / norm
+            self.value[sl] = value
+
+        self.max_depth = max(t.max_depth for t in trees)
+        self._has_nan_routing = bool(self.nan_left.any())
+
+    def apply(self, X) -> np.ndarray:
+        """Her satırın her ağaçta düştüğü yaprak (global düğüm indeksi), (n, n_trees)."""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        rows = np.arange(X.shape[0])[:, None]
+        node = np.broadcast_to(self.roots, (X.shape[0], self.n_trees)).copy()
+        check_nan = self._has_nan_routing and np.isnan(X).any()
+        for _ in range(self.max_depth):
+            x  = X[rows, self.feature[node]]
+            go_left = x <= self.threshold[node]
+            if check_nan:
+                nan = np.isnan(x)
+                go_left = np.where(nan, self.nan_left[node], go_left)
+            node = np.where(go_left, self.left[node], self.right[node])
+        return node
+
+    def predict_proba(self, X) -> np.ndarray:
+        leaves = self.apply(X)
+        proba  = np.zeros((leaves.shape[0], len(self.classes_)), dtype=np.float64)
+        # sklearn ile aynı toplama sırası: ağaç ağaç, sonra ağaç sayısına böl
+        for t in range(self.n_trees):
+            proba += self.value[leaves[:, t]]
+        proba /= self.n_trees
+        return proba
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+
+def compile_pipeline(pipe) -> FeatureVectorizer:
+    """
+    Stage pipeline'ını (ColumnTransformer + orman) derle. Dönen vektörleyici
+    JSON kayıt listesi alır; predict_proba / predict derlenmiş ormanı kullanır.
+    """
+    vec = FeatureVectorizer(pipe)
+    vec.estimator = CompiledForest(vec.estimator)
+    return vec
+
+
+def export_pipeline(pipe, path: str) -> FeatureVectorizer:
+    compiled = compile_pipeline(pipe)
+    save_model(compiled, path)
+    return compiled
+
+
+def verify(pipe, compiled: FeatureVectorizer, X_raw) -> bool:
+    """Orijinal pipeline (n_jobs=1) ile derlenmiş motorun birebir aynı olduğunu doğrula."""
+    clf = pipe.steps[-1][1]
+    n_jobs, clf.n_jobs = getattr(clf, "n_jobs", None), 1
+    try:
+        ref = pipe.predict_proba(X_raw)
+    finally:
+        clf.n_jobs = n_jobs
+    out = compiled.predict_proba(X_raw.to_dict("records"))
+    return np.array_equal(ref, out)
+
+
+def main():
+    import pandas as pd
+    # Betik olarak çalışınca sınıflar __main__ altında pickle'lanmasın
+    import tree_engine
+
+    test_df = pd.read_csv("UNSW_NB15_testing-set.csv", nrows=5000)
+    test_df.columns = test_df.columns.str.strip().str.lower()
+    X_raw = test_df.drop(columns=["label", "attack_cat"], errors="ignore")
+
+    for src, dst in [("stage1_binary_pipe.joblib", STAGE1_COMPILED),
+                     ("models/stage2_pipe.joblib", STAGE2_COMPILED)]:
+        pipe = load_model(src, mmap=False)
+        compiled = tree_engine.export_pipeline(pipe, dst)
+        forest = compiled.estimator
+        ok = tree_engine.verify(pipe, compiled, X_raw)
+        print(f"✓ {src} → {dst} | {forest.n_trees} ağaç, {len(forest.feature)} düğüm, "
+              f"derinlik {forest.max_depth} | birebir aynı: {ok}")
+
+
+if __name__ == "__main__":
+    main()